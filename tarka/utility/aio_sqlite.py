@@ -1,14 +1,33 @@
 from __future__ import annotations
 
 import asyncio
+import copy
+import queue
+import random
 import sqlite3
+import sys
+import threading
 import time
+from collections import OrderedDict
 from contextlib import contextmanager
-from typing import Callable, Optional, Any, Sequence
+from functools import partial
+from typing import Callable, Optional, Any, Sequence, Union, Iterable, Hashable
 
 import wait_for2
 
-from tarka.utility.aio_worker import AbstractAioWorker, AbstractAioWorkerJob, AbstractThreadWorkerJob
+from tarka.utility.aio_worker import (
+    AbstractAioWorker,
+    AbstractAioWorkerJob,
+    AbstractThreadWorkerJob,
+    AbstractWorkerJob,
+    AioWorkerMetricsSink,
+    AioWorkerThread,
+    PartialMethodAioWorkerJob,
+    PartialMethodThreadWorkerJob,
+    WorkerTimer,
+    stop_aio_worker_threads,
+)
+from tarka.utility.sentinel import NamedObject
 
 
 def sqlite_retry(
@@ -43,6 +62,11 @@ def sqlite_retry(
             wait_time *= wait_multiplier
 
 
+def _sqlite_job_label(process_fn: Callable, args) -> str:
+    # the bulk statements share the implementation, they are labelled by the statement instead
+    return args[0] if process_fn is _executemany_impl else process_fn.__qualname__
+
+
 class ThreadSQLiteJob(AbstractThreadWorkerJob):
     __slots__ = ("process_fn", "args", "post_process_fn", "begin_immediate")
 
@@ -59,9 +83,11 @@ class ThreadSQLiteJob(AbstractThreadWorkerJob):
         self.post_process_fn = post_process_fn
         self.begin_immediate = begin_immediate
 
+    def label(self) -> str:
+        return _sqlite_job_label(self.process_fn, self.args)
+
     def execute(self, worker: AbstractAioSQLiteDatabase) -> Any:
-        with worker._transact(self.begin_immediate):
-            result = self.process_fn(worker, *self.args)
+        result = worker._execute_transaction(self.begin_immediate, self.process_fn, self.args)
         if self.post_process_fn:
             self.post_process_fn(worker)
         return result
@@ -84,20 +110,581 @@ class AioSQLiteJob(AbstractAioWorkerJob):
         self.post_process_fn = post_process_fn
         self.begin_immediate = begin_immediate
 
+    def label(self) -> str:
+        return _sqlite_job_label(self.process_fn, self.args)
+
     def execute(self, worker: AbstractAioSQLiteDatabase) -> Any:
-        with worker._transact(self.begin_immediate):
-            result = self.process_fn(worker, *self.args)
+        result = worker._execute_transaction(self.begin_immediate, self.process_fn, self.args)
         if self.post_process_fn:
             self.post_process_fn(worker)
         return result
 
 
+_SQLITE_JOB_TYPES = (ThreadSQLiteJob, AioSQLiteJob)
+
+
+def _callback_call(fn: Callable[[], None], _) -> None:
+    fn()  # batch callback adapter, the "future" of the entry is the function to call
+
+
+class _InvalidatingThreadSQLiteJob(ThreadSQLiteJob):
+    """
+    Write job that invalidates the read cache on the event loop after it has been executed.
+    """
+
+    __slots__ = ("loop", "invalidate")
+
+    def __init__(self, process_fn, args, post_process_fn, begin_immediate, loop, invalidate: Callable[[], None]):
+        ThreadSQLiteJob.__init__(self, process_fn, args, post_process_fn, begin_immediate)
+        self.loop = loop
+        self.invalidate = invalidate
+
+    def set_result(self, result):
+        self.loop.call_soon_threadsafe(self.invalidate)
+        ThreadSQLiteJob.set_result(self, result)
+
+    def set_exception(self, exc):
+        self.loop.call_soon_threadsafe(self.invalidate)
+        ThreadSQLiteJob.set_exception(self, exc)
+
+
+class _InvalidatingAioSQLiteJob(AioSQLiteJob):
+    """
+    Write job that invalidates the read cache on the event loop after it has been executed, before the result is
+    delivered.
+    """
+
+    __slots__ = ("invalidate",)
+
+    def __init__(self, future, process_fn, args, post_process_fn, begin_immediate, invalidate: Callable[[], None]):
+        AioSQLiteJob.__init__(self, future, process_fn, args, post_process_fn, begin_immediate)
+        self.invalidate = invalidate
+
+    def set_result(self, result):
+        self.future.get_loop().call_soon_threadsafe(self.invalidate)
+        AioSQLiteJob.set_result(self, result)
+
+    def set_exception(self, exc):
+        self.future.get_loop().call_soon_threadsafe(self.invalidate)
+        AioSQLiteJob.set_exception(self, exc)
+
+    def set_result_batched(self, result, batch: list):
+        batch.append((_callback_call, self.invalidate, None))
+        AioSQLiteJob.set_result_batched(self, result, batch)
+
+    def set_exception_batched(self, exc, batch: list):
+        batch.append((_callback_call, self.invalidate, None))
+        AioSQLiteJob.set_exception_batched(self, exc, batch)
+
+
+def _group_commit_impl(
+    worker: AbstractAioSQLiteDatabase, group: list[Union[AioSQLiteJob, ThreadSQLiteJob]], results: list
+) -> None:
+    results.clear()  # the transaction may be retried
+    for job in group:
+        worker._con.execute("SAVEPOINT group_commit_job")
+        try:
+            result = job.process_fn(worker, *job.args)
+        except Exception as e:
+            worker._con.execute("ROLLBACK TO group_commit_job")
+            worker._con.execute("RELEASE group_commit_job")
+            results.append((job, False, e))
+        else:
+            worker._con.execute("RELEASE group_commit_job")
+            results.append((job, True, result))
+
+
+def _executemany_impl(worker: AbstractAioSQLiteDatabase, sql: str, seq_of_parameters: Iterable[Sequence[Any]]) -> int:
+    return worker._con.executemany(sql, seq_of_parameters).rowcount
+
+
+class _SQLiteStreamState:
+    __slots__ = ("lock", "con", "cursor")
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.con: Optional[sqlite3.Connection] = None
+        self.cursor: Optional[sqlite3.Cursor] = None
+
+
+def _stream_open_impl(
+    worker: AbstractAioSQLiteDatabase, state: _SQLiteStreamState, process_fn: Callable, args, chunk_size: int
+) -> list:
+    with state.lock:
+        con = worker._connect(worker._db_path, check_same_thread=False)
+        state.con = con
+        worker._stream_cons.add(con)
+        try:
+            stream_worker = copy.copy(worker)
+            stream_worker._con = con
+            stream_worker._initialise_reader()
+            con.execute("BEGIN")
+            state.cursor = process_fn(stream_worker, *args)
+            rows = state.cursor.fetchmany(chunk_size)
+        except BaseException:
+            _stream_close(worker, state)
+            raise
+        if len(rows) < chunk_size:
+            _stream_close(worker, state)
+        return rows
+
+
+def _stream_fetch_impl(worker: AbstractAioSQLiteDatabase, state: _SQLiteStreamState, chunk_size: int) -> list:
+    with state.lock:
+        if state.cursor is None:
+            raise Exception("SQLite stream is closed")
+        try:
+            rows = state.cursor.fetchmany(chunk_size)
+        except BaseException:
+            _stream_close(worker, state)
+            raise
+        if len(rows) < chunk_size:
+            _stream_close(worker, state)
+        return rows
+
+
+def _stream_close_impl(worker: AbstractAioSQLiteDatabase, state: _SQLiteStreamState) -> None:
+    with state.lock:
+        _stream_close(worker, state)
+
+
+def _stream_close(worker: AbstractAioSQLiteDatabase, state: _SQLiteStreamState) -> None:
+    con = state.con
+    if con is not None:
+        state.con = state.cursor = None
+        worker._stream_cons.discard(con)
+        con.close()  # the read transaction is rolled back implicitly
+
+
+class AioSQLiteStream:
+    """
+    Async iterator of the rows of a query, see AbstractAioSQLiteDatabase._run_iter_job().
+    The next chunk of rows is only fetched when the current one has been consumed. The stream shall be closed by
+    exhausting it, using it as an async context manager or calling aclose(). When it gets garbage collected, the
+    closing is requested implicitly.
+    """
+
+    __slots__ = ("_db", "_process_fn", "_args", "_chunk_size", "_timeout", "_state", "_rows", "_index", "_finished")
+
+    def __init__(
+        self,
+        db: AbstractAioSQLiteDatabase,
+        process_fn: Callable,
+        args,
+        chunk_size: int,
+        timeout: Optional[float],
+    ):
+        if chunk_size < 1:  # pragma: no cover
+            raise ValueError("SQLite stream 'chunk_size' must be at least one.")
+        self._db = db
+        self._process_fn = process_fn
+        self._args = args
+        self._chunk_size = chunk_size
+        self._timeout = timeout
+        self._state: Optional[_SQLiteStreamState] = None
+        self._rows: list = []
+        self._index = 0
+        self._finished = False
+
+    def __aiter__(self) -> AioSQLiteStream:
+        return self
+
+    async def __anext__(self) -> Any:
+        if self._index >= len(self._rows):
+            if self._finished:
+                raise StopAsyncIteration
+            self._rows = []
+            self._index = 0
+            if self._state is None:
+                self._state = _SQLiteStreamState()
+                args = (self._state, self._process_fn, self._args, self._chunk_size)
+                impl_fn = _stream_open_impl
+            else:
+                args = (self._state, self._chunk_size)
+                impl_fn = _stream_fetch_impl
+            try:
+                rows = await self._run(impl_fn, args)
+            except BaseException:
+                self._finished = True
+                self._request_close()
+                raise
+            if len(rows) < self._chunk_size:
+                self._finished = True
+            if not rows:
+                raise StopAsyncIteration
+            self._rows = rows
+        row = self._rows[self._index]
+        self._index += 1
+        return row
+
+    async def __aenter__(self) -> AioSQLiteStream:
+        return self
+
+    async def __aexit__(self, exc_type, exc_val, exc_tb):
+        await self.aclose()
+
+    async def aclose(self):
+        self._finished = True
+        self._rows = []
+        state = self._state
+        if state is not None and state.con is not None:
+            try:
+                await self._run(_stream_close_impl, (state,))
+            except AttributeError:
+                pass  # the database has been closed, the connection is closed with it
+
+    async def _run(self, impl_fn: Callable, args) -> Any:
+        db = self._db
+        f = db._loop.create_future()
+        job = PartialMethodAioWorkerJob(f, impl_fn, args)
+        queue_attr = "_read_queue" if db._readers else "_request_queue"
+        if not db._put_job(job, self._timeout, 0, queue_attr):
+            await db._put_job_wait(job, True, queue_attr)
+        return await wait_for2.wait_for(f, job.remaining())
+
+    def _request_close(self):
+        state = self._state
+        if state is not None and state.con is not None:
+            db = self._db
+            q = db._read_queue if db._readers else db._request_queue
+            if q is not None:
+                try:
+                    q.put_nowait(PartialMethodThreadWorkerJob(_stream_close_impl, (state,)))
+                except queue.Full:
+                    pass  # the connection will be closed with the database
+
+    def __del__(self):
+        self._request_close()
+
+
+def _is_busy_error(e: sqlite3.OperationalError) -> bool:
+    code = getattr(e, "sqlite_errorcode", None)  # python 3.11+
+    if code is not None:
+        return code & 0xFF in (5, 6)  # SQLITE_BUSY, SQLITE_LOCKED and their extended codes
+    msg = str(e)
+    return "database is locked" in msg or "database table is locked" in msg or "busy" in msg
+
+
+class SQLiteBusyRetry:
+    """
+    Multi-process access policy of the aio-sqlite worker. The connections use a short busy timeout, and the
+    transactions of the jobs are retried as a whole when SQLITE_BUSY is raised, including the cases where SQLite does
+    not call the busy handler, like upgrading a deferred read transaction to write in WAL mode. The process functions
+    must not have side effects outside the database, as they may be executed multiple times.
+
+    The backoff between attempts is randomised (full jitter) up to an exponentially growing cap, which starts from an
+    adaptive base wait: it follows the waits that were needed to get through recent contention, and decays back to the
+    minimum when there is none. The retry timeout defaults to the sqlite_timeout of the database.
+    The contention statistics are available by stats().
+    """
+
+    __slots__ = (
+        "busy_timeout",
+        "retry_timeout",
+        "min_wait",
+        "max_wait",
+        "_lock",
+        "_base",
+        "_busy_errors",
+        "_busy_transactions",
+        "_failures",
+        "_wait_time",
+        "_max_attempts",
+    )
+
+    def __init__(
+        self,
+        busy_timeout: float = 0.005,
+        retry_timeout: Optional[float] = None,
+        min_wait: float = 0.001,
+        max_wait: float = 0.2,
+    ):
+        if not 0.0 < min_wait <= max_wait:  # pragma: no cover
+            raise ValueError("SQLite busy retry waits must be positive and 'min_wait' must not exceed 'max_wait'.")
+        self.busy_timeout = busy_timeout
+        self.retry_timeout = retry_timeout
+        self.min_wait = min_wait
+        self.max_wait = max_wait
+        self._lock = threading.Lock()
+        self._base = min_wait
+        self._busy_errors = 0
+        self._busy_transactions = 0
+        self._failures = 0
+        self._wait_time = 0.0
+        self._max_attempts = 0
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "busy_errors": self._busy_errors,
+                "busy_transactions": self._busy_transactions,
+                "failures": self._failures,
+                "wait_time": self._wait_time,
+                "max_attempts": self._max_attempts,
+                "backoff": self._base,
+            }
+
+    def execute(
+        self, worker: AbstractAioSQLiteDatabase, begin_immediate: bool, process_fn: Callable, args, retry_timeout: float
+    ) -> Any:
+        deadline = None
+        attempt = 0
+        waited = 0.0
+        while True:
+            try:
+                with worker._transact(begin_immediate):
+                    result = process_fn(worker, *args)
+            except sqlite3.OperationalError as e:
+                if not _is_busy_error(e):
+                    raise
+                if worker._con.in_transaction:  # the commit has failed
+                    worker._con.execute("ROLLBACK")
+                now = time.perf_counter()
+                if deadline is None:
+                    deadline = now + retry_timeout
+                attempt += 1
+                with self._lock:
+                    self._busy_errors += 1
+                    if attempt == 1:
+                        self._busy_transactions += 1
+                    if now >= deadline:
+                        self._failures += 1
+                        raise
+                    cap = min(self.max_wait, self._base * (1 << min(attempt - 1, 30)))
+                wait = min(random.uniform(0.0, cap), deadline - now)
+                time.sleep(wait)
+                waited += wait
+                continue
+            if attempt:
+                with self._lock:
+                    self._wait_time += waited
+                    if attempt > self._max_attempts:
+                        self._max_attempts = attempt
+                    self._base = min(self.max_wait, max(self.min_wait, 0.8 * self._base + 0.2 * waited / attempt))
+            elif self._base > self.min_wait:
+                with self._lock:
+                    self._base = max(self.min_wait, self._base * 0.9)
+            return result
+
+
+class SQLiteCheckpointPolicy:
+    """
+    Background WAL checkpoint policy of the aio-sqlite worker. PASSIVE checkpoints are run when the number of rows
+    changed by the worker since the last checkpoint reaches the changes threshold (the standard binding has no access
+    to the WAL page count) or when no writes have been committed for the idle duration. The escalation mode (RESTART
+    or TRUNCATE) is used periodically to reset the WAL, which may wait for the readers up to the busy timeout.
+    Any of these can be disabled by None.
+    """
+
+    __slots__ = ("changes", "idle", "escalate_interval", "escalate_mode")
+
+    def __init__(
+        self,
+        changes: Optional[int] = 1000,
+        idle: Optional[float] = 0.1,
+        escalate_interval: Optional[float] = 60.0,
+        escalate_mode: str = "TRUNCATE",
+    ):
+        if escalate_mode not in ("RESTART", "TRUNCATE"):  # pragma: no cover
+            raise ValueError("SQLite checkpoint 'escalate_mode' must be RESTART or TRUNCATE.")
+        self.changes = changes
+        self.idle = idle
+        self.escalate_interval = escalate_interval
+        self.escalate_mode = escalate_mode
+
+
+class _SQLiteCheckpointState:
+    __slots__ = (
+        "changes",
+        "schema_version",
+        "generation",
+        "checkpointed",
+        "escalated",
+        "last_write",
+        "force",
+        "timer",
+        "waiters",
+    )
+
+    def __init__(self, changes: int, schema_version: int):
+        self.changes = changes  # total changes of the connection at the last checkpoint
+        self.schema_version = schema_version
+        # Committed write transactions are counted, because total_changes does not reflect DDL or the setup.
+        # The state starts with the setup counted as an unchecked write.
+        self.generation = 1
+        self.checkpointed = 0  # generation at the last complete checkpoint
+        self.escalated = 0  # generation at the last complete escalated checkpoint
+        self.last_write = 0.0
+        self.force = False
+        self.timer: Optional[WorkerTimer] = None
+        self.waiters: list[AbstractWorkerJob] = []
+
+
+def _durable_register_impl(worker: AbstractAioSQLiteDatabase, waiter: AbstractWorkerJob) -> None:
+    st = worker._checkpoint_state
+    if st.checkpointed == st.generation:
+        waiter.set_result(None)  # nothing has been written since the last checkpoint
+    else:
+        st.waiters.append(waiter)
+        worker._checkpoint_soon(worker._checkpoint_policy.idle or 0.0)
+
+
+SQLITE_CACHE_MISS = NamedObject("sqlite_cache_miss")
+
+_CacheTags = Union[None, Sequence[Hashable], Callable[..., Sequence[Hashable]]]
+
+
+def _estimate_size(value: Any) -> int:
+    """
+    Shallow estimation of the memory used by a query result, including the rows of a list of tuples.
+    """
+    size = sys.getsizeof(value)
+    if isinstance(value, (list, tuple)):
+        for item in value:
+            size += sys.getsizeof(item)
+            if isinstance(item, tuple):
+                size += sum(sys.getsizeof(v) for v in item)
+    return size
+
+
+def _tag_table(tag: Hashable) -> Hashable:
+    return tag[0] if isinstance(tag, tuple) else tag
+
+
+class SQLiteReadCache:
+    """
+    Read-through cache of the aio-sqlite worker, which is only accessed on the event loop. The entries are keyed by
+    the process function and its arguments, evicted by LRU order, by the entry count and memory bounds and by the TTL.
+
+    Each entry depends on tags, like a table name "xy" or a key of a table ("xy", key). Write jobs declare the tags
+    they invalidate: a table tag invalidates every entry of the table, a key tag invalidates the entries of the key
+    and the table-level entries of the table. The invalidation is applied on the event loop after the write has been
+    executed, before its result is delivered. Results of reads that were in flight during an invalidation of their
+    tables are not stored, which is tracked by the generation counters of the tables.
+
+    The cached results are shared between the callers, so they shall be treated as immutable.
+    """
+
+    __slots__ = (
+        "max_entries",
+        "max_bytes",
+        "ttl",
+        "_entries",
+        "_bytes",
+        "_tables",
+        "_tags",
+        "_generations",
+        "_clear_generation",
+        "hits",
+        "misses",
+        "evictions",
+        "invalidations",
+    )
+
+    def __init__(self, max_entries: int = 1024, max_bytes: Optional[int] = None, ttl: Optional[float] = None):
+        if max_entries < 1:  # pragma: no cover
+            raise ValueError("SQLite cache 'max_entries' must be at least one.")
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.ttl = ttl
+        # key -> (result, size, expiry, tags)
+        self._entries: OrderedDict[Hashable, tuple[Any, int, Optional[float], tuple]] = OrderedDict()
+        self._bytes = 0
+        self._tables: dict[Hashable, set[Hashable]] = {}  # every entry of a table
+        self._tags: dict[Hashable, set[Hashable]] = {}  # entries by exact tag
+        self._generations: dict[Hashable, int] = {}
+        self._clear_generation = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.invalidations = 0
+
+    def stats(self) -> dict:
+        return {
+            "entries": len(self._entries),
+            "bytes": self._bytes,
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "invalidations": self.invalidations,
+        }
+
+    def get(self, key: Hashable) -> Any:
+        """
+        Return the cached result or SQLITE_CACHE_MISS.
+        """
+        entry = self._entries.get(key)
+        if entry is not None:
+            if entry[2] is None or entry[2] > time.perf_counter():
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return entry[0]
+            self._remove(key)
+        self.misses += 1
+        return SQLITE_CACHE_MISS
+
+    def generation(self, tags: tuple) -> tuple:
+        """
+        Snapshot of the generations of the tables of the tags, to be passed to put() with the result.
+        """
+        g = self._generations
+        return self._clear_generation, tuple(g.get(_tag_table(tag), 0) for tag in tags)
+
+    def put(self, key: Hashable, tags: tuple, generation: tuple, result: Any) -> None:
+        if generation != self.generation(tags):
+            return  # invalidated while the read was in flight
+        if key in self._entries:
+            self._remove(key)
+        size = _estimate_size(result)
+        if self.max_bytes is not None and size > self.max_bytes:
+            return
+        self._entries[key] = (result, size, None if self.ttl is None else time.perf_counter() + self.ttl, tags)
+        self._bytes += size
+        for tag in tags:
+            self._tables.setdefault(_tag_table(tag), set()).add(key)
+            self._tags.setdefault(tag, set()).add(key)
+        while len(self._entries) > self.max_entries or (self.max_bytes is not None and self._bytes > self.max_bytes):
+            self._remove(next(iter(self._entries)))
+            self.evictions += 1
+
+    def invalidate(self, tags: Sequence[Hashable]) -> None:
+        for tag in tags:
+            table = _tag_table(tag)
+            self._generations[table] = self._generations.get(table, 0) + 1
+            if isinstance(tag, tuple):
+                keys = set(self._tags.get(tag, ()))
+                keys.update(self._tags.get(table, ()))
+            else:
+                keys = set(self._tables.get(table, ()))
+            for key in keys:
+                self._remove(key)
+            self.invalidations += len(keys)
+
+    def clear(self) -> None:
+        self._clear_generation += 1
+        self._entries.clear()
+        self._bytes = 0
+        self._tables.clear()
+        self._tags.clear()
+
+    def _remove(self, key: Hashable) -> None:
+        _, size, _, tags = self._entries.pop(key)
+        self._bytes -= size
+        for tag in tags:
+            for index, k in ((self._tables, _tag_table(tag)), (self._tags, tag)):
+                keys = index.get(k)
+                if keys is not None:
+                    keys.discard(key)
+                    if not keys:
+                        del index[k]
+
+
 class AbstractAioSQLiteDatabase(AbstractAioWorker):
     """
     Provide a lightweight asyncio compatible, customizable interface to an arbitrary SQLite database in a safe way.
     All SQL connection operations are restricted to be executed on the worker thread, guaranteeing serialization
-    requirements. If more processes would access the database the transaction_mode selector can be used, but job
-    specific transaction handling would be needed for optimal performance.
+    requirements. If more processes would access the database the busy_retry option shall be used, which retries the
+    whole transactions of the jobs on contention, see SQLiteBusyRetry.
 
     Requests shall be implemented like this:
 
@@ -106,14 +693,91 @@ class AbstractAioSQLiteDatabase(AbstractAioWorker):
 
         get_all = partialmethod(AbstractAioSQLiteDatabase._run_job, _get_all_impl)
 
+    With readers configured, read-only requests can be executed in parallel on dedicated reader threads, each with
+    its own connection. This is effective in WAL mode, where readers do not block the writer and each other:
+
+        get_all = partialmethod(AbstractAioSQLiteDatabase._run_read_job, _get_all_impl)
+
+    The reader jobs run on a shallow copy of the database object, where the connection is the reader's own.
+    Without readers the read jobs are executed on the writer connection.
+
+    Bulk statements can be declared with the _run_many_job and _run_many_call methods, which use executemany in a
+    single transaction. The connections cache the prepared statements by SQL text, the size of the cache is tunable by
+    the cached_statements option.
+
+    Large results can be streamed in chunks with the _run_iter_job method, see AioSQLiteStream.
+
+    The group_commit option (requires max_batch) executes the consecutive immediate jobs of a batch in a single
+    transaction, each job in its own savepoint. A failing job only rolls back its own savepoint, while the results of
+    all the jobs in the group are delivered after the shared commit. Jobs with post-process callbacks are executed
+    separately as usual.
+
+    With the cache option the results of read jobs declared with _run_cached_job are cached on the event loop, and the
+    write jobs declare the tags to invalidate by their invalidates argument, see SQLiteReadCache:
+
+        get_xy = partialmethod(
+            AbstractAioSQLiteDatabase._run_cached_job, _get_xy_impl, tags=lambda key: [("xy", key)]
+        )
+        set_xy = partialmethod(
+            AbstractAioSQLiteDatabase._run_job, _set_xy_impl, invalidates=lambda key, value: [("xy", key)]
+        )
+
+    The checkpoint option takes the WAL checkpoints off the critical path of the requests, see SQLiteCheckpointPolicy.
+    Callers requiring durability can await durable() instead of forcing a checkpoint with each request, which resolves
+    when the next complete checkpoint has synced the writes committed before the call.
     """
 
-    __slots__ = ("_con", "_timeout")
+    __slots__ = (
+        "_con",
+        "_timeout",
+        "_cached_statements",
+        "_readers",
+        "_reader_threads",
+        "_read_queue",
+        "_db_path",
+        "_stream_cons",
+        "_group_commit",
+        "_checkpoint_policy",
+        "_checkpoint_state",
+        "_busy_retry",
+        "_cache",
+    )
 
-    def __init__(self, sqlite_db_path: str, sqlite_timeout: float = 60.0):
+    def __init__(
+        self,
+        sqlite_db_path: str,
+        sqlite_timeout: float = 60.0,
+        max_batch: Optional[int] = None,
+        readers: int = 0,
+        group_commit: bool = False,
+        cached_statements: int = 128,
+        priority: bool = False,
+        max_pending: Optional[int] = None,
+        metrics: Optional[AioWorkerMetricsSink] = None,
+        checkpoint: Optional[SQLiteCheckpointPolicy] = None,
+        busy_retry: Optional[SQLiteBusyRetry] = None,
+        cache: Optional[SQLiteReadCache] = None,
+    ):
+        if readers < 0:  # pragma: no cover
+            raise ValueError("SQLite worker 'readers' must not be negative.")
+        if group_commit and max_batch is None:  # pragma: no cover
+            raise ValueError("SQLite worker 'group_commit' requires 'max_batch' to be set.")
         self._con: sqlite3.Connection = None
         self._timeout = sqlite_timeout
-        AbstractAioWorker.__init__(self, (sqlite_db_path,))
+        self._cached_statements = cached_statements
+        self._readers = readers
+        self._group_commit = group_commit
+        self._reader_threads: list[AioWorkerThread] = []
+        self._read_queue: queue.Queue = None
+        self._db_path: str = None
+        self._stream_cons: set[sqlite3.Connection] = set()
+        self._checkpoint_policy = checkpoint
+        self._checkpoint_state: Optional[_SQLiteCheckpointState] = None
+        self._busy_retry = busy_retry
+        self._cache = cache
+        AbstractAioWorker.__init__(
+            self, (sqlite_db_path,), max_batch=max_batch, priority=priority, max_pending=max_pending, metrics=metrics
+        )
 
     def start(
         self,
@@ -124,38 +788,221 @@ class AbstractAioSQLiteDatabase(AbstractAioWorker):
     ):
         if args is not None:  # pragma: no cover
             raise ValueError("SQLite worker does not support custom args at start.")
+        if self._readers:
+            self._read_queue = self._create_queue()
         AbstractAioWorker.start(self, None, callback, daemon, name_prefix)
 
     def _thread_init(self, db_path: str):
-        self._con = sqlite3.connect(db_path, timeout=self._timeout, isolation_level=None)
+        self._db_path = db_path
+        self._con = self._connect(db_path)
         # initialise the db
         self._initialise()
-        with self._transact(begin_immediate=True):
-            self._setup()
+        self._execute_transaction(True, type(self)._setup, ())
+        # start the readers when the database is ready
+        if self._readers:
+            q = self._read_queue
+            for i in range(self._readers):
+                t = AioWorkerThread(copy.copy(self), type(self)._thread_init_reader, type(self)._thread_cleanup_reader)
+                t.start((q, db_path), name_prefix=f"{self.__class__.__name__}-reader-{i}")
+                self._reader_threads.append(t)
+            for t in self._reader_threads:
+                if not t.wait_initialised():
+                    raise Exception(f"SQLite reader could not start for {self.__class__.__name__}")
+        # the checkpoint state is specific to the writer, the readers have been copied without it
+        policy = self._checkpoint_policy
+        if policy is not None:
+            schema_version = self._con.execute("PRAGMA schema_version").fetchone()[0]
+            self._checkpoint_state = _SQLiteCheckpointState(self._con.total_changes, schema_version)
+            if policy.escalate_interval is not None:
+                self._thread_schedule(self._checkpoint_escalate, policy.escalate_interval, policy.escalate_interval)
 
     def _thread_poll(self):
         pass  # Not used.
 
     def _thread_cleanup(self):
+        # notify the durability waiters
+        st = self._checkpoint_state
+        if st is not None:
+            self._checkpoint_state = None
+            for waiter in st.waiters:
+                waiter.cancel()
+        # stop the readers
+        q = self._read_queue
+        if q is not None:
+            self._read_queue = None
+            stop_aio_worker_threads(q, self._reader_threads)
+        # close the connections of the unfinished streams
+        for con in list(self._stream_cons):
+            self._stream_cons.discard(con)
+            con.close()
         # close the database
         con = self._con
         self._con = None
         if con:
             con.close()
 
+    def _connect(self, db_path: str, check_same_thread: bool = True) -> sqlite3.Connection:
+        return sqlite3.connect(
+            db_path,
+            timeout=self._timeout if self._busy_retry is None else self._busy_retry.busy_timeout,
+            isolation_level=None,
+            check_same_thread=check_same_thread,
+            cached_statements=self._cached_statements,
+        )
+
+    def _thread_init_reader(self, db_path: str):
+        """
+        Executed on the reader thread with the copy of the database object.
+        """
+        self._con = self._connect(db_path)
+        self._initialise_reader()
+
+    def _thread_cleanup_reader(self):
+        con = self._con
+        self._con = None
+        if con:
+            con.close()
+
     @contextmanager
     def _transact(self, begin_immediate: bool):
         if begin_immediate:
             self._con.execute("BEGIN IMMEDIATE")
         else:
             self._con.execute("BEGIN")
+        st = self._checkpoint_state
+        if st is not None:
+            changes = self._con.total_changes
         try:
             yield
         except BaseException:
             self._con.execute("ROLLBACK")
             raise
         else:
+            if st is None:
+                self._con.execute("COMMIT")
+                return
+            # the schema changes are not counted in the total changes, the schema version tells about them
+            schema_version = self._con.execute("PRAGMA schema_version").fetchone()[0]
             self._con.execute("COMMIT")
+            if self._con.total_changes != changes or schema_version != st.schema_version:
+                st.schema_version = schema_version
+                self._checkpoint_committed()
+
+    def _execute_transaction(self, begin_immediate: bool, process_fn: Callable, args) -> Any:
+        """
+        Execute the process function in a transaction, retried on contention by the busy_retry policy if configured.
+        """
+        if self._busy_retry is None:
+            with self._transact(begin_immediate):
+                return process_fn(self, *args)
+        busy_retry = self._busy_retry
+        retry_timeout = self._timeout if busy_retry.retry_timeout is None else busy_retry.retry_timeout
+        return busy_retry.execute(self, begin_immediate, process_fn, args, retry_timeout)
+
+    def _checkpoint_committed(self):
+        """
+        Trigger the background checkpoint by the policy after a write has been committed.
+        """
+        st = self._checkpoint_state
+        st.generation += 1
+        st.last_write = time.perf_counter()
+        policy = self._checkpoint_policy
+        if policy.changes is not None and self._con.total_changes - st.changes >= policy.changes:
+            st.force = True
+            self._checkpoint_soon(0.0)
+        elif policy.idle is not None and st.timer is None:
+            self._checkpoint_soon(policy.idle)
+
+    def _checkpoint_soon(self, delay: float):
+        st = self._checkpoint_state
+        when = time.perf_counter() + delay
+        if st.timer is not None:
+            if st.timer.when <= when:
+                return
+            st.timer.cancel()
+        st.timer = self._thread_schedule(self._checkpoint_timer, delay)
+
+    def _checkpoint_timer(self):
+        st = self._checkpoint_state
+        st.timer = None
+        idle = self._checkpoint_policy.idle
+        if not st.force and not st.waiters and idle is not None:
+            remaining = st.last_write + idle - time.perf_counter()
+            if remaining > 0.0:  # written since the timer was scheduled
+                st.timer = self._thread_schedule(self._checkpoint_timer, remaining)
+                return
+        self._checkpoint_background("PASSIVE")
+
+    def _checkpoint_escalate(self):
+        st = self._checkpoint_state
+        if st.escalated != st.generation:
+            self._checkpoint_background(self._checkpoint_policy.escalate_mode)
+
+    def _checkpoint_background(self, mode: str):
+        """
+        Run the checkpoint and resolve the durability waiters if it was complete, otherwise retry for them later.
+        """
+        st = self._checkpoint_state
+        st.force = False
+        try:
+            busy, log, checkpointed = self._con.execute(f"PRAGMA wal_checkpoint({mode});").fetchall()[0]
+        except sqlite3.OperationalError:
+            busy, log, checkpointed = 1, 0, 0
+        st.changes = self._con.total_changes
+        complete = busy == 0 and log == checkpointed
+        if complete:
+            st.checkpointed = st.generation
+            if mode != "PASSIVE":
+                st.escalated = st.generation
+        if st.waiters:
+            if complete:
+                waiters = st.waiters
+                st.waiters = []
+                for waiter in waiters:
+                    waiter.set_result(None)
+            else:
+                self._checkpoint_soon(self._checkpoint_policy.idle or 0.01)
+
+    def _thread_execute_batch(self, jobs: list[AbstractWorkerJob], batch: list) -> None:
+        if not self._group_commit:
+            return AbstractAioWorker._thread_execute_batch(self, jobs, batch)
+        group = []
+        for job in jobs:
+            if job.obsolete():  # Could have been cancelled or timed out before we got to it.
+                continue
+            if isinstance(job, _SQLITE_JOB_TYPES) and job.begin_immediate and job.post_process_fn is None:
+                group.append(job)
+                continue
+            if group:
+                self._thread_execute_group(group, batch)
+                group = []
+            try:
+                job.set_result_batched(job.execute(self), batch)
+            except Exception as e:
+                job.set_exception_batched(e, batch)
+        if group:
+            self._thread_execute_group(group, batch)
+
+    def _thread_execute_group(self, group: list[Union[AioSQLiteJob, ThreadSQLiteJob]], batch: list) -> None:
+        if len(group) == 1:
+            job = group[0]
+            try:
+                job.set_result_batched(job.execute(self), batch)
+            except Exception as e:
+                job.set_exception_batched(e, batch)
+            return
+        results = []
+        try:
+            self._execute_transaction(True, _group_commit_impl, (group, results))
+        except Exception as e:
+            for job in group:
+                job.set_exception_batched(e, batch)
+            return
+        for job, ok, value in results:
+            if ok:
+                job.set_result_batched(value, batch)
+            else:
+                job.set_exception_batched(value, batch)
 
     async def _run_job(
         self,
@@ -164,6 +1011,9 @@ class AbstractAioSQLiteDatabase(AbstractAioWorker):
         post_process_fn: Optional[Callable] = None,
         begin_immediate: bool = True,
         timeout: Optional[float] = None,
+        priority: int = 0,
+        wait: bool = True,
+        invalidates: _CacheTags = None,
     ):
         """
         This is designed to be used as
@@ -175,8 +1025,14 @@ class AbstractAioSQLiteDatabase(AbstractAioWorker):
         This will raise AttributeError if the database has been closed.
         """
         f = self._loop.create_future()
-        self._request_queue.put_nowait(AioSQLiteJob(f, process_fn, args, post_process_fn, begin_immediate))
-        return await wait_for2.wait_for(f, timeout)
+        invalidate = self._cache_invalidate(invalidates, args)
+        if invalidate is None:
+            job = AioSQLiteJob(f, process_fn, args, post_process_fn, begin_immediate)
+        else:
+            job = _InvalidatingAioSQLiteJob(f, process_fn, args, post_process_fn, begin_immediate, invalidate)
+        if not self._put_job(job, timeout, priority):
+            await self._put_job_wait(job, wait)
+        return await wait_for2.wait_for(f, job.remaining())
 
     def _run_call(
         self,
@@ -185,6 +1041,9 @@ class AbstractAioSQLiteDatabase(AbstractAioWorker):
         post_process_fn: Optional[Callable] = None,
         begin_immediate: bool = True,
         timeout: Optional[float] = None,
+        priority: int = 0,
+        wait: bool = True,
+        invalidates: _CacheTags = None,
     ):
         """
         This is designed to be used as
@@ -195,9 +1054,174 @@ class AbstractAioSQLiteDatabase(AbstractAioWorker):
         passed by the worker thread to make it work.
         This will raise AttributeError if the database has been closed.
         """
-        job = ThreadSQLiteJob(process_fn, args, post_process_fn, begin_immediate)
-        self._request_queue.put_nowait(job)
-        return job.get_result(timeout)
+        invalidate = self._cache_invalidate(invalidates, args)
+        if invalidate is None:
+            job = ThreadSQLiteJob(process_fn, args, post_process_fn, begin_immediate)
+        else:
+            job = _InvalidatingThreadSQLiteJob(
+                process_fn, args, post_process_fn, begin_immediate, self._loop, invalidate
+            )
+        if not self._put_job(job, timeout, priority):
+            self._put_job_block(job, wait)
+        return job.get_result(job.remaining())
+
+    async def _run_many_job(
+        self,
+        sql: str,
+        seq_of_parameters: Iterable[Sequence[Any]],
+        *,
+        timeout: Optional[float] = None,
+        priority: int = 0,
+        wait: bool = True,
+        invalidates: _CacheTags = None,
+    ):
+        """
+        Execute the statement for all parameters in a single immediate transaction and return the affected row count.
+        This is designed to declare bulk statements like
+
+            insert_xy_many = partialmethod(AbstractAioSQLiteDatabase._run_many_job, "INSERT INTO xy VALUES (?, ?)")
+
+        The parameters are consumed on the worker thread, so a lazy iterable shall not depend on the event loop.
+        With callable invalidates an iterable of parameters is collected into a list before queueing the job.
+        This will raise AttributeError if the database has been closed.
+        """
+        f = self._loop.create_future()
+        if callable(invalidates) and not isinstance(seq_of_parameters, Sequence):
+            seq_of_parameters = list(seq_of_parameters)  # the rows are iterated by the invalidation tags as well
+        invalidate = self._cache_invalidate(invalidates, (seq_of_parameters,))
+        if invalidate is None:
+            job = AioSQLiteJob(f, _executemany_impl, (sql, seq_of_parameters), None, True)
+        else:
+            job = _InvalidatingAioSQLiteJob(f, _executemany_impl, (sql, seq_of_parameters), None, True, invalidate)
+        if not self._put_job(job, timeout, priority):
+            await self._put_job_wait(job, wait)
+        return await wait_for2.wait_for(f, job.remaining())
+
+    def _run_many_call(
+        self,
+        sql: str,
+        seq_of_parameters: Iterable[Sequence[Any]],
+        *,
+        timeout: Optional[float] = None,
+        priority: int = 0,
+        wait: bool = True,
+        invalidates: _CacheTags = None,
+    ):
+        """
+        Execute the statement for all parameters in a single immediate transaction and return the affected row count.
+        This is designed to declare bulk statements like
+
+            insert_xy_many = partialmethod(AbstractAioSQLiteDatabase._run_many_call, "INSERT INTO xy VALUES (?, ?)")
+
+        This will raise AttributeError if the database has been closed.
+        """
+        if callable(invalidates) and not isinstance(seq_of_parameters, Sequence):
+            seq_of_parameters = list(seq_of_parameters)  # the rows are iterated by the invalidation tags as well
+        invalidate = self._cache_invalidate(invalidates, (seq_of_parameters,))
+        if invalidate is None:
+            job = ThreadSQLiteJob(_executemany_impl, (sql, seq_of_parameters), None, True)
+        else:
+            job = _InvalidatingThreadSQLiteJob(
+                _executemany_impl, (sql, seq_of_parameters), None, True, self._loop, invalidate
+            )
+        if not self._put_job(job, timeout, priority):
+            self._put_job_block(job, wait)
+        return job.get_result(job.remaining())
+
+    async def _run_read_job(
+        self, process_fn: Callable, *args, timeout: Optional[float] = None, priority: int = 0, wait: bool = True
+    ):
+        """
+        This is designed to be used as
+
+            get_xy = partialmethod(AbstractAioSQLiteDatabase._run_read_job, _get_xy_impl)
+
+        The job is executed in a deferred transaction by one of the readers, or by the writer if there are none.
+        This will raise AttributeError if the database has been closed.
+        """
+        f = self._loop.create_future()
+        job = AioSQLiteJob(f, process_fn, args, None, False)
+        queue_attr = "_read_queue" if self._readers else "_request_queue"
+        if not self._put_job(job, timeout, priority, queue_attr):
+            await self._put_job_wait(job, wait, queue_attr)
+        return await wait_for2.wait_for(f, job.remaining())
+
+    def _run_read_call(
+        self, process_fn: Callable, *args, timeout: Optional[float] = None, priority: int = 0, wait: bool = True
+    ):
+        """
+        This is designed to be used as
+
+            get_xy = partialmethod(AbstractAioSQLiteDatabase._run_read_call, _get_xy_impl)
+
+        The job is executed in a deferred transaction by one of the readers, or by the writer if there are none.
+        This will raise AttributeError if the database has been closed.
+        """
+        job = ThreadSQLiteJob(process_fn, args, None, False)
+        queue_attr = "_read_queue" if self._readers else "_request_queue"
+        if not self._put_job(job, timeout, priority, queue_attr):
+            self._put_job_block(job, wait, queue_attr)
+        return job.get_result(job.remaining())
+
+    async def _run_cached_job(
+        self,
+        process_fn: Callable,
+        *args,
+        tags: _CacheTags = (),
+        timeout: Optional[float] = None,
+        priority: int = 0,
+        wait: bool = True,
+    ):
+        """
+        Read job with its result cached by the process function and the arguments, which must be hashable.
+        This is designed to be used as
+
+            get_xy = partialmethod(AbstractAioSQLiteDatabase._run_cached_job, _get_xy_impl, tags=["xy"])
+
+        The tags can be a callable, which returns the tags for the arguments of the call. Cache hits are returned
+        without involving the worker thread. Without the cache option this is the same as _run_read_job.
+        This will raise AttributeError if the database has been closed.
+        """
+        cache = self._cache
+        if cache is None:
+            return await self._run_read_job(process_fn, *args, timeout=timeout, priority=priority, wait=wait)
+        key = (process_fn, args)
+        result = cache.get(key)
+        if result is SQLITE_CACHE_MISS:
+            tags = tuple(tags(*args) if callable(tags) else tags)
+            generation = cache.generation(tags)
+            result = await self._run_read_job(process_fn, *args, timeout=timeout, priority=priority, wait=wait)
+            cache.put(key, tags, generation, result)
+        return result
+
+    def _cache_invalidate(self, invalidates: _CacheTags, args) -> Optional[Callable[[], None]]:
+        """
+        Prepare the invalidation callback of a write job if necessary.
+        """
+        if invalidates is None or self._cache is None:
+            return None
+        return partial(self._cache.invalidate, tuple(invalidates(*args) if callable(invalidates) else invalidates))
+
+    def _run_iter_job(
+        self, process_fn: Callable, *args, chunk_size: int = 256, timeout: Optional[float] = None
+    ) -> AioSQLiteStream:
+        """
+        The process function shall return a cursor of a query, which rows will be streamed by the returned async
+        iterator. This is designed to be used as
+
+            def _iter_xy_impl(self):
+                return self._con.execute("SELECT x FROM y")
+
+            iter_xy = partialmethod(AbstractAioSQLiteDatabase._run_iter_job, _iter_xy_impl)
+
+            async for row in db.iter_xy():
+                ...
+
+        The stream has its own connection and deferred transaction for its whole lifetime. The rows are fetched in
+        chunks by the readers (or the writer if there are none) only when the consumer needs the next one.
+        The timeout applies to each fetch.
+        """
+        return AioSQLiteStream(self, process_fn, args, chunk_size, timeout)
 
     def _initialise(self):
         """
@@ -215,12 +1239,56 @@ class AbstractAioSQLiteDatabase(AbstractAioWorker):
         self._con.execute("PRAGMA journal_mode = WAL;")
         self._con.execute("PRAGMA synchronous = NORMAL;")
 
+    def _initialise_reader(self):
+        """
+        The reader connection is ready, pragma definitions for it shall be done here.
+        By default the connection is restricted to queries.
+
+        NOTE: Current execution is not inside a transaction!
+        """
+        self._con.execute("PRAGMA query_only = ON;")
+
     def _setup(self):
         """
         The connection is ready and the database initialization like schema shall be done.
         """
         raise NotImplementedError()
 
+    def pending(self) -> int:
+        """
+        Get the number of jobs waiting in the request queue and the queue of the readers.
+        """
+        q = self._read_queue
+        return AbstractAioWorker.pending(self) + (0 if q is None else q.qsize())
+
+    async def durable(self, timeout: Optional[float] = None) -> None:
+        """
+        Wait until the writes committed before the call are synced by the next complete background checkpoint.
+        Requires the checkpoint policy to be configured.
+        This will raise AttributeError if the database has been closed.
+        """
+        if self._checkpoint_policy is None:  # pragma: no cover
+            raise RuntimeError("Durability barrier requires the checkpoint policy.")
+        waiter = AbstractAioWorkerJob(self._loop.create_future())
+        f = self._loop.create_future()
+        job = PartialMethodAioWorkerJob(f, _durable_register_impl, (waiter,))
+        if not self._put_job(job, timeout):
+            await self._put_job_wait(job)
+        await wait_for2.wait_for(asyncio.gather(f, waiter.future), job.remaining())
+
+    def durable_call(self, timeout: Optional[float] = None) -> None:
+        """
+        Thread-caller variant of durable().
+        """
+        if self._checkpoint_policy is None:  # pragma: no cover
+            raise RuntimeError("Durability barrier requires the checkpoint policy.")
+        waiter = AbstractThreadWorkerJob()
+        job = PartialMethodThreadWorkerJob(_durable_register_impl, (waiter,))
+        if not self._put_job(job, timeout):
+            self._put_job_block(job)
+        job.get_result(job.remaining())
+        waiter.get_result(job.remaining())
+
     def _checkpoint(self):
         """
         Use in WAL mode with NORMAL synchronous operation to ensure writes are synced to storage!
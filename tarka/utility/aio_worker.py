@@ -1,6 +1,9 @@
 from __future__ import annotations
 
 import asyncio
+import copy
+import heapq
+import itertools
 import queue
 import threading
 import time
@@ -23,14 +26,150 @@ def _callback_exception(future: asyncio.Future, exc):
         future.set_exception(exc)
 
 
-class AbstractWorkerJob:
+def _callback_batch(callbacks: list[tuple[Callable[[asyncio.Future, Any], None], asyncio.Future, Any]]):
+    for fn, future, value in callbacks:
+        fn(future, value)
+
+
+def _queue_get_batch(
+    q: queue.Queue, first: Any, max_items: int, share: int = 1
+) -> tuple[list[AbstractWorkerJob], bool]:
+    """
+    Take the already received first item and every other pending item up to the limit in one locked operation.
+    The pending items can be shared between multiple consumers, then only the proportional amount will be taken.
+    Items after a stop signal are left in the queue. Return the jobs and whether the stop signal was received.
+    """
+    if not isinstance(first, AbstractWorkerJob):
+        return [], True
+    jobs = [first]
+    stop = False
+    with q.mutex:
+        if share > 1:
+            max_items = min(max_items, 1 + q._qsize() // share)
+        while len(jobs) < max_items and q._qsize():
+            item = q._get()
+            if not isinstance(item, AbstractWorkerJob):
+                stop = True
+                break
+            jobs.append(item)
+        removed = len(jobs) - 1 + stop
+        if removed:
+            q.not_full.notify(removed)
+    return jobs, stop
+
+
+def _queue_put_force(q: queue.Queue, item: Any) -> None:
+    """
+    Put the item into the queue even if it is full. Used for control signals.
+    """
+    with q.mutex:
+        q._put(item)
+        q.unfinished_tasks += 1
+        q.not_empty.notify()
+
+
+def _queue_cancel_pending(q: queue.Queue) -> None:
+    try:
+        while True:
+            job = q.get_nowait()
+            if isinstance(job, AbstractWorkerJob):
+                job.cancel()
+    except queue.Empty:
+        pass
+
+
+class AioWorkerMetricsSink:
+    """
+    Receives the timings of the jobs executed by aio workers that have a sink configured. The methods are called from
+    the worker and caller threads concurrently, implementations must be thread-safe.
+    The label identifies the implementation of the job, like the qualified name of the wrapped function.
+    """
+
     __slots__ = ()
 
+    def record_job(self, label: str, queue_wait: float, execute: float, delivery: float) -> None:
+        """
+        Called when the result of a job has been delivered. The durations are in seconds.
+        """
+        raise NotImplementedError()
+
+    def record_depth(self, depth: int) -> None:
+        """
+        Called when the worker takes jobs from its queue, with the number of jobs left pending, see pending().
+        """
+        raise NotImplementedError()
+
+
+class _JobTimings:
+    __slots__ = ("sink", "label", "enqueued", "dequeued", "completed")
+
+    def __init__(self, sink: AioWorkerMetricsSink, label: str):
+        self.sink = sink
+        self.label = label
+        self.enqueued = time.perf_counter()
+        self.dequeued: Optional[float] = None
+        self.completed: Optional[float] = None
+
+    def deliver(self, *_) -> None:
+        if self.completed is not None:  # not executed, cancelled or timed out
+            self.sink.record_job(
+                self.label,
+                self.dequeued - self.enqueued,
+                self.completed - self.dequeued,
+                time.perf_counter() - self.completed,
+            )
+
+
+class AioWorkerOverloadError(Exception):
+    """
+    The job could not be queued, because the request queue of the worker is full.
+    """
+
+
+class AbstractWorkerJob:
+    """
+    The priority orders the jobs in a priority queue, lower values are executed first.
+    The deadline is a time.perf_counter() value, after which the job shall not be executed anymore.
+    The timings are only tracked if the worker has a metrics sink configured.
+    """
+
+    __slots__ = ("priority", "deadline", "timings")
+
     execute: Callable[[AbstractAioWorker], Any]
 
+    def __init__(self):
+        self.priority = 0
+        self.deadline: Optional[float] = None
+        self.timings: Optional[_JobTimings] = None
+
+    def label(self) -> str:
+        """
+        Identify the implementation of the job for metrics.
+        """
+        return self.__class__.__qualname__
+
+    def remaining(self) -> Optional[float]:
+        """
+        Get the time left until the deadline, None if there is no deadline.
+        """
+        return None if self.deadline is None else max(0.0, self.deadline - time.perf_counter())
+
+    def track(self, sink: AioWorkerMetricsSink) -> None:
+        """
+        Start tracking the timings of the job upon queueing it.
+        """
+        self.timings = _JobTimings(sink, self.label())
+
     def done(self) -> bool:
         raise NotImplementedError()
 
+    def obsolete(self) -> bool:
+        """
+        Determine if the job is done (likely cancelled) or its deadline has passed before it could be executed.
+        Expired jobs are not cancelled by the worker, the waiter side handles the timeout.
+        """
+        return self.done() or (self.deadline is not None and self.deadline < time.perf_counter())
+
     def cancel(self):
         raise NotImplementedError()
 
@@ -40,9 +179,49 @@ class AbstractWorkerJob:
     def set_exception(self, exc):
         raise NotImplementedError()
 
+    def set_result_batched(self, result, batch: list):
+        """
+        Used by batched execution, the result may be collected into the batch to be delivered at once.
+        """
+        self.set_result(result)
+
+    def set_exception_batched(self, exc, batch: list):
+        """
+        Used by batched execution, the exception may be collected into the batch to be delivered at once.
+        """
+        self.set_exception(exc)
+
+
+_completion_locks = threading.local()
+
+
+def _take_completion_lock() -> threading.Lock:
+    """
+    Get an acquired lock from the pool of the calling thread, or allocate a new one.
+    """
+    try:
+        return _completion_locks.pool.pop()
+    except (AttributeError, IndexError):
+        lock = threading.Lock()
+        lock.acquire()
+        return lock
+
+
+def _return_completion_lock(lock: threading.Lock) -> None:
+    try:
+        _completion_locks.pool.append(lock)
+    except AttributeError:
+        _completion_locks.pool = [lock]
+
 
 class AbstractThreadWorkerJob(AbstractWorkerJob):
-    __slots__ = ("event", "result", "state")
+    """
+    The caller thread waits for the completion by acquiring a lock that is released by the worker. The locks are
+    reused from a pool of the caller thread, so a call does not allocate synchronization primitives, unless the wait
+    is abandoned by a timeout or cancellation, in which case the lock can not be reused safely.
+    """
+
+    __slots__ = ("lock", "result", "state")
 
     STATE_WAIT = 0
     STATE_RESULT = 1
@@ -50,7 +229,8 @@ class AbstractThreadWorkerJob(AbstractWorkerJob):
     STATE_CANCEL = 3
 
     def __init__(self):
-        self.event = threading.Event()
+        AbstractWorkerJob.__init__(self)
+        self.lock = _take_completion_lock()
         self.result = None
         self.state = self.STATE_WAIT
 
@@ -60,22 +240,37 @@ class AbstractThreadWorkerJob(AbstractWorkerJob):
     def cancel(self):
         if self.state == self.STATE_WAIT:
             self.state = self.STATE_CANCEL
-            self.event.set()
+            self._wake()
 
     def set_result(self, result):
+        if self.timings is not None:
+            self.timings.completed = time.perf_counter()
         self.result = result
         self.state = self.STATE_RESULT
-        self.event.set()
+        self._wake()
 
     def set_exception(self, exc):
+        if self.timings is not None:
+            self.timings.completed = time.perf_counter()
         self.result = exc
         self.state = self.STATE_EXCEPTION
-        self.event.set()
+        self._wake()
+
+    def _wake(self):
+        try:
+            self.lock.release()
+        except RuntimeError:
+            pass  # already released by a concurrent cancellation, the lock has been abandoned
 
     def get_result(self, timeout=None):
-        if not self.event.wait(timeout):
-            self.cancel()
-            raise TimeoutError
+        if self.state != self.STATE_CANCEL:
+            if not self.lock.acquire(timeout=-1 if timeout is None else timeout):
+                self.cancel()
+                raise TimeoutError
+            if self.state != self.STATE_CANCEL:
+                _return_completion_lock(self.lock)  # released exactly once by the worker
+        if self.timings is not None:
+            self.timings.deliver()
         if self.state == self.STATE_WAIT:
             raise Exception("Job result is not set")
         elif self.state == self.STATE_CANCEL:
@@ -95,6 +290,9 @@ class PartialMethodThreadWorkerJob(AbstractThreadWorkerJob):
         self.impl_fn = impl_fn
         self.args = args
 
+    def label(self) -> str:
+        return self.impl_fn.__qualname__
+
     def execute(self, worker: AbstractAioWorker) -> Any:
         return self.impl_fn(worker, *self.args)
 
@@ -103,6 +301,7 @@ class AbstractAioWorkerJob(AbstractWorkerJob):
     __slots__ = ("future",)
 
     def __init__(self, future: asyncio.Future):
+        AbstractWorkerJob.__init__(self)
         self.future = future
 
     def done(self) -> bool:
@@ -111,12 +310,30 @@ class AbstractAioWorkerJob(AbstractWorkerJob):
     def cancel(self):
         return self.future.cancel()
 
+    def track(self, sink: AioWorkerMetricsSink) -> None:
+        AbstractWorkerJob.track(self, sink)
+        self.future.add_done_callback(self.timings.deliver)
+
     def set_result(self, result):
+        if self.timings is not None:
+            self.timings.completed = time.perf_counter()
         self.future.get_loop().call_soon_threadsafe(_callback_result, self.future, result)
 
     def set_exception(self, exc):
+        if self.timings is not None:
+            self.timings.completed = time.perf_counter()
         self.future.get_loop().call_soon_threadsafe(_callback_exception, self.future, exc)
 
+    def set_result_batched(self, result, batch: list):
+        if self.timings is not None:
+            self.timings.completed = time.perf_counter()
+        batch.append((_callback_result, self.future, result))
+
+    def set_exception_batched(self, exc, batch: list):
+        if self.timings is not None:
+            self.timings.completed = time.perf_counter()
+        batch.append((_callback_exception, self.future, exc))
+
 
 class PartialMethodAioWorkerJob(AbstractAioWorkerJob):
     __slots__ = ("impl_fn", "args")
@@ -126,6 +343,9 @@ class PartialMethodAioWorkerJob(AbstractAioWorkerJob):
         self.impl_fn = impl_fn
         self.args = args
 
+    def label(self) -> str:
+        return self.impl_fn.__qualname__
+
     def execute(self, worker: AbstractAioWorker) -> Any:
         return self.impl_fn(worker, *self.args)
 
@@ -133,7 +353,29 @@ class PartialMethodAioWorkerJob(AbstractAioWorkerJob):
 _ClsT = TypeVar("_ClsT")
 
 
+class WorkerTimer:
+    """
+    Handle of a callback scheduled on the worker thread. The period is None for one-shot timers.
+    Cancellation is thread-safe, the cancelled timer is dropped when it would be due.
+    """
+
+    __slots__ = ("fn", "when", "period", "cancelled")
+
+    def __init__(self, fn: Callable[[], Any], when: float, period: Optional[float]):
+        self.fn = fn
+        self.when = when
+        self.period = period
+        self.cancelled = False
+
+    def cancel(self) -> None:
+        self.cancelled = True
+
+
 class PollTimedQueue(queue.Queue):
+    """
+    Deprecated, the aio worker schedules the polling by a timer instead.
+    """
+
     def __init__(self, poll_timeout: float, maxsize=0):
         self.poll_timeout = poll_timeout
         self.next_poll = time.perf_counter() + self.poll_timeout
@@ -150,12 +392,67 @@ class PollTimedQueue(queue.Queue):
             raise
 
 
+class PriorityJobQueue(queue.Queue):
+    """
+    Queue of jobs ordered by their priority, FIFO within the same priority. Other items (like the stop signal) are
+    ordered after every job, so the queued work is drained before stopping like with the FIFO queue.
+    """
+
+    def _init(self, maxsize):
+        self.queue = []
+        self._counter = itertools.count()
+
+    def _qsize(self):
+        return len(self.queue)
+
+    def _put(self, item):
+        heapq.heappush(
+            self.queue,
+            (item.priority if isinstance(item, AbstractWorkerJob) else float("inf"), next(self._counter), item),
+        )
+
+    def _get(self):
+        return heapq.heappop(self.queue)[2]
+
+
 class AbstractAioWorker(AbstractThread):
     """
     A lightweight asyncio compatible, customizable interface to an arbitrary thread worker.
+
+    With max_batch configured the worker takes every pending job (up to the limit) from the queue at once, executes
+    them and delivers the results of the asyncio jobs to the event loop in a single callback. This saves the per-job
+    wake-up of the event loop under heavy load, while the limit keeps the latency of the results bounded.
+    NOTE: Batched delivery assumes the asyncio jobs belong to the loop of the worker.
+
+    With the priority option the jobs are executed in the order of their priority (lower first) instead of FIFO.
+    The timeout of a job is also its deadline, so the worker skips the job if the waiter has already timed out.
+
+    With max_pending configured the request queue is bounded. When it is full, the asyncio submitters wait for free
+    capacity without blocking the loop and the thread submitters block. Submitting with wait=False raises an
+    AioWorkerOverloadError instead. The pending() method tells the current depth of the queue to help shed load.
+
+    Periodic or one-shot duties can be scheduled on the worker thread with _thread_schedule(). The thread sleeps
+    until the next timer is due or a job arrives. The poll_timeout option schedules _thread_poll() periodically.
+
+    With a metrics sink configured the jobs are timestamped at queueing, execution start, completion and delivery of
+    the result, and the sink receives the queue wait, execute and delivery durations labelled by the implementation.
+    Without the sink the jobs are not tracked.
     """
 
-    __slots__ = ("_loop", "_poll_timeout", "_request_queue", "started", "closed")
+    __slots__ = (
+        "_loop",
+        "_poll_timeout",
+        "_max_batch",
+        "_priority",
+        "_max_pending",
+        "_capacity_waiters",
+        "_metrics",
+        "_timers",
+        "_timer_counter",
+        "_request_queue",
+        "started",
+        "closed",
+    )
 
     @classmethod
     @asynccontextmanager
@@ -171,11 +468,30 @@ class AbstractAioWorker(AbstractThread):
         finally:
             self.stop()
 
-    def __init__(self, args: Optional[Sequence[Any]] = None, poll_timeout: Optional[float] = None):
+    def __init__(
+        self,
+        args: Optional[Sequence[Any]] = None,
+        poll_timeout: Optional[float] = None,
+        max_batch: Optional[int] = None,
+        priority: bool = False,
+        max_pending: Optional[int] = None,
+        metrics: Optional[AioWorkerMetricsSink] = None,
+    ):
         if poll_timeout is not None and poll_timeout <= 0.0:  # pragma: no cover
             raise ValueError("Aio worker 'poll_timeout' must be greater than zero or None.")
+        if max_pending is not None and max_pending < 1:  # pragma: no cover
+            raise ValueError("Aio worker 'max_pending' must be at least one or None.")
+        if max_batch is not None and max_batch < 1:  # pragma: no cover
+            raise ValueError("Aio worker 'max_batch' must be at least one or None.")
         self._loop = asyncio.get_running_loop()
         self._poll_timeout = poll_timeout
+        self._max_batch = max_batch
+        self._priority = priority
+        self._max_pending = max_pending
+        self._capacity_waiters: list[asyncio.Future] = []
+        self._metrics = metrics
+        self._timers: list[tuple[float, int, WorkerTimer]] = []
+        self._timer_counter = itertools.count()
         self._request_queue: queue.Queue = None
         AbstractThread.__init__(self, args)
         self.started = asyncio.Event()
@@ -204,54 +520,169 @@ class AbstractAioWorker(AbstractThread):
             raise ValueError("Aio worker does not support custom callback. Use the 'closed' event.")
         if daemon not in (None, False):  # pragma: no cover
             raise ValueError("Aio worker must not be daemon to ensure cleanup.")
-        self._request_queue = queue.Queue() if self._poll_timeout is None else PollTimedQueue(self._poll_timeout)
+        self._request_queue = self._create_queue()
         AbstractThread.start(self, None, partial(self._loop.call_soon_threadsafe, self.closed.set), False, name_prefix)
 
+    def _create_queue(self) -> queue.Queue:
+        """
+        Create a job queue by the configuration of the worker.
+        """
+        if self._priority:
+            return PriorityJobQueue(self._max_pending or 0)
+        return queue.Queue(self._max_pending or 0)
+
+    def pending(self) -> int:
+        """
+        Get the number of jobs waiting in the request queue.
+        """
+        q = self._request_queue
+        return 0 if q is None else q.qsize()
+
     def stop(self, timeout: Optional[float] = 0) -> bool:
         """
         The default timeout is zero, we assume the .closed event will be used to wait for cleanup in asyncio.
         """
         q = self._request_queue  # local reference resolves race-conditions with worker thread
         if q is not None:
-            q.put_nowait(None)
+            _queue_put_force(q, None)
         return AbstractThread.stop(self, timeout)
 
     def _thread(self, *args: Any) -> None:
         """
         General worker and request executor thread.
         """
+        q = self._request_queue
         try:
             self._thread_init(*args)
             self._loop.call_soon_threadsafe(self.started.set)
-            # run job queue
-            while True:
-                try:
-                    job = self._request_queue.get()
-                except queue.Empty:
-                    self._thread_poll()
-                    continue
-                if not isinstance(job, AbstractWorkerJob):
-                    break
-                if job.done():  # Could have been cancelled before we got to it.
-                    continue
-                try:
-                    result = job.execute(self)
-                    job.set_result(result)
-                except Exception as e:
-                    job.set_exception(e)
+            self._thread_run(q)
         finally:
             # prevent more jobs to be queued
-            q = self._request_queue
             self._request_queue = None
             # notify dead jobs if any
+            _queue_cancel_pending(q)
             try:
-                while True:
-                    job = q.get_nowait()
-                    if isinstance(job, AbstractWorkerJob):
-                        job.cancel()
+                self._thread_cleanup()
+            finally:
+                self._thread_wake_capacity_waiters()
+
+    def _thread_run(self, q: queue.Queue) -> None:
+        """
+        Run the job queue until the stop signal is received.
+        """
+        if self._poll_timeout is not None:
+            self._thread_schedule(self._thread_poll, self._poll_timeout, self._poll_timeout)
+        if self._max_batch is not None:
+            return self._thread_run_batched(q)
+        while True:
+            job = self._thread_get(q)
+            if self._capacity_waiters:
+                self._thread_wake_capacity_waiters()
+            if not isinstance(job, AbstractWorkerJob):
+                break
+            if job.obsolete():  # Could have been cancelled or timed out before we got to it.
+                continue
+            if job.timings is not None:
+                self._track_dequeued((job,))
+            try:
+                result = job.execute(self)
+                job.set_result(result)
+            except Exception as e:
+                job.set_exception(e)
+
+    def _thread_run_batched(self, q: queue.Queue, share: int = 1) -> None:
+        max_batch = self._max_batch
+        while True:
+            job = self._thread_get(q)
+            jobs, stop = _queue_get_batch(q, job, max_batch, share)
+            if self._capacity_waiters:
+                self._thread_wake_capacity_waiters()
+            if jobs:
+                if self._metrics is not None:
+                    self._track_dequeued(jobs)
+                batch = []
+                self._thread_execute_batch(jobs, batch)
+                if batch:
+                    self._loop.call_soon_threadsafe(_callback_batch, batch)
+            if stop:
+                break
+
+    def _thread_get(self, q: queue.Queue) -> Any:
+        """
+        Wait for the next item of the queue, while running the timers when they are due.
+        """
+        timers = self._timers
+        while timers:
+            try:
+                return q.get(timeout=self._thread_run_timers())
             except queue.Empty:
                 pass
-            self._thread_cleanup()
+        return q.get()
+
+    def _thread_run_timers(self) -> Optional[float]:
+        """
+        Run the due timers and return the time until the next one, or None if there are no more timers.
+        """
+        timers = self._timers
+        while timers:
+            when, _, timer = timers[0]
+            if timer.cancelled:
+                heapq.heappop(timers)
+                continue
+            now = time.perf_counter()
+            if when > now:
+                return when - now
+            if timer.period is None:
+                heapq.heappop(timers)
+            else:
+                # skip the missed periods instead of running them in a burst
+                timer.when = when + timer.period if when + timer.period > now else now + timer.period
+                heapq.heapreplace(timers, (timer.when, next(self._timer_counter), timer))
+            timer.fn()
+        return None
+
+    def _thread_schedule(self, fn: Callable[[], Any], delay: float, period: Optional[float] = None) -> WorkerTimer:
+        """
+        Schedule the callback to run on the calling worker thread after the delay, then repeatedly by the period if
+        set. This must be called on the worker thread, like from _thread_init() or a job. Each thread of a pool has
+        its own timers. Exceptions raised by the callback terminate the worker.
+        """
+        if period is not None and period <= 0.0:  # pragma: no cover
+            raise ValueError("Aio worker timer 'period' must be greater than zero or None.")
+        timer = WorkerTimer(fn, time.perf_counter() + delay, period)
+        heapq.heappush(self._timers, (timer.when, next(self._timer_counter), timer))
+        return timer
+
+    def _thread_execute_batch(self, jobs: list[AbstractWorkerJob], batch: list) -> None:
+        """
+        Execute the jobs taken from the queue together. The results shall be set with the batched setters.
+        """
+        for job in jobs:
+            if job.obsolete():  # Could have been cancelled or timed out before we got to it.
+                continue
+            try:
+                job.set_result_batched(job.execute(self), batch)
+            except Exception as e:
+                job.set_exception_batched(e, batch)
+
+    def _track_dequeued(self, jobs: Sequence[AbstractWorkerJob]) -> None:
+        t = time.perf_counter()
+        for job in jobs:
+            if job.timings is not None:
+                job.timings.dequeued = t
+        # all threads of the worker report the same depth, even if they consume different queues
+        self._metrics.record_depth(self.pending())
+
+    def _thread_wake_capacity_waiters(self):
+        if self._capacity_waiters:
+            self._loop.call_soon_threadsafe(self._wake_capacity_waiters)
+
+    def _wake_capacity_waiters(self):
+        waiters = self._capacity_waiters[:]
+        self._capacity_waiters.clear()  # in-place, the list is shared with the copies of the worker on other threads
+        for w in waiters:
+            if not w.done():
+                w.set_result(None)
 
     def _thread_init(self, *args: Any):
         """
@@ -261,7 +692,7 @@ class AbstractAioWorker(AbstractThread):
 
     def _thread_poll(self):
         """
-        Called periodically when poll_timeout is configured.
+        Called periodically on each worker thread when poll_timeout is configured.
         """
         raise NotImplementedError()
 
@@ -271,7 +702,73 @@ class AbstractAioWorker(AbstractThread):
         """
         raise NotImplementedError()
 
-    async def _method_job(self, impl_fn: Callable, *args, timeout: Optional[float] = None) -> Any:
+    def _put_job(
+        self,
+        job: AbstractWorkerJob,
+        timeout: Optional[float] = None,
+        priority: int = 0,
+        queue_attr: str = "_request_queue",
+    ) -> bool:
+        """
+        Queue the job for execution with its timeout as deadline. Return False if the bounded queue is full, then
+        the job shall be queued with _put_job_wait() or _put_job_block().
+        This will raise AttributeError if the worker has been closed.
+        """
+        job.priority = priority
+        if timeout is not None:
+            job.deadline = time.perf_counter() + timeout
+        if self._metrics is not None:
+            job.track(self._metrics)
+        try:
+            getattr(self, queue_attr).put_nowait(job)
+        except queue.Full:
+            return False
+        return True
+
+    async def _put_job_wait(
+        self, job: AbstractWorkerJob, wait: bool = True, queue_attr: str = "_request_queue"
+    ) -> None:
+        """
+        Wait for free capacity in the queue without blocking the event loop, respecting the deadline of the job.
+        """
+        if not wait:
+            raise AioWorkerOverloadError()
+        while True:
+            w = self._loop.create_future()
+            self._capacity_waiters.append(w)
+            try:
+                # try again after registering the waiter, the worker could have taken jobs since the last attempt
+                try:
+                    getattr(self, queue_attr).put_nowait(job)
+                    return
+                except queue.Full:
+                    pass
+                await wait_for2.wait_for(w, job.remaining())
+            finally:
+                if not w.done():
+                    w.cancel()
+                try:
+                    self._capacity_waiters.remove(w)
+                except ValueError:
+                    pass  # already woken up
+
+    def _put_job_block(self, job: AbstractWorkerJob, wait: bool = True, queue_attr: str = "_request_queue") -> None:
+        """
+        Block the current thread until there is free capacity in the queue, respecting the deadline of the job.
+        """
+        if not wait:
+            raise AioWorkerOverloadError()
+        q = getattr(self, queue_attr)
+        try:
+            q.put(job, timeout=job.remaining())
+        except queue.Full:
+            raise TimeoutError() from None
+        if getattr(self, queue_attr) is not q:
+            job.cancel()  # the worker has been closed meanwhile
+
+    async def _method_job(
+        self, impl_fn: Callable, *args, timeout: Optional[float] = None, priority: int = 0, wait: bool = True
+    ) -> Any:
         """
         This is designed to be used as
 
@@ -281,10 +778,14 @@ class AbstractAioWorker(AbstractThread):
         passed by the worker thread to make it work.
         """
         f = self._loop.create_future()
-        self._request_queue.put_nowait(PartialMethodAioWorkerJob(f, impl_fn, args))
-        return await wait_for2.wait_for(f, timeout)
-
-    def _method_call(self, impl_fn: Callable, *args, timeout: Optional[float] = None) -> Any:
+        job = PartialMethodAioWorkerJob(f, impl_fn, args)
+        if not self._put_job(job, timeout, priority):
+            await self._put_job_wait(job, wait)
+        return await wait_for2.wait_for(f, job.remaining())
+
+    def _method_call(
+        self, impl_fn: Callable, *args, timeout: Optional[float] = None, priority: int = 0, wait: bool = True
+    ) -> Any:
         """
         This is designed to be used as
 
@@ -294,5 +795,135 @@ class AbstractAioWorker(AbstractThread):
         passed by the worker thread to make it work.
         """
         job = PartialMethodThreadWorkerJob(impl_fn, args)
-        self._request_queue.put_nowait(job)
-        return job.get_result(timeout)
+        if not self._put_job(job, timeout, priority):
+            self._put_job_block(job, wait)
+        return job.get_result(job.remaining())
+
+
+class AioWorkerThread(AbstractThread):
+    """
+    Additional thread running the job loop of a queue with its own worker object, that is usually a shallow copy of
+    the owner worker. The init and cleanup functions are called on the thread with the worker object, by default these
+    are the _thread_init and _thread_cleanup methods of the worker.
+    """
+
+    __slots__ = ("worker", "_init_fn", "_cleanup_fn", "_initialised", "_ok")
+
+    def __init__(
+        self,
+        worker: AbstractAioWorker,
+        init_fn: Optional[Callable[..., None]] = None,
+        cleanup_fn: Optional[Callable[[AbstractAioWorker], None]] = None,
+    ):
+        AbstractThread.__init__(self)
+        self.worker = worker
+        self._init_fn = init_fn
+        self._cleanup_fn = cleanup_fn
+        self._initialised = threading.Event()
+        self._ok = False
+
+    def wait_initialised(self) -> bool:
+        """
+        Block until the init function has finished and return whether it was successful.
+        """
+        self._initialised.wait()
+        return self._ok
+
+    def _thread(self, q: queue.Queue, *args: Any) -> None:
+        worker = self.worker
+        worker._timers = []  # the timers are specific to the thread
+        try:
+            try:
+                if self._init_fn is None:
+                    worker._thread_init(*args)
+                else:
+                    self._init_fn(worker, *args)
+                self._ok = True
+            finally:
+                self._initialised.set()
+            worker._thread_run(q)
+        finally:
+            if self._cleanup_fn is None:
+                worker._thread_cleanup()
+            else:
+                self._cleanup_fn(worker)
+
+
+def stop_aio_worker_threads(q: queue.Queue, threads: Sequence[AioWorkerThread]) -> None:
+    """
+    Signal the threads of the queue to stop, wait for them and cancel the jobs left in the queue.
+    """
+    for _ in threads:
+        _queue_put_force(q, None)
+    for t in threads:
+        t.stop()
+    _queue_cancel_pending(q)
+
+
+class AbstractAioWorkerPool(AbstractAioWorker):
+    """
+    Variant of the aio worker that executes the jobs of the shared request queue on multiple threads.
+    Each additional thread works with a shallow copy of the pool object, so the states set up by _thread_init are
+    specific to the thread, while the interface and events are the same as with the single threaded worker.
+    The started event is set when all threads have initialised, if any of them fails the pool will not start.
+    """
+
+    __slots__ = ("_workers",)
+
+    def __init__(
+        self,
+        args: Optional[Sequence[Any]] = None,
+        poll_timeout: Optional[float] = None,
+        max_batch: Optional[int] = None,
+        priority: bool = False,
+        max_pending: Optional[int] = None,
+        metrics: Optional[AioWorkerMetricsSink] = None,
+        workers: int = 2,
+    ):
+        if workers < 1:  # pragma: no cover
+            raise ValueError("Aio worker pool 'workers' must be at least one.")
+        self._workers = workers
+        AbstractAioWorker.__init__(self, args, poll_timeout, max_batch, priority, max_pending, metrics)
+
+    def stop(self, timeout: Optional[float] = 0) -> bool:
+        """
+        Each thread of the pool consumes one stop signal. The default timeout is zero like for the single worker.
+        """
+        q = self._request_queue  # local reference resolves race-conditions with worker threads
+        if q is not None:
+            for _ in range(self._workers):
+                _queue_put_force(q, None)
+        return AbstractThread.stop(self, timeout)
+
+    def _thread_run_batched(self, q: queue.Queue, share: int = 1) -> None:
+        """
+        The threads share the pending jobs, so a batch will not hoard work from idle threads.
+        """
+        AbstractAioWorker._thread_run_batched(self, q, self._workers)
+
+    def _thread(self, *args: Any) -> None:
+        """
+        The main thread of the pool starts and supervises the additional threads, while it works on jobs as well.
+        """
+        q = self._request_queue
+        threads = []
+        try:
+            for i in range(1, self._workers):
+                t = AioWorkerThread(copy.copy(self))
+                t.start((q, *args), name_prefix=f"{self.__class__.__name__}-{i}")
+                threads.append(t)
+            self._thread_init(*args)
+            for t in threads:
+                if not t.wait_initialised():
+                    raise Exception(f"Aio worker pool thread could not start for {self.__class__.__name__}")
+            self._loop.call_soon_threadsafe(self.started.set)
+            self._thread_run(q)
+        finally:
+            # prevent more jobs to be queued
+            self._request_queue = None
+            # make sure the additional threads terminate in any case, notify dead jobs if any
+            stop_aio_worker_threads(q, threads)
+            try:
+                self._thread_cleanup()
+            finally:
+                self._thread_wake_capacity_waiters()
@@ -0,0 +1,127 @@
+from __future__ import annotations
+
+import threading
+import time
+from typing import Optional
+
+from tarka.utility.aio_worker import AioWorkerMetricsSink
+
+
+class LatencyHistogram:
+    """
+    Histogram of durations with logarithmic buckets: the upper bound of the n-th bucket is 2**n microseconds.
+    Percentiles are estimated by the upper bound of the bucket they fall into.
+    """
+
+    __slots__ = ("buckets", "count", "total", "max")
+
+    MAX_BUCKET = 40  # about 12.7 days
+
+    def __init__(self):
+        self.buckets = [0] * (self.MAX_BUCKET + 1)
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+
+    def add(self, value: float) -> None:
+        self.buckets[min(int(value * 1e6).bit_length(), self.MAX_BUCKET)] += 1
+        self.count += 1
+        self.total += value
+        if value > self.max:
+            self.max = value
+
+    def percentile(self, p: float) -> float:
+        """
+        Estimate the p-th (0-100) percentile in seconds, zero if empty.
+        """
+        if not self.count:
+            return 0.0
+        rank = p * self.count / 100.0
+        seen = 0
+        for n, c in enumerate(self.buckets):
+            seen += c
+            if c and seen >= rank:
+                return min((1 << n) / 1e6, self.max)
+        return self.max  # pragma: no cover
+
+    def summary(self) -> dict:
+        return {
+            "count": self.count,
+            "mean": self.total / self.count if self.count else 0.0,
+            "p50": self.percentile(50),
+            "p90": self.percentile(90),
+            "p99": self.percentile(99),
+            "max": self.max,
+        }
+
+
+class _JobStats:
+    __slots__ = ("queue_wait", "execute", "delivery")
+
+    def __init__(self):
+        self.queue_wait = LatencyHistogram()
+        self.execute = LatencyHistogram()
+        self.delivery = LatencyHistogram()
+
+    def add(self, queue_wait: float, execute: float, delivery: float) -> None:
+        self.queue_wait.add(queue_wait)
+        self.execute.add(execute)
+        self.delivery.add(delivery)
+
+    def summary(self) -> dict:
+        return {
+            "queue_wait": self.queue_wait.summary(),
+            "execute": self.execute.summary(),
+            "delivery": self.delivery.summary(),
+        }
+
+
+class AioWorkerStats(AioWorkerMetricsSink):
+    """
+    Metrics sink collecting histograms of the queue wait, execute and delivery durations of the jobs of an aio worker,
+    overall and by the implementation label. The throughput is measured since the creation or the last reset.
+    """
+
+    __slots__ = ("_lock", "_start", "_total", "_labels", "_depth", "_max_depth")
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.reset()
+
+    def reset(self) -> None:
+        with self._lock:
+            self._start = time.perf_counter()
+            self._total = _JobStats()
+            self._labels: dict[str, _JobStats] = {}
+            self._depth = 0
+            self._max_depth = 0
+
+    def record_job(self, label: str, queue_wait: float, execute: float, delivery: float) -> None:
+        with self._lock:
+            self._total.add(queue_wait, execute, delivery)
+            stats = self._labels.get(label)
+            if stats is None:
+                stats = self._labels[label] = _JobStats()
+            stats.add(queue_wait, execute, delivery)
+
+    def record_depth(self, depth: int) -> None:
+        with self._lock:
+            self._depth = depth
+            if depth > self._max_depth:
+                self._max_depth = depth
+
+    def summary(self, now: Optional[float] = None) -> dict:
+        """
+        Snapshot of the collected metrics in a JSON serializable form. Durations are in seconds.
+        """
+        with self._lock:
+            elapsed = (time.perf_counter() if now is None else now) - self._start
+            result = self._total.summary()
+            result.update(
+                jobs=self._total.queue_wait.count,
+                jobs_per_second=self._total.queue_wait.count / elapsed if elapsed > 0.0 else 0.0,
+                depth=self._depth,
+                max_depth=self._max_depth,
+                labels={label: stats.summary() for label, stats in self._labels.items()},
+            )
+            return result
@@ -1,4 +1,8 @@
-from typing import Iterable, Any, TypeVar, Generator, Iterator, Hashable, Union, Optional, Callable
+import heapq
+import operator
+from bisect import bisect_left, bisect_right
+from itertools import chain
+from typing import Iterable, Any, TypeVar, Generator, Iterator, Hashable, Union, Optional, Callable, Sequence
 
 from tarka.utility.sentinel import NamedObject
 
@@ -83,8 +87,57 @@ def iter_merge_zip(
     Two-way merge-zip using the iterator interface.
     The iterators must yield their items sorted in in the order specified by `ascending`.
     Either of the yielded tuple values may be the sentinel which indicates miss, but not both.
+    The key is computed once for each item.
     """
-    _eq, _cnq, _ = select_eq_cmp_by_args(key, ascending)
+    if key is not None:
+        return _iter_merge_zip_keyed(a, b, key, operator.lt if ascending else operator.gt, s)
+    return _iter_merge_zip(a, b, ascending, s)
+
+
+def _iter_merge_zip_keyed(
+    a: Iterable[_AnyT], b: Iterable[_AnyT], key: Callable[[_AnyT], Any], cnq: Callable[[Any, Any], bool], s: NamedObject
+) -> Generator[tuple[Union[_AnyT, NamedObject], Union[_AnyT, NamedObject]], None, None]:
+    a = iter(a)
+    b = iter(b)
+    i = next(a, s)
+    if i is not s:
+        ki = key(i)
+    j = next(b, s)
+    if j is not s:
+        kj = key(j)
+    while i is not s and j is not s:
+        if ki == kj:
+            yield i, j
+            i = next(a, s)
+            if i is not s:
+                ki = key(i)
+            j = next(b, s)
+            if j is not s:
+                kj = key(j)
+        elif cnq(ki, kj):
+            yield i, s
+            i = next(a, s)
+            if i is not s:
+                ki = key(i)
+        else:
+            yield s, j
+            j = next(b, s)
+            if j is not s:
+                kj = key(j)
+    if i is not s:
+        yield i, s
+        for i in a:
+            yield i, s
+    if j is not s:
+        yield s, j
+        for j in b:
+            yield s, j
+
+
+def _iter_merge_zip(
+    a: Iterable[_AnyT], b: Iterable[_AnyT], ascending: bool, s: NamedObject
+) -> Generator[tuple[Union[_AnyT, NamedObject], Union[_AnyT, NamedObject]], None, None]:
+    _eq, _cnq, _ = select_eq_cmp_by_args(None, ascending)
     a = iter(a)
     b = iter(b)
     try:
@@ -144,8 +197,47 @@ def iter_merge_two(
     """
     Two-way merge using the iterator interface.
     The iterators must yield their items sorted in ascending order.
+    The key is computed once for each item.
     """
-    _, _, _ceq = select_eq_cmp_by_args(key, ascending)
+    if key is not None:
+        return _iter_merge_two_keyed(a, b, key, operator.le if ascending else operator.ge, s)
+    return _iter_merge_two(a, b, ascending, s)
+
+
+def _iter_merge_two_keyed(
+    a: Iterable[_AnyT], b: Iterable[_AnyT], key: Callable[[_AnyT], Any], ceq: Callable[[Any, Any], bool], s: NamedObject
+) -> Generator[_AnyT, None, None]:
+    a = iter(a)
+    b = iter(b)
+    i = next(a, s)
+    if i is not s:
+        ki = key(i)
+    j = next(b, s)
+    if j is not s:
+        kj = key(j)
+    while i is not s and j is not s:
+        if ceq(ki, kj):
+            yield i
+            i = next(a, s)
+            if i is not s:
+                ki = key(i)
+        else:
+            yield j
+            j = next(b, s)
+            if j is not s:
+                kj = key(j)
+    if i is not s:
+        yield i
+        yield from a
+    if j is not s:
+        yield j
+        yield from b
+
+
+def _iter_merge_two(
+    a: Iterable[_AnyT], b: Iterable[_AnyT], ascending: bool, s: NamedObject
+) -> Generator[_AnyT, None, None]:
+    _, _, _ceq = select_eq_cmp_by_args(None, ascending)
     a = iter(a)
     b = iter(b)
     try:
@@ -185,18 +277,99 @@ def iter_merge_two(
                 break
 
 
+ITER_MERGE_HEAP_MIN_INPUTS = 3
+
+
+def iter_merge_heap(
+    *item_iters: Iterable[_AnyT], key: Optional[Callable[[_AnyT], Any]] = None, ascending: bool = True
+) -> Iterator[_AnyT]:
+    """
+    Multi merge using a heap of the inputs, which is O(n log k) instead of the O(n k) of the chained two-way merges.
+    The iterators must yield their items sorted in the order specified by `ascending`.
+    Equal items are yielded in the order of the iterables, like by the chained two-way merges.
+    """
+    return heapq.merge(*item_iters, key=key, reverse=not ascending)
+
+
+class _DescendingKey:
+    """
+    Inverts the order of the wrapped key for the min-heap.
+    """
+
+    __slots__ = ("k",)
+
+    def __init__(self, k: Any):
+        self.k = k
+
+    def __lt__(self, other: "_DescendingKey") -> bool:
+        return other.k < self.k
+
+    def __eq__(self, other: "_DescendingKey") -> bool:
+        return self.k == other.k
+
+
+def iter_merge_zip_multi(
+    *item_iters: Iterable[_AnyT],
+    key: Optional[Callable[[_AnyT], Any]] = None,
+    ascending: bool = True,
+    s: NamedObject = SENTINEL,
+) -> Generator[tuple[Union[_AnyT, NamedObject], ...], None, None]:
+    """
+    Multi-way merge-zip using a heap of the input heads, which is O(log n) for each advancing input.
+    The iterators must yield their items sorted in in the order specified by `ascending`.
+    Yield a tuple for each key with an item from every input at its position, or the sentinel which indicates miss.
+    Equal items of an input are zipped into subsequent tuples, the same as by iter_merge_zip.
+    """
+    n = len(item_iters)
+    iters = [iter(item_iter) for item_iter in item_iters]
+    if key is None:
+        heap_key = (lambda x: x) if ascending else _DescendingKey
+    elif ascending:
+        heap_key = key
+    else:
+
+        def heap_key(x: _AnyT) -> _DescendingKey:
+            return _DescendingKey(key(x))
+
+    heap = []
+    for i, it in enumerate(iters):
+        item = next(it, s)
+        if item is not s:
+            heap.append((heap_key(item), i, item))
+    heapq.heapify(heap)
+    advanced = []
+    while heap:
+        k, i, item = heapq.heappop(heap)
+        row = [s] * n
+        row[i] = item
+        advanced.append(i)
+        while heap and heap[0][0] == k:
+            _, i, item = heapq.heappop(heap)
+            row[i] = item
+            advanced.append(i)
+        yield tuple(row)
+        for i in advanced:
+            item = next(iters[i], s)
+            if item is not s:
+                heapq.heappush(heap, (heap_key(item), i, item))
+        advanced.clear()
+
+
 def iter_merge(
     *item_iters: Iterable[_AnyT],
     key: Optional[Callable[[_AnyT], Any]] = None,
     ascending: bool = True,
-    s: NamedObject = SENTINEL
+    s: NamedObject = SENTINEL,
 ) -> Iterator[_AnyT]:
     """
     Multi merge using the iterator interface.
     The iterators must yield their items sorted in ascending order.
+    The two-way merge is faster for a few inputs, the heap merge is selected from ITER_MERGE_HEAP_MIN_INPUTS.
     """
     if not item_iters:
         return iter(())
+    if len(item_iters) >= ITER_MERGE_HEAP_MIN_INPUTS:
+        return iter_merge_heap(*item_iters, key=key, ascending=ascending)
     m = iter(item_iters[0])
     for i in range(1, len(item_iters)):
         m = iter_merge_two(m, iter(item_iters[i]), key=key, ascending=ascending, s=s)
@@ -226,6 +399,208 @@ def iter_merge_unique(
         pass
 
 
+def _bisect_right_desc(keys: Sequence[Any], x: Any, lo: int) -> int:
+    hi = len(keys)
+    while lo < hi:
+        mid = (lo + hi) // 2
+        if keys[mid] < x:
+            hi = mid
+        else:
+            lo = mid + 1
+    return lo
+
+
+def _bisect_left_desc(keys: Sequence[Any], x: Any, lo: int) -> int:
+    hi = len(keys)
+    while lo < hi:
+        mid = (lo + hi) // 2
+        if x < keys[mid]:
+            lo = mid + 1
+        else:
+            hi = mid
+    return lo
+
+
+def _select_bisect_by_args(ascending: bool) -> tuple[Callable[..., int], Callable[..., int]]:
+    """
+    Return the bisect functions for the order, to find the end of the run of items before-or-equal and before a key.
+    """
+    if ascending:
+        return bisect_right, bisect_left
+    return _bisect_right_desc, _bisect_left_desc
+
+
+def _next_chunk(chunk_iter: Iterator[Sequence[_AnyT]]) -> Optional[Sequence[_AnyT]]:
+    for chunk in chunk_iter:
+        if len(chunk):
+            return chunk
+    return None
+
+
+def _chunk_keys(chunk: Sequence[_AnyT], key: Optional[Callable[[_AnyT], Any]]) -> Sequence[Any]:
+    return chunk if key is None else list(map(key, chunk))
+
+
+def iter_merge_two_chunks(
+    a: Iterable[Sequence[_AnyT]],
+    b: Iterable[Sequence[_AnyT]],
+    key: Optional[Callable[[_AnyT], Any]] = None,
+    ascending: bool = True,
+) -> Generator[list[_AnyT], None, None]:
+    """
+    Two-way merge of chunked inputs, where the chunks are sliceable sequences and their items sorted in the order
+    specified by `ascending` across the chunks of an input. Yield the merged items in non-empty lists.
+    The runs of items of an input are found by bisecting against the head of the other, and copied in bulk.
+    The key is computed once for each item, equal items are yielded from `a` first.
+    """
+    after, before = _select_bisect_by_args(ascending)
+    a = iter(a)
+    b = iter(b)
+    ca = _next_chunk(a)
+    cb = _next_chunk(b)
+    if ca is not None and cb is not None:
+        ka = _chunk_keys(ca, key)
+        kb = _chunk_keys(cb, key)
+        ia = ib = 0
+        out = []
+        while True:
+            j = after(ka, kb[ib], ia)
+            out.extend(ca[ia:j])
+            if j == len(ca):
+                yield out
+                out = []
+                ca = _next_chunk(a)
+                if ca is None:
+                    break
+                ka = _chunk_keys(ca, key)
+                ia = 0
+                continue
+            ia = j
+            j = before(kb, ka[ia], ib)
+            out.extend(cb[ib:j])
+            if j == len(cb):
+                yield out
+                out = []
+                cb = _next_chunk(b)
+                if cb is None:
+                    break
+                kb = _chunk_keys(cb, key)
+                ib = 0
+                continue
+            ib = j
+        if ca is not None:
+            ca = ca[ia:]
+        if cb is not None:
+            cb = cb[ib:]
+    if ca is not None:
+        yield list(ca)
+        for chunk in a:
+            if len(chunk):
+                yield list(chunk)
+    if cb is not None:
+        yield list(cb)
+        for chunk in b:
+            if len(chunk):
+                yield list(chunk)
+
+
+def iter_merge_chunks(
+    *chunk_iters: Iterable[Sequence[_AnyT]], key: Optional[Callable[[_AnyT], Any]] = None, ascending: bool = True
+) -> Iterator[list[_AnyT]]:
+    """
+    Multi merge of chunked inputs by chaining the two-way chunk merges.
+    The chunks must be sliceable sequences with their items sorted in the order specified by `ascending`.
+    """
+    if not chunk_iters:
+        return iter(())
+    m = (list(chunk) for chunk in chunk_iters[0] if len(chunk))
+    for i in range(1, len(chunk_iters)):
+        m = iter_merge_two_chunks(m, chunk_iters[i], key=key, ascending=ascending)
+    return m
+
+
+def iter_merge_unique_chunks(
+    *chunk_iters: Iterable[Sequence[_AnyT]], ascending: bool = True, s: NamedObject = SENTINEL
+) -> Generator[list[_AnyT], None, None]:
+    """
+    Yield unique items for the chunked inputs by merging them, in non-empty lists.
+    The chunks must be sliceable sequences with their items sorted in the order specified by `ascending`.
+    """
+    last_item = s
+    for chunk in iter_merge_chunks(*chunk_iters, ascending=ascending):
+        out = [item for prev, item in zip(chain((last_item,), chunk), chunk) if item != prev]
+        last_item = chunk[-1]
+        if out:
+            yield out
+
+
+def iter_merge_zip_chunks(
+    a: Iterable[Sequence[_AnyT]],
+    b: Iterable[Sequence[_AnyT]],
+    key: Optional[Callable[[_AnyT], Any]] = None,
+    ascending: bool = True,
+    s: NamedObject = SENTINEL,
+) -> Generator[list[tuple[Union[_AnyT, NamedObject], Union[_AnyT, NamedObject]]], None, None]:
+    """
+    Two-way merge-zip of chunked inputs, yielding the tuples of iter_merge_zip in non-empty lists.
+    The chunks must be sliceable sequences with their items sorted in the order specified by `ascending`.
+    The runs of items missing from the other input are found by bisecting against its head.
+    """
+    _, before = _select_bisect_by_args(ascending)
+    a = iter(a)
+    b = iter(b)
+    ca = _next_chunk(a)
+    cb = _next_chunk(b)
+    if ca is not None and cb is not None:
+        ka = _chunk_keys(ca, key)
+        kb = _chunk_keys(cb, key)
+        ia = ib = 0
+        out = []
+        while True:
+            j = before(ka, kb[ib], ia)
+            if j > ia:
+                out.extend([(i, s) for i in ca[ia:j]])
+                ia = j
+            if ia < len(ca):
+                j = before(kb, ka[ia], ib)
+                if j > ib:
+                    out.extend([(s, i) for i in cb[ib:j]])
+                    ib = j
+                else:  # neither head is before the other
+                    out.append((ca[ia], cb[ib]))
+                    ia += 1
+                    ib += 1
+            if ia == len(ca) or ib == len(cb):
+                yield out
+                out = []
+                if ia == len(ca):
+                    ca = _next_chunk(a)
+                    if ca is None:
+                        break
+                    ka = _chunk_keys(ca, key)
+                    ia = 0
+                if ib == len(cb):
+                    cb = _next_chunk(b)
+                    if cb is None:
+                        break
+                    kb = _chunk_keys(cb, key)
+                    ib = 0
+        if ca is not None:
+            ca = ca[ia:] if ia < len(ca) else _next_chunk(a)
+        if cb is not None:
+            cb = cb[ib:] if ib < len(cb) else _next_chunk(b)
+    if ca is not None:
+        yield [(i, s) for i in ca]
+        for chunk in a:
+            if len(chunk):
+                yield [(i, s) for i in chunk]
+    if cb is not None:
+        yield [(s, j) for j in cb]
+        for chunk in b:
+            if len(chunk):
+                yield [(s, j) for j in chunk]
+
+
 def iter_all_same(*item_iters: Iterable[Any]) -> bool:
     """
     Check if all values equal in the iterables.
@@ -1,5 +1,16 @@
 from bisect import bisect_left
-from typing import Sequence, Any, Union
+from functools import lru_cache
+from typing import Sequence, Any, Union, Iterable
+
+from tarka.utility.importing import import_optional
+
+
+@lru_cache(maxsize=None)
+def _numpy():
+    """
+    The optional numpy is imported upon the first use of the batch functions, not when this module is loaded.
+    """
+    return import_optional("numpy", warn_error=False)
 
 
 def seq_eq(a: Sequence, b: Sequence) -> bool:
@@ -47,3 +58,66 @@ def seq_closest_index(seq: Sequence[Union[float, int]], value: Union[float, int]
     if after - value < value - before:
         return pos
     return pos - 1
+
+
+def seq_closest_index_many(seq: Sequence[Union[float, int]], values: Iterable[Union[float, int]]) -> Sequence[int]:
+    """
+    Return the indexes of the closest numerical values in an ascending sorted sequence for each of the values.
+    In case of two values being equally close, choose the earlier.
+    The result is an array computed with numpy.searchsorted if numpy is available, otherwise a list.
+    """
+    if len(seq) == 0:
+        raise ValueError("Can't find closest value in empty sequence")
+    np = _numpy()
+    if np is not None:
+        return _seq_closest_index_many_np(np, np.asarray(seq), _np_values(np, values))
+    return _seq_closest_index_many_py(seq, values)
+
+
+def seq_closest_many(
+    seq: Sequence[Union[float, int]], values: Iterable[Union[float, int]]
+) -> Sequence[Union[float, int]]:
+    """
+    Return the closest numerical values in an ascending sorted sequence for each of the values.
+    In case of two values being equally close, choose the smaller.
+    The result is an array computed with numpy.searchsorted if numpy is available, otherwise a list.
+    """
+    if len(seq) == 0:
+        raise ValueError("Can't find closest value in empty sequence")
+    np = _numpy()
+    if np is not None:
+        seq = np.asarray(seq)
+        return seq[_seq_closest_index_many_np(np, seq, _np_values(np, values))]
+    return [seq[i] for i in _seq_closest_index_many_py(seq, values)]
+
+
+def _np_values(np, values: Iterable[Union[float, int]]):
+    return np.asarray(values if hasattr(values, "__len__") else list(values))
+
+
+def _seq_closest_index_many_np(np, seq, values):
+    pos = np.searchsorted(seq, values, side="left")
+    before = np.maximum(pos - 1, 0)
+    after = np.minimum(pos, len(seq) - 1)
+    # at the ends the before and after indexes are the same
+    return np.where(seq[after] - values < values - seq[before], after, before)
+
+
+def _seq_closest_index_many_py(seq: Sequence[Union[float, int]], values: Iterable[Union[float, int]]) -> list[int]:
+    last = len(seq) - 1
+    first_value = seq[0]
+    last_value = seq[last]
+    result = []
+    append = result.append
+    for value in values:
+        if value <= first_value:
+            append(0)
+        elif value > last_value:
+            append(last)
+        else:
+            pos = bisect_left(seq, value)
+            if seq[pos] - value < value - seq[pos - 1]:
+                append(pos)
+            else:
+                append(pos - 1)
+    return result
@@ -7,10 +7,19 @@ For faster, space-efficient and wide compatibility serialization where determini
 import hashlib
 import re
 import struct
-from io import BytesIO
-from typing import Type, Callable, Optional, Union, Any
-
-from tarka.utility.algorithm.traverse import traverse, TraverseType, SORTED_STR_TRAVERSE, TraverseTypeMap
+import threading
+from collections import OrderedDict
+from concurrent.futures import Executor, Future, ProcessPoolExecutor
+from functools import partial
+from typing import Type, Callable, Optional, Union, Any, Iterator, Iterable, BinaryIO, Generator, Hashable, Sequence
+
+from tarka.utility.algorithm.traverse import (
+    traverse,
+    TraverseType,
+    SORTED_STR_TRAVERSE,
+    TraverseTypeMap,
+    TraverseCycleError,
+)
 
 StreamProcessFn = Callable[[bytes], Any]
 TraverseDeterministicTransformMap = dict[Type[TraverseType], Callable[[StreamProcessFn, TraverseType], None]]
@@ -75,6 +84,7 @@ def _ppd_frozenset(acc: StreamProcessFn, o: frozenset):
 
 
 VERSION_TAG = b"1v"
+MERKLE_VERSION_TAG = b"1m"
 PYTHON_PRIMITIVES_DETERMINISTIC_TRANSFORM_MAP: TraverseDeterministicTransformMap = {
     str: _ppd_str,
     int: _ppd_int,
@@ -94,9 +104,9 @@ def deterministic_dumps(arg: TraverseType) -> bytes:
     """
     Get the canonical binary serialization of the object in whole.
     """
-    buf = BytesIO()
-    deterministic_transform(arg, buf.write)
-    return buf.getvalue()
+    buf = bytearray(VERSION_TAG)
+    _deterministic_encode(arg, buf)
+    return bytes(buf)
 
 
 def deterministic_hash(arg: TraverseType, algo: str, **algo_kw) -> bytes:
@@ -111,8 +121,12 @@ def deterministic_hash(arg: TraverseType, algo: str, **algo_kw) -> bytes:
 def deterministic_transform(arg: TraverseType, acc: StreamProcessFn) -> None:
     """
     Process the canonical binary serialization stream of the object.
+    The stream is passed to the accumulator in chunks of about ENCODE_FLUSH_SIZE bytes.
     """
-    _deterministic_transform(arg, acc, prefix=VERSION_TAG)
+    buf = bytearray(VERSION_TAG)
+    _deterministic_encode(arg, buf, acc)
+    if buf:
+        acc(bytes(buf))
 
 
 def _deterministic_transform(
@@ -132,6 +146,109 @@ def _deterministic_transform(
         tr_map[type(x)](acc, x)
 
 
+ENCODE_FLUSH_SIZE = 1 << 16
+
+_pack_float = struct.Struct(">d").pack
+# pre-encoded length prefixes of the short values and small collections, and the encoding of the small integers
+_ENCODE_TABLE_SIZE = 256
+_ENCODE_PREFIXES = {
+    t: tuple(b"%d%s" % (n, t) for n in range(_ENCODE_TABLE_SIZE)) for t in (b"s", b"b", b"l", b"t", b"h", b"H")
+}
+_ENCODE_SMALL_INTS = {i: b"%di%d" % (len(b"%d" % i), i) for i in range(-128, 1024)}
+
+
+def _deterministic_encode(
+    arg: TraverseType, buf: bytearray, acc: Optional[StreamProcessFn] = None, flush_size: int = ENCODE_FLUSH_SIZE
+) -> None:
+    """
+    Optimized equivalent of _deterministic_transform with the primitive maps, which appends the serialization to the
+    buffer. If the accumulator is given, the buffer is passed to it and cleared when it has reached the flush size
+    at the container boundaries, and bytes values of at least the flush size are passed to it without copying.
+    The items of a container are encoded in a loop, only the containers are tracked on the stack.
+    """
+    str_, int_, float_, bool_, bytes_ = str, int, float, bool, bytes
+    list_, tuple_, dict_, set_, frozenset_ = list, tuple, dict, set, frozenset
+    pack_float = _pack_float
+    table_size = _ENCODE_TABLE_SIZE
+    str_prefix = _ENCODE_PREFIXES[b"s"]
+    bytes_prefix = _ENCODE_PREFIXES[b"b"]
+    list_prefix = _ENCODE_PREFIXES[b"l"]
+    tuple_prefix = _ENCODE_PREFIXES[b"t"]
+    set_prefix = _ENCODE_PREFIXES[b"h"]
+    frozenset_prefix = _ENCODE_PREFIXES[b"H"]
+    small_ints = _ENCODE_SMALL_INTS
+    stack: list[tuple[Iterator[TraverseType], int]] = []
+    path: set[int] = set()
+    it = iter((arg,))
+    while True:
+        for o in it:
+            t = type(o)
+            if t is str_:
+                b = o.encode("utf-8")
+                n = len(b)
+                buf += str_prefix[n] if n < table_size else b"%ds" % n
+                buf += b
+            elif t is int_:
+                b = small_ints.get(o)
+                if b is None:
+                    b = b"%d" % o
+                    buf += b"%di" % len(b)
+                buf += b
+            elif t is float_:
+                buf += b"f"
+                buf += pack_float(o)
+            elif t is bool_:
+                buf += b"T" if o else b"F"
+            elif o is None:
+                buf += b"N"
+            elif t is bytes_:
+                n = len(o)
+                buf += bytes_prefix[n] if n < table_size else b"%db" % n
+                if acc is not None and n >= flush_size:
+                    acc(bytes(buf))
+                    buf.clear()
+                    acc(o)
+                else:
+                    buf += o
+            else:
+                if t is dict_:
+                    buf += b"%dd" % (len(o) << 1)
+                    children = [x for k in sorted(o, key=str_) for x in (k, o[k])]
+                elif t is list_:
+                    n = len(o)
+                    buf += list_prefix[n] if n < table_size else b"%dl" % n
+                    children = o
+                elif t is tuple_:
+                    n = len(o)
+                    buf += tuple_prefix[n] if n < table_size else b"%dt" % n
+                    children = o
+                elif t is set_:
+                    n = len(o)
+                    buf += set_prefix[n] if n < table_size else b"%dh" % n
+                    children = sorted(o, key=str_)
+                elif t is frozenset_:
+                    n = len(o)
+                    buf += frozenset_prefix[n] if n < table_size else b"%dH" % n
+                    children = sorted(o, key=str_)
+                else:
+                    raise KeyError(t)
+                if children:
+                    if (o_id := id(o)) in path:
+                        raise TraverseCycleError()
+                    path.add(o_id)
+                    stack.append((it, o_id))
+                    it = iter(children)
+                    if acc is not None and len(buf) >= flush_size:
+                        acc(bytes(buf))
+                        buf.clear()
+                    break
+        else:
+            if not stack:
+                return
+            it, o_id = stack.pop()
+            path.remove(o_id)
+
+
 TraverseDeterministicTransformUnmap = dict[bytes, tuple[int, Callable[[bytes], TraverseType]]]
 
 DYNAMIC_LENGTH_VALUE = -5
@@ -154,67 +271,578 @@ PYTHON_PRIMITIVES_DETERMINISTIC_TRANSFORM_UNMAP: TraverseDeterministicTransformU
 LOAD_NUM_RE = re.compile(rb"([0-9]+)")
 
 
-class _LoadParent:
-    __slots__ = ("parent_index", "children", "child")
+_unpack_float_from = struct.Struct(">d").unpack_from
+_LOAD_SMALL_INTS = {b"%d" % i: i for i in range(-128, 1024)}
+_LOAD_EMPTY_COLLECTIONS: dict[int, Callable[[], TraverseType]] = {
+    ord("l"): list,
+    ord("t"): tuple,
+    ord("d"): dict,
+    ord("h"): set,
+    ord("H"): frozenset,
+}
 
-    def __init__(self, parent_index: int, children: int):
-        self.parent_index = parent_index
-        self.children = children
-        self.child = 0
 
-    def next_child(self) -> tuple[int, int, bool]:
-        c = self.child
-        assert c < self.children
-        self.child = c + 1
-        return self.parent_index, c, self.child == self.children
+def _load_int(b: bytes) -> int:
+    value = int(b)
+    if b"%d" % value != b:
+        raise ValueError("Non-canonical integer")
+    return value
+
+
+def _load_collection(tag: int, items: list[TraverseType]) -> TraverseType:
+    if tag == 108:  # l
+        return items
+    if tag == 116:  # t
+        return tuple(items)
+    if tag == 100:  # d
+        if len(items) & 1:
+            raise ValueError("Odd number of items for a dict")
+        it = iter(items)
+        try:
+            return dict(zip(it, it))
+        except TypeError:
+            raise ValueError("Unhashable dict key") from None
+    try:
+        if tag == 104:  # h
+            return set(items)
+        return frozenset(items)
+    except TypeError:
+        raise ValueError("Unhashable set item") from None
+
+
+def deterministic_loads(b: Union[bytes, bytearray, memoryview]) -> TraverseType:
+    """
+    Restore the object from the canonical binary serialization.
+    The input may be any object supporting the buffer protocol (bytes, bytearray, mmap, ...), it is not copied.
+    Implemented without recursion, the collections are built on a stack of the partially filled parents.
+    Raises ValueError if the serialization is malformed.
+    """
+    with memoryview(b) as mv:
+        n = len(mv)
+        i = len(VERSION_TAG)
+        if mv[:i] != VERSION_TAG:
+            raise ValueError("Unknown version")
+        empty_collections = _LOAD_EMPTY_COLLECTIONS
+        unpack_float_from = _unpack_float_from
+        small_ints = _LOAD_SMALL_INTS
+        stack: list[tuple[list[TraverseType], int, int]] = []
+        root: list[TraverseType] = []
+        items = root
+        remaining = 1
+        tag = 0
+        while i < n:
+            if not remaining:
+                raise ValueError("Trailing data")
+            c = mv[i]
+            i += 1
+            if 48 <= c <= 57:
+                num = c - 48
+                while True:
+                    if i >= n:
+                        raise ValueError("Truncated")
+                    c = mv[i]
+                    i += 1
+                    if 48 <= c <= 57:
+                        num = num * 10 + c - 48
+                    else:
+                        break
+                if c == 115 or c == 105 or c == 98:  # s, i, b
+                    j = i + num
+                    if j > n:
+                        raise ValueError("Truncated")
+                    if c == 115:
+                        value = str(mv[i:j], "utf-8")
+                    elif c == 105:
+                        payload = bytes(mv[i:j])
+                        value = small_ints.get(payload)
+                        if value is None:
+                            value = _load_int(payload)
+                    else:
+                        value = bytes(mv[i:j])
+                    i = j
+                elif c in empty_collections:
+                    if num:
+                        remaining -= 1
+                        stack.append((items, remaining, tag))
+                        items = []
+                        remaining = num
+                        tag = c
+                        continue
+                    value = empty_collections[c]()
+                else:
+                    raise ValueError(f"Invalid type with length {c!r}")
+            elif c == 102:  # f
+                if i + 8 > n:
+                    raise ValueError("Truncated")
+                value = unpack_float_from(mv, i)[0]
+                i += 8
+            elif c == 84:  # T
+                value = True
+            elif c == 70:  # F
+                value = False
+            elif c == 78:  # N
+                value = None
+            else:
+                raise ValueError(f"Invalid type {c!r}")
+            items.append(value)
+            remaining -= 1
+            while not remaining and stack:
+                value = _load_collection(tag, items)
+                items, remaining, tag = stack.pop()
+                items.append(value)
+        if remaining:
+            raise ValueError("Truncated")
+        return root[0]
+
+
+class _LoadStream:
+    """
+    Buffered reader of the serialization from a file object or an iterable of chunks.
+    Only the unparsed remainder of the last chunk and the value being parsed is buffered.
+    """
 
+    __slots__ = ("_read", "_buf", "_pos")
 
-def deterministic_loads(b: bytes) -> TraverseType:
+    def __init__(self, src: Union[BinaryIO, Iterable[bytes]], chunk_size: int):
+        if hasattr(src, "read"):
+            self._read = lambda: src.read(chunk_size) or None
+        else:
+            it = iter(src)
+            self._read = lambda: next(it, None)
+        self._buf = bytearray()
+        self._pos = 0
+
+    def _fill(self, n: int) -> bool:
+        """
+        Make at least n bytes available at the position, return False if the stream ended before.
+        """
+        buf = self._buf
+        if self._pos:
+            del buf[: self._pos]
+            self._pos = 0
+        while len(buf) < n:
+            chunk = self._read()
+            if chunk is None:
+                return False
+            buf += chunk
+        return True
+
+    def read(self, n: int) -> bytes:
+        if len(self._buf) - self._pos < n and not self._fill(n):
+            raise ValueError("Truncated")
+        pos = self._pos
+        self._pos = pos + n
+        return bytes(self._buf[pos : pos + n])
+
+    def tokens(self) -> Iterator[tuple[int, Any]]:
+        """
+        Yield the type and value of the serialized objects in order. The value of a collection is its length.
+        """
+        if self.read(len(VERSION_TAG)) != VERSION_TAG:
+            raise ValueError("Unknown version")
+        read = self.read
+        while True:
+            if self._pos == len(self._buf) and not self._fill(1):
+                return
+            c = self._buf[self._pos]
+            self._pos += 1
+            if 48 <= c <= 57:
+                num = c - 48
+                while True:
+                    if self._pos == len(self._buf) and not self._fill(1):
+                        raise ValueError("Truncated")
+                    c = self._buf[self._pos]
+                    self._pos += 1
+                    if 48 <= c <= 57:
+                        num = num * 10 + c - 48
+                    else:
+                        break
+                if c == 115:  # s
+                    yield c, read(num).decode("utf-8")
+                elif c == 105:  # i
+                    yield c, _load_int(read(num))
+                elif c == 98:  # b
+                    yield c, read(num)
+                elif c in _LOAD_EMPTY_COLLECTIONS:
+                    yield c, num
+                else:
+                    raise ValueError(f"Invalid type with length {c!r}")
+            elif c == 102:  # f
+                yield c, _unpack_float_from(read(8))[0]
+            elif c == 84:  # T
+                yield c, True
+            elif c == 70:  # F
+                yield c, False
+            elif c == 78:  # N
+                yield c, None
+            else:
+                raise ValueError(f"Invalid type {c!r}")
+
+
+class DeterministicCollection:
     """
-    Restore the object from the canonical binary serialization.
-    Implemented without recursion.
-    """
-    if not b.startswith(VERSION_TAG):
-        raise ValueError()
-    # List of Tuple[parent-index, child-index, collection--type-value-fn, collection-length-accum OR self-value]
-    data_map: list[tuple[int, int, Optional[Callable], Union[list[TraverseType], TraverseType]]] = []
-    parent_stack: list[_LoadParent] = [_LoadParent(-1, 1)]
-    i = len(VERSION_TAG)
-    while i < len(b):
-        nm = LOAD_NUM_RE.match(b, i)
-        if nm:
-            g = nm.group(1)
-            num = int(g.decode("utf-8"))
-            i += len(g)
+    The event of a collection in the serialization stream, followed by the events of its items.
+    The length is the number of the items, which for a dict is twice the number of its keys.
+    """
+
+    __slots__ = ("type", "length")
+
+    def __init__(self, type_: Type, length: int):
+        self.type = type_
+        self.length = length
+
+    def __eq__(self, other: Any) -> bool:
+        return isinstance(other, DeterministicCollection) and self.type is other.type and self.length == other.length
+
+    def __repr__(self) -> str:
+        return f"DeterministicCollection({self.type.__name__}, {self.length})"
+
+
+DETERMINISTIC_LOAD_CHUNK_SIZE = 1 << 16
+
+
+def deterministic_load(
+    src: Union[BinaryIO, Iterable[bytes]], chunk_size: int = DETERMINISTIC_LOAD_CHUNK_SIZE
+) -> TraverseType:
+    """
+    Restore the object from the canonical binary serialization read from a file object or an iterable of chunks.
+    Implemented without recursion, the collections are built on a stack of the partially filled parents.
+    Raises ValueError if the serialization is malformed.
+    """
+    stack: list[tuple[list[TraverseType], int, int]] = []
+    root: list[TraverseType] = []
+    items = root
+    remaining = 1
+    tag = 0
+    for c, value in _LoadStream(src, chunk_size).tokens():
+        if not remaining:
+            raise ValueError("Trailing data")
+        if c in _LOAD_EMPTY_COLLECTIONS:
+            if value:
+                remaining -= 1
+                stack.append((items, remaining, tag))
+                items = []
+                remaining = value
+                tag = c
+                continue
+            value = _LOAD_EMPTY_COLLECTIONS[c]()
+        items.append(value)
+        remaining -= 1
+        while not remaining and stack:
+            value = _load_collection(tag, items)
+            items, remaining, tag = stack.pop()
+            items.append(value)
+    if remaining:
+        raise ValueError("Truncated")
+    return root[0]
+
+
+def deterministic_load_events(
+    src: Union[BinaryIO, Iterable[bytes]], chunk_size: int = DETERMINISTIC_LOAD_CHUNK_SIZE
+) -> Generator[tuple[tuple[int, ...], Any], None, None]:
+    """
+    Decode the canonical binary serialization read from a file object or an iterable of chunks, without materializing
+    the collections. Yield the (path, value) of the objects in the order of traverse(), where the path is the tuple of
+    the item indexes from the root. The collections are yielded as DeterministicCollection, the keys and values of a
+    dict are its items alternately in the serialized order.
+    Raises ValueError if the serialization is malformed.
+    """
+    path: list[int] = []
+    remaining: list[int] = []
+    # the items of a collection that must be hashable: 0 - none, 1 - the keys of a dict, 2 - all
+    hashable: list[int] = []
+    done = False
+    for c, value in _LoadStream(src, chunk_size).tokens():
+        if done:
+            raise ValueError("Trailing data")
+        if c in _LOAD_EMPTY_COLLECTIONS:
+            if c == 100 and value & 1:
+                raise ValueError("Odd number of items for a dict")
+            if hashable and (hashable[-1] == 2 or (hashable[-1] == 1 and not path[-1] & 1)):
+                if c != 116 and c != 72:  # only the tuple and frozenset are hashable, if all of their items are
+                    raise ValueError("Unhashable dict key" if hashable[-1] == 1 else "Unhashable set item")
+                mode = 2
+            else:
+                mode = 1 if c == 100 else 2 if c == 104 or c == 72 else 0
+            yield tuple(path), DeterministicCollection(_LOAD_EMPTY_COLLECTIONS[c], value)
+            if value:
+                path.append(0)
+                remaining.append(value)
+                hashable.append(mode)
+                continue
         else:
-            num = None
-        t = b[i : i + 1]
-        len_type, val_fn = PYTHON_PRIMITIVES_DETERMINISTIC_TRANSFORM_UNMAP[t]
-        if (num is None) is not (len_type >= 0):
-            ValueError()
-        if num is None:
-            num = len_type
-        i += 1
-        pi, nc, pd = parent_stack[-1].next_child()
-        if pd:
-            try:
-                parent_stack.pop()
-            except IndexError:
-                raise ValueError()
-        if len_type == DYNAMIC_LENGTH_COLLECTION:
-            if num > 0:
-                parent_stack.append(_LoadParent(len(data_map), num))
-            data_map.append((pi, nc, val_fn, [None] * num))
+            yield tuple(path), value
+        while remaining:
+            remaining[-1] -= 1
+            if remaining[-1]:
+                path[-1] += 1
+                break
+            path.pop()
+            remaining.pop()
+            hashable.pop()
+        else:
+            done = True
+    if not done:
+        raise ValueError("Truncated")
+
+
+MERKLE_LEAF_SIZE = 1024
+
+
+class DeterministicMerkleCache:
+    """
+    Bounded LRU cache of the digests of deterministic_merkle_hash keyed by object identity and the hash algorithm.
+    Only the immutable subtrees (tuples and frozensets of immutable items) and the large leaves are cached. The entries
+    keep their objects alive, so an identity can not be reused while it is cached. Thread-safe.
+    """
+
+    __slots__ = ("max_entries", "_entries", "_lock", "hits", "misses", "evictions")
+
+    def __init__(self, max_entries: int = 4096):
+        if max_entries < 1:  # pragma: no cover
+            raise ValueError("Merkle cache 'max_entries' must be at least one.")
+        self.max_entries = max_entries
+        # (id, algo-key) -> (object, digest)
+        self._entries: OrderedDict[tuple[int, Hashable], tuple[Any, bytes]] = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def stats(self) -> dict:
+        return {"entries": len(self._entries), "hits": self.hits, "misses": self.misses, "evictions": self.evictions}
+
+    def get(self, o: Any, algo_key: Hashable) -> Optional[bytes]:
+        key = (id(o), algo_key)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry[1]
+
+    def put(self, o: Any, algo_key: Hashable, digest: bytes) -> None:
+        key = (id(o), algo_key)
+        with self._lock:
+            self._entries[key] = (o, digest)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+
+def deterministic_merkle_hash(
+    arg: TraverseType,
+    algo: str,
+    cache: Optional[DeterministicMerkleCache] = None,
+    executor: Optional[Executor] = None,
+    **algo_kw,
+) -> bytes:
+    """
+    Calculate the Merkle-style canonical hash of the object. The digest of a collection is calculated from its header
+    and items, where the scalar items are serialized the same as by deterministic_dumps, but the collections and the
+    str (bytes) items of at least MERKLE_LEAF_SIZE characters (bytes) are replaced by their digests.
+    With a cache the digests of the immutable subtrees are memoized, so re-hashing a mostly unchanged structure costs
+    about the size of the change and of the mutable collections. The digest does not depend on the cache, but it
+    differs from deterministic_hash, the version is tagged by MERKLE_VERSION_TAG.
+
+    If an executor is given, the items of the large collections (from the root down through the collections of at
+    least MERKLE_PARALLEL_MIN_ITEMS items) are hashed in batches by its workers. The digest is the same as the serial
+    one, regardless of the workers and batches. The thread pool can use multiple cores for the hashing of large values,
+    because hashlib releases the GIL for them. For a process pool the algorithm must be picklable, and the cache is
+    only used in the calling process.
+    """
+    algo_key = (algo, tuple(sorted(algo_kw.items())))
+    buf = bytearray(MERKLE_VERSION_TAG)
+    if executor is None:
+        _merkle_contributions((arg,), buf, partial(getattr(hashlib, algo), **algo_kw), cache, algo_key)
+    else:
+        _merkle_parallel_contributions(arg, buf, algo, algo_kw, cache, algo_key, executor, set())
+    return getattr(hashlib, algo)(buf, **algo_kw).digest()
+
+
+MERKLE_PARALLEL_MIN_ITEMS = 64
+MERKLE_PARALLEL_BATCH_ITEMS = 1024
+MERKLE_PARALLEL_BATCH_SIZE = 1 << 20
+
+
+def _merkle_collection(o: TraverseType) -> tuple[bytes, Sequence[TraverseType]]:
+    """
+    Return the header and the items of a collection in the hashed order.
+    """
+    t = type(o)
+    if t is dict:
+        return b"%dd" % (len(o) << 1), [x for k in sorted(o, key=str) for x in (k, o[k])]
+    if t is list:
+        return b"%dl" % len(o), o
+    if t is tuple:
+        return b"%dt" % len(o), o
+    if t is set:
+        return b"%dh" % len(o), sorted(o, key=str)
+    if t is frozenset:
+        return b"%dH" % len(o), sorted(o, key=str)
+    raise KeyError(t)
+
+
+def _merkle_batch(
+    items: Sequence[TraverseType],
+    algo: str,
+    algo_kw: dict[str, Any],
+    cache: Optional[DeterministicMerkleCache],
+    algo_key: Hashable,
+) -> bytes:
+    buf = bytearray()
+    _merkle_contributions(items, buf, partial(getattr(hashlib, algo), **algo_kw), cache, algo_key)
+    return bytes(buf)
+
+
+def _merkle_parallel_contributions(
+    o: TraverseType,
+    buf: bytearray,
+    algo: str,
+    algo_kw: dict[str, Any],
+    cache: Optional[DeterministicMerkleCache],
+    algo_key: Hashable,
+    executor: Executor,
+    path: set[int],
+) -> None:
+    """
+    Append the contribution of the object to the buffer, splitting the items of the large collections to batches.
+    The recursion is limited to the large collections.
+    """
+    t = type(o)
+    if t not in (dict, list, tuple, set, frozenset) or len(o) < MERKLE_PARALLEL_MIN_ITEMS:
+        _merkle_contributions((o,), buf, partial(getattr(hashlib, algo), **algo_kw), cache, algo_key)
+        return
+    if (o_id := id(o)) in path:
+        raise TraverseCycleError()
+    path.add(o_id)
+    task_cache = None if isinstance(executor, ProcessPoolExecutor) else cache
+    header, items = _merkle_collection(o)
+    parts: list[Union[bytes, Future]] = []
+    batch: list[TraverseType] = []
+    batch_size = 0
+    for x in items:
+        if type(x) in (dict, list, tuple, set, frozenset) and len(x) >= MERKLE_PARALLEL_MIN_ITEMS:
+            if batch:
+                parts.append(executor.submit(_merkle_batch, batch, algo, algo_kw, task_cache, algo_key))
+                batch = []
+                batch_size = 0
+            part = bytearray()
+            _merkle_parallel_contributions(x, part, algo, algo_kw, cache, algo_key, executor, path)
+            parts.append(bytes(part))
+            continue
+        batch.append(x)
+        batch_size += len(x) if type(x) in (str, bytes) else 16
+        if len(batch) >= MERKLE_PARALLEL_BATCH_ITEMS or batch_size >= MERKLE_PARALLEL_BATCH_SIZE:
+            parts.append(executor.submit(_merkle_batch, batch, algo, algo_kw, task_cache, algo_key))
+            batch = []
+            batch_size = 0
+    if batch:
+        parts.append(executor.submit(_merkle_batch, batch, algo, algo_kw, task_cache, algo_key))
+    h = getattr(hashlib, algo)(header, **algo_kw)
+    for part in parts:
+        h.update(part if type(part) is bytes else part.result())
+    buf += b"#"
+    buf += h.digest()
+    path.remove(o_id)
+
+
+def _merkle_contributions(
+    items: Iterable[TraverseType],
+    buf: bytearray,
+    new: Callable[..., Any],
+    cache: Optional[DeterministicMerkleCache],
+    algo_key: Hashable,
+) -> None:
+    """
+    Append the contributions of the items to the buffer: the serialization of the small scalars or the digests.
+    Implemented without recursion, the frames of the collections being hashed are kept on a stack.
+    Only the digests of the maximal immutable subtrees are cached: the digests of the immutable items of an immutable
+    collection are pending until it is known whether the collection itself is cached instead.
+    """
+    leaf_size = MERKLE_LEAF_SIZE
+    stack: list[tuple[bytearray, Iterator[TraverseType], Any, int, bool, list[tuple[Any, bytes]]]] = []
+    path: set[int] = set()
+    # the root frame holds the items
+    it = iter(items)
+    obj = None
+    obj_id = 0
+    immutable = False
+    pending: list[tuple[Any, bytes]] = []
+    while True:
+        for o in it:
+            t = type(o)
+            if t is str or t is bytes:
+                if len(o) >= leaf_size:
+                    digest = None if cache is None else cache.get(o, algo_key)
+                    if digest is None:
+                        b = o.encode("utf-8") if t is str else o
+                        h = new(b"%ds" % len(b) if t is str else b"%db" % len(b))
+                        h.update(b)
+                        digest = h.digest()
+                        if cache is not None:
+                            pending.append((o, digest))
+                    buf += b"#"
+                    buf += digest
+                elif t is str:
+                    b = o.encode("utf-8")
+                    buf += b"%ds" % len(b)
+                    buf += b
+                else:
+                    buf += b"%db" % len(o)
+                    buf += o
+            elif t is int:
+                b = b"%d" % o
+                buf += b"%di" % len(b)
+                buf += b
+            elif t is float:
+                buf += b"f"
+                buf += _pack_float(o)
+            elif t is bool:
+                buf += b"T" if o else b"F"
+            elif o is None:
+                buf += b"N"
+            else:
+                if cache is not None and (t is tuple or t is frozenset):
+                    digest = cache.get(o, algo_key)
+                    if digest is not None:
+                        buf += b"#"
+                        buf += digest
+                        continue
+                header, children = _merkle_collection(o)
+                if (o_id := id(o)) in path:
+                    raise TraverseCycleError()
+                path.add(o_id)
+                stack.append((buf, it, obj, obj_id, immutable, pending))
+                buf = bytearray(header)
+                it = iter(children)
+                obj = o
+                obj_id = o_id
+                immutable = t is tuple or t is frozenset
+                pending = []
+                break
         else:
-            data_map.append((pi, nc, None, val_fn(b[i : i + num])))
-            i += num
-    if parent_stack:
-        # serialized data did not end correctly
-        raise ValueError()
-    for i in range(len(data_map) - 1, 0, -1):
-        parent_index, child_index, collection_type_value_fn, value = data_map[i]
-        data_map[parent_index][3][child_index] = (
-            value if collection_type_value_fn is None else collection_type_value_fn(value)
-        )
-    _, _, collection_type_value_fn, value = data_map[0]
-    return value if collection_type_value_fn is None else collection_type_value_fn(value)
+            if cache is not None and not immutable:
+                for pending_obj, pending_digest in pending:
+                    cache.put(pending_obj, algo_key, pending_digest)
+            if not stack:
+                return
+            digest = new(buf).digest()
+            path.remove(obj_id)
+            child_obj = obj
+            child_immutable = immutable
+            buf, it, obj, obj_id, immutable, pending = stack.pop()
+            if child_immutable:
+                if cache is not None:
+                    pending.append((child_obj, digest))
+            else:
+                immutable = False
+            buf += b"#"
+            buf += digest
@@ -0,0 +1,5 @@
+"""
+Micro-benchmarks of the library. These are not part of the distributed package, run them like:
+
+    python -m tarka_bench.aio_worker_call
+"""
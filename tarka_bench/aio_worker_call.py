@@ -0,0 +1,76 @@
+"""
+Compare the synchronous call path of the aio worker with pooled completion locks to the previous design, which
+allocated a threading.Event for every job.
+"""
+
+import asyncio
+import threading
+from functools import partialmethod
+
+from tarka.utility.aio_worker import AbstractAioWorker, AbstractWorkerJob, PartialMethodThreadWorkerJob
+from tarka_bench.common import measure_calls, format_result
+
+
+class _EventThreadWorkerJob(PartialMethodThreadWorkerJob):
+    """
+    The Event-per-job design for reference.
+    """
+
+    __slots__ = ("event",)
+
+    def __init__(self, impl_fn, args):
+        AbstractWorkerJob.__init__(self)
+        self.lock = None
+        self.result = None
+        self.state = self.STATE_WAIT
+        self.impl_fn = impl_fn
+        self.args = args
+        self.event = threading.Event()
+
+    def _wake(self):
+        self.event.set()
+
+    def get_result(self, timeout=None):
+        if not self.event.wait(timeout):
+            self.cancel()
+            raise TimeoutError
+        if self.state == self.STATE_RESULT:
+            return self.result
+        raise self.result
+
+
+class _BenchAioWorker(AbstractAioWorker):
+    __slots__ = ()
+
+    def _thread_init(self):
+        pass
+
+    def _thread_cleanup(self):
+        pass
+
+    def _noop_impl(self):
+        return None
+
+    noop_call = partialmethod(AbstractAioWorker._method_call, _noop_impl)
+
+    def noop_call_event(self):
+        job = _EventThreadWorkerJob(_BenchAioWorker._noop_impl, ())
+        self._put_job(job)
+        return job.get_result()
+
+
+def run(count: int = 20000) -> dict:
+    async def _main():
+        async with _BenchAioWorker.create() as w:
+            results = {}
+            for name, fn in [("event_per_job", w.noop_call_event), ("pooled_lock", w.noop_call)]:
+                await asyncio.to_thread(measure_calls, fn, count // 10)  # warm-up
+                results[name] = await asyncio.to_thread(measure_calls, fn, count)
+            return results
+
+    return asyncio.run(_main())
+
+
+if __name__ == "__main__":
+    for name, result in run().items():
+        print(format_result(name, result))
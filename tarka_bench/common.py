@@ -0,0 +1,76 @@
+import json
+import os
+import platform
+import sys
+import time
+from typing import Callable, Any, Sequence
+
+import tarka
+
+
+def summarise(latencies: list[float], elapsed: float) -> dict:
+    """
+    Summarise the throughput and the latencies in seconds of the jobs completed in the elapsed time.
+    """
+    latencies = sorted(latencies)
+    count = len(latencies)
+    return {
+        "count": count,
+        "per_second": count / elapsed if elapsed > 0.0 else 0.0,
+        "p50": latencies[count // 2] if count else 0.0,
+        "p99": latencies[min(count - 1, count * 99 // 100)] if count else 0.0,
+    }
+
+
+def measure_calls(fn: Callable[[], Any], count: int) -> dict:
+    """
+    Call the function repeatedly and summarise the throughput and the latencies.
+    """
+    latencies = []
+    start = time.perf_counter()
+    for _ in range(count):
+        t = time.perf_counter()
+        fn()
+        latencies.append(time.perf_counter() - t)
+    return summarise(latencies, time.perf_counter() - start)
+
+
+def format_result(name: str, result: dict) -> str:
+    return (
+        f"{name:<64} {result['per_second']:>12.0f}/s"
+        f"  p50 {result['p50'] * 1e6:>9.1f}us  p99 {result['p99'] * 1e6:>9.1f}us"
+    )
+
+
+def environment() -> dict:
+    return {
+        "tarka": tarka.__version__,
+        "python": sys.version,
+        "implementation": platform.python_implementation(),
+        "platform": platform.platform(),
+        "machine": platform.machine(),
+        "cpus": os.cpu_count(),
+        "time": time.time(),
+    }
+
+
+def save_results(path: str, results: Sequence[dict]) -> None:
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump({"environment": environment(), "results": list(results)}, f, indent=2, sort_keys=True)
+
+
+def load_results(path: str) -> dict[str, dict]:
+    with open(path, encoding="utf-8") as f:
+        return {r["name"]: r for r in json.load(f)["results"]}
+
+
+def format_comparison(result: dict, baseline: dict) -> str:
+    """
+    Relative change of the throughput and latencies, positive throughput and negative latency changes are better.
+    """
+
+    def _rel(key: str) -> str:
+        base = baseline[key]
+        return f"{(result[key] - base) / base * 100.0:+7.1f}%" if base else "    n/a"
+
+    return f"{result['name']:<64} {_rel('per_second')}/s  p50 {_rel('p50')}  p99 {_rel('p99')}"
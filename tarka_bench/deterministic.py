@@ -0,0 +1,237 @@
+"""
+Compare the generic traverse based deterministic serialization to the optimized encoder, and the table driven
+decoder to the reworked one on a config/state-like tree. The outputs are checked to be identical before measuring.
+The Merkle hash is measured cold and warm after a small change, on a tree of immutable records, and by the number of
+the hashing threads on a wide list of large values.
+
+    python -m tarka_bench.deterministic [--output results.json] [--size 20000]
+"""
+
+import argparse
+import hashlib
+import random
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor
+from io import BytesIO
+from typing import Callable, Optional, Union
+
+from tarka.utility.algorithm.traverse import TraverseType
+from tarka.utility.serialize.deterministic import (
+    deterministic_dumps,
+    deterministic_hash,
+    deterministic_loads,
+    deterministic_merkle_hash,
+    DeterministicMerkleCache,
+    _deterministic_transform,
+    PYTHON_PRIMITIVES_DETERMINISTIC_TRANSFORM_UNMAP,
+    DYNAMIC_LENGTH_COLLECTION,
+    LOAD_NUM_RE,
+    VERSION_TAG,
+)
+from tarka_bench.common import save_results
+
+SEED = 20240601
+
+
+def make_tree(size: int, seed: int = SEED) -> dict:
+    """
+    Nested dicts of records with mixed scalar values, sets and lists, about 250 bytes serialized per record.
+    """
+    rng = random.Random(seed)
+    return {
+        f"section-{s}": {
+            f"record-{r}": {
+                "id": rng.randint(0, 1 << 40),
+                "name": "".join(rng.choice("abcdefghijklmnopqrstuvwxyz") for _ in range(12)),
+                "enabled": rng.random() < 0.5,
+                "weight": rng.random(),
+                "tags": {f"tag{rng.randint(0, 50)}" for _ in range(4)},
+                "history": [rng.randint(0, 1000) for _ in range(8)],
+                "parent": None,
+                "blob": rng.randbytes(16),
+                "limits": (rng.randint(0, 100), rng.randint(100, 1000)),
+            }
+            for r in range(100)
+        }
+        for s in range(max(1, size // 100))
+    }
+
+
+def _generic_dumps(arg) -> bytes:
+    buf = BytesIO()
+    _deterministic_transform(arg, buf.write, prefix=VERSION_TAG)
+    return buf.getvalue()
+
+
+def _generic_hash(arg) -> bytes:
+    h = hashlib.sha256()
+    _deterministic_transform(arg, h.update, prefix=VERSION_TAG)
+    return h.digest()
+
+
+class _LoadParent:
+    __slots__ = ("parent_index", "children", "child")
+
+    def __init__(self, parent_index: int, children: int):
+        self.parent_index = parent_index
+        self.children = children
+        self.child = 0
+
+    def next_child(self) -> tuple[int, int, bool]:
+        c = self.child
+        assert c < self.children
+        self.child = c + 1
+        return self.parent_index, c, self.child == self.children
+
+
+def _unmap_loads(b: bytes) -> TraverseType:
+    """
+    The original table driven decoder of the canonical binary serialization, using the
+    PYTHON_PRIMITIVES_DETERMINISTIC_TRANSFORM_UNMAP, as the reference of the reworked one.
+    """
+    if not b.startswith(VERSION_TAG):
+        raise ValueError()
+    # List of Tuple[parent-index, child-index, collection--type-value-fn, collection-length-accum OR self-value]
+    data_map: list[tuple[int, int, Optional[Callable], Union[list[TraverseType], TraverseType]]] = []
+    parent_stack: list[_LoadParent] = [_LoadParent(-1, 1)]
+    i = len(VERSION_TAG)
+    while i < len(b):
+        nm = LOAD_NUM_RE.match(b, i)
+        if nm:
+            g = nm.group(1)
+            num = int(g.decode("utf-8"))
+            i += len(g)
+        else:
+            num = None
+        t = b[i : i + 1]
+        len_type, val_fn = PYTHON_PRIMITIVES_DETERMINISTIC_TRANSFORM_UNMAP[t]
+        if (num is None) is not (len_type >= 0):
+            raise ValueError()
+        if num is None:
+            num = len_type
+        i += 1
+        pi, nc, pd = parent_stack[-1].next_child()
+        if pd:
+            try:
+                parent_stack.pop()
+            except IndexError:
+                raise ValueError()
+        if len_type == DYNAMIC_LENGTH_COLLECTION:
+            if num > 0:
+                parent_stack.append(_LoadParent(len(data_map), num))
+            data_map.append((pi, nc, val_fn, [None] * num))
+        else:
+            data_map.append((pi, nc, None, val_fn(b[i : i + num])))
+            i += num
+    if parent_stack:
+        # serialized data did not end correctly
+        raise ValueError()
+    for i in range(len(data_map) - 1, 0, -1):
+        parent_index, child_index, collection_type_value_fn, value = data_map[i]
+        data_map[parent_index][3][child_index] = (
+            value if collection_type_value_fn is None else collection_type_value_fn(value)
+        )
+    _, _, collection_type_value_fn, value = data_map[0]
+    return value if collection_type_value_fn is None else collection_type_value_fn(value)
+
+
+def _measure(fn, arg, repeat: int = 3) -> float:
+    elapsed = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn(arg)
+        elapsed.append(time.perf_counter() - start)
+    return min(elapsed)
+
+
+def run(size: int = 20000) -> list[dict]:
+    tree = make_tree(size)
+    expected = _generic_dumps(tree)
+    if deterministic_dumps(tree) != expected:
+        raise Exception("The optimized encoder output differs from the generic one")
+    if deterministic_hash(tree, "sha256") != hashlib.sha256(expected).digest():
+        raise Exception("The optimized hash differs from the generic one")
+    if deterministic_loads(expected) != tree or _unmap_loads(expected) != tree:
+        raise Exception("The decoded tree differs from the original")
+    print(f"tree of {size} records, {len(expected)} bytes serialized, outputs are identical")
+    results = []
+    for op, arg, engines in (
+        ("dumps", tree, (("generic", _generic_dumps), ("encoder", deterministic_dumps))),
+        ("hash", tree, (("generic", _generic_hash), ("encoder", lambda o: deterministic_hash(o, "sha256")))),
+        ("loads", expected, (("unmap", _unmap_loads), ("decoder", deterministic_loads))),
+    ):
+        for engine, fn in engines:
+            elapsed = _measure(fn, arg)
+            name = f"deterministic/{op}/engine={engine}"
+            results.append(dict(name=name, per_second=len(expected) / elapsed, elapsed=elapsed))
+            print(f"{name:<50} {len(expected) / elapsed / 1e6:>9.1f} MB/s")
+    return results
+
+
+def _freeze(o):
+    if type(o) is dict:
+        return tuple((k, _freeze(v)) for k, v in sorted(o.items()))
+    if type(o) in (list, tuple):
+        return tuple(_freeze(x) for x in o)
+    if type(o) is set:
+        return frozenset(o)
+    return o
+
+
+def run_merkle(size: int = 20000) -> list[dict]:
+    # mutable sections of immutable records
+    tree = {
+        section: {key: _freeze(record) for key, record in records.items()}
+        for section, records in make_tree(size).items()
+    }
+    cache = DeterministicMerkleCache(max_entries=size * 2)
+    results = []
+    for engine, fn in (
+        ("hash", lambda: deterministic_hash(tree, "sha256")),
+        ("merkle/cold", lambda: (cache.clear(), deterministic_merkle_hash(tree, "sha256", cache))),
+        ("merkle/warm", lambda: deterministic_merkle_hash(tree, "sha256", cache)),
+    ):
+        fn()
+        section = tree["section-0"]
+        section["record-0"] = (section["record-0"], 1)  # small change between the measurements
+        elapsed = _measure(lambda _: fn(), None)
+        name = f"deterministic/merkle/engine={engine}"
+        results.append(dict(name=name, per_second=1.0 / elapsed, elapsed=elapsed))
+        print(f"{name:<50} {elapsed * 1e3:>9.1f} ms")
+    return results
+
+
+def run_parallel(values: int = 256, value_size: int = 1 << 18) -> list[dict]:
+    rng = random.Random(SEED)
+    wide = [rng.randbytes(value_size) for _ in range(values)]
+    total = values * value_size
+    expected = deterministic_merkle_hash(wide, "sha256")
+    results = []
+    for workers in sorted({1, 2, 4, os.cpu_count() or 1}):
+        with ThreadPoolExecutor(workers) as executor:
+            if deterministic_merkle_hash(wide, "sha256", executor=executor) != expected:
+                raise Exception("The parallel Merkle hash differs from the serial one")
+            elapsed = _measure(lambda _: deterministic_merkle_hash(wide, "sha256", executor=executor), None)
+        name = f"deterministic/merkle-parallel/workers={workers}"
+        results.append(dict(name=name, per_second=total / elapsed, elapsed=elapsed))
+        print(f"{name:<50} {total / elapsed / 1e6:>9.1f} MB/s")
+    elapsed = _measure(lambda _: deterministic_merkle_hash(wide, "sha256"), None)
+    name = "deterministic/merkle-parallel/serial"
+    results.append(dict(name=name, per_second=total / elapsed, elapsed=elapsed))
+    print(f"{name:<50} {total / elapsed / 1e6:>9.1f} MB/s")
+    return results
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--output", help="save the results to this JSON file")
+    parser.add_argument("--size", type=int, default=20000, help="number of records in the tree")
+    args = parser.parse_args(argv)
+    results = run(args.size) + run_merkle(args.size) + run_parallel()
+    if args.output:
+        save_results(args.output, results)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,80 @@
+"""
+Compare the chained two-way merges to the heap merge of iter_merge by the number of inputs,
+and the item-wise merge to the chunked merge by the overlap of the inputs.
+
+    python -m tarka_bench.iter_merge [--output results.json]
+"""
+
+import argparse
+import random
+import time
+from functools import reduce
+
+from itertools import chain
+
+from tarka.utility.algorithm.iter import iter_merge_two, iter_merge_heap, iter_merge, iter_merge_chunks
+from tarka_bench.common import save_results
+
+SEED = 20240601
+ITEMS = 200000
+CHUNK = 1000
+
+
+def _chained(*item_iters, key=None, ascending=True):
+    return reduce(lambda m, i: iter_merge_two(m, i, key=key, ascending=ascending), item_iters[1:], iter(item_iters[0]))
+
+
+def _measure(fn, inputs, **kwargs) -> float:
+    start = time.perf_counter()
+    for _ in fn(*inputs, **kwargs):
+        pass
+    return time.perf_counter() - start
+
+
+def run(input_counts=(2, 3, 4, 8, 16, 64, 256)) -> list[dict]:
+    rng = random.Random(SEED)
+    results = []
+    for k in input_counts:
+        inputs = [sorted(rng.random() for _ in range(ITEMS // k)) for _ in range(k)]
+        for keyed in (False, True):
+            kwargs = dict(key=lambda x: -x, ascending=False) if keyed else {}
+            for engine, fn in (("chained", _chained), ("heap", iter_merge_heap)):
+                elapsed = min(_measure(fn, inputs, **kwargs) for _ in range(3))
+                name = f"iter_merge/inputs={k}/key={keyed}/engine={engine}"
+                results.append(dict(name=name, per_second=ITEMS / elapsed, elapsed=elapsed))
+                print(f"{name:<50} {ITEMS / elapsed:>12.0f} items/s")
+    return results
+
+
+def _iter_merge_flat(*chunk_iters):
+    return iter_merge(*(chain.from_iterable(c) for c in chunk_iters))
+
+
+def run_chunks(overlaps=(0.0, 0.01, 0.1, 1.0)) -> list[dict]:
+    rng = random.Random(SEED)
+    results = []
+    for overlap in overlaps:
+        # the inputs cover consecutive ranges, which are shared by the given fraction
+        n = ITEMS // 2
+        a = sorted(rng.random() for _ in range(n))
+        b = sorted(1.0 - overlap + rng.random() for _ in range(n))
+        inputs = [[x[i : i + CHUNK] for i in range(0, n, CHUNK)] for x in (a, b)]
+        for engine, fn in (("items", _iter_merge_flat), ("chunks", iter_merge_chunks)):
+            elapsed = min(_measure(fn, inputs) for _ in range(3))
+            name = f"iter_merge_chunks/overlap={overlap}/engine={engine}"
+            results.append(dict(name=name, per_second=ITEMS / elapsed, elapsed=elapsed))
+            print(f"{name:<50} {ITEMS / elapsed:>12.0f} items/s")
+    return results
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--output", help="save the results to this JSON file")
+    args = parser.parse_args(argv)
+    results = run() + run_chunks()
+    if args.output:
+        save_results(args.output, results)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,209 @@
+"""
+Throughput and latency benchmark suite of the aio worker and the aio-sqlite worker. Each case runs a fixed number of
+jobs split between the concurrent producers, and reports the jobs per second and the p50/p99 latencies of the jobs.
+The results can be saved as JSON and compared to a previous run to catch regressions:
+
+    python -m tarka_bench.suite --output new.json --compare old.json
+
+The cases can be filtered by a substring of their names, the --quick option reduces the job counts for a smoke run.
+Each case is repeated and the median run by throughput is reported to reduce the noise.
+"""
+
+import argparse
+import asyncio
+import os
+import random
+import tempfile
+import time
+import uuid
+from functools import partialmethod
+from typing import Callable, Optional, Iterator
+
+from tarka.utility.aio_sqlite import AbstractAioSQLiteDatabase
+from tarka.utility.aio_worker import AbstractAioWorker
+from tarka_bench.common import summarise, format_result, save_results, load_results, format_comparison
+
+SEED = 20240601
+LARGE_JOB_DURATION = 0.0002  # seconds of CPU work
+
+
+def _busy(duration: float) -> None:
+    end = time.perf_counter() + duration
+    while time.perf_counter() < end:
+        pass
+
+
+class _BenchAioWorker(AbstractAioWorker):
+    __slots__ = ()
+
+    def _thread_init(self):
+        pass
+
+    def _thread_cleanup(self):
+        pass
+
+    def _small_impl(self, value):
+        return value
+
+    def _large_impl(self, value):
+        _busy(LARGE_JOB_DURATION)
+        return value
+
+    small = partialmethod(AbstractAioWorker._method_job, _small_impl)
+    large = partialmethod(AbstractAioWorker._method_job, _large_impl)
+    sync_small = partialmethod(AbstractAioWorker._method_call, _small_impl)
+    sync_large = partialmethod(AbstractAioWorker._method_call, _large_impl)
+
+
+class _BenchAioSQLiteDatabase(AbstractAioSQLiteDatabase):
+    __slots__ = ()
+
+    KEYS = 10000
+
+    def _setup(self):
+        self._con.execute("CREATE TABLE IF NOT EXISTS Data0 (key INTEGER PRIMARY KEY, value TEXT)")
+        self._con.executemany(
+            "INSERT OR IGNORE INTO Data0(key, value) VALUES (?, ?)", ((k, f"value-{k}") for k in range(self.KEYS))
+        )
+
+    def _write_impl(self, key):
+        self._con.execute("REPLACE INTO Data0(key, value) VALUES (?, ?)", (key, f"new-{key}"))
+
+    def _read_impl(self, key):
+        return self._con.execute("SELECT value FROM Data0 WHERE key = ?", (key,)).fetchall()
+
+    def _scan_impl(self, key):
+        return self._con.execute("SELECT key, value FROM Data0 WHERE key >= ? LIMIT 1000", (key,)).fetchall()
+
+    write = partialmethod(AbstractAioSQLiteDatabase._run_job, _write_impl)
+    read = partialmethod(AbstractAioSQLiteDatabase._run_read_job, _read_impl)
+    scan = partialmethod(AbstractAioSQLiteDatabase._run_read_job, _scan_impl)
+    sync_write = partialmethod(AbstractAioSQLiteDatabase._run_call, _write_impl)
+    sync_read = partialmethod(AbstractAioSQLiteDatabase._run_read_call, _read_impl)
+
+
+async def _run_producers(
+    producers: int, jobs: int, submit: Callable[[random.Random], object], sync: bool
+) -> tuple[list[float], float]:
+    """
+    Run the jobs split between the concurrent producers, which are asyncio tasks or threads for sync submission.
+    The submit function is called with the random generator of the producer and returns an awaitable if not sync.
+    """
+    per_producer = jobs // producers
+    latencies = []
+
+    async def _async_producer(rng):
+        for _ in range(per_producer):
+            t = time.perf_counter()
+            await submit(rng)
+            latencies.append(time.perf_counter() - t)
+
+    def _sync_producer(rng):
+        for _ in range(per_producer):
+            t = time.perf_counter()
+            submit(rng)
+            latencies.append(time.perf_counter() - t)
+
+    rngs = [random.Random(SEED + i) for i in range(producers)]
+    start = time.perf_counter()
+    if sync:
+        await asyncio.gather(*[asyncio.to_thread(_sync_producer, rng) for rng in rngs])
+    else:
+        await asyncio.gather(*[_async_producer(rng) for rng in rngs])
+    return latencies, time.perf_counter() - start
+
+
+def _worker_cases(quick: bool) -> Iterator[tuple[str, dict, Callable]]:
+    for size in ("small", "large"):
+        for sync in (False, True):
+            for producers in (1, 4, 16):
+                for max_batch in (None, 64):
+                    jobs = (2000 if size == "large" else 20000) // (10 if quick else 1)
+                    params = dict(size=size, sync=sync, producers=producers, max_batch=max_batch)
+
+                    async def _case(size=size, sync=sync, producers=producers, max_batch=max_batch, jobs=jobs):
+                        async with _BenchAioWorker.create(max_batch=max_batch) as w:
+                            fn = getattr(w, f"sync_{size}" if sync else size)
+                            return await _run_producers(producers, jobs, lambda rng: fn(0), sync)
+
+                    yield _case_name("worker", params), params, _case
+
+
+def _sqlite_cases(quick: bool, db_dir: str) -> Iterator[tuple[str, dict, Callable]]:
+    mixes = {"write": 1.0, "read": 0.0, "mixed": 0.1, "scan": None}
+    for mix, write_ratio in mixes.items():
+        for sync in (False, True):
+            if mix == "scan" and sync:
+                continue
+            for producers in (1, 4, 16):
+                for readers in (0, 2):
+                    if mix == "write" and readers:
+                        continue
+                    jobs = (500 if mix == "scan" else 5000) // (10 if quick else 1)
+                    params = dict(mix=mix, sync=sync, producers=producers, readers=readers, max_batch=64)
+
+                    async def _case(
+                        mix=mix, write_ratio=write_ratio, sync=sync, producers=producers, readers=readers, jobs=jobs
+                    ):
+                        db_path = os.path.join(db_dir, f"{uuid.uuid4()}.sqlite3")
+                        async with _BenchAioSQLiteDatabase.create(db_path, max_batch=64, readers=readers) as db:
+                            keys = _BenchAioSQLiteDatabase.KEYS
+                            if mix == "scan":
+                                submit = lambda rng: db.scan(rng.randrange(keys))  # noqa: E731
+                            else:
+                                write = db.sync_write if sync else db.write
+                                read = db.sync_read if sync else db.read
+
+                                def submit(rng):
+                                    key = rng.randrange(keys)
+                                    return write(key) if rng.random() < write_ratio else read(key)
+
+                            result = await _run_producers(producers, jobs, submit, sync)
+                        await db.closed.wait()
+                        return result
+
+                    yield _case_name("sqlite", params), params, _case
+
+
+def _case_name(kind: str, params: dict) -> str:
+    return "/".join([kind] + [f"{k}={v}" for k, v in params.items()])
+
+
+async def _run(names: Optional[str], quick: bool, repeat: int) -> list[dict]:
+    results = []
+    with tempfile.TemporaryDirectory() as db_dir:
+        for name, params, case in [*_worker_cases(quick), *_sqlite_cases(quick, db_dir)]:
+            if names and names not in name:
+                continue
+            runs = []
+            for _ in range(repeat):
+                latencies, elapsed = await case()
+                runs.append(summarise(latencies, elapsed))
+            runs.sort(key=lambda r: r["per_second"])
+            result = dict(name=name, params=params, repeat=repeat, **runs[len(runs) // 2])  # the median run
+            print(format_result(name, result))
+            results.append(result)
+    return results
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--output", help="save the results to this JSON file")
+    parser.add_argument("--compare", help="compare the results to a previously saved JSON file")
+    parser.add_argument("--filter", help="run the cases with names containing this")
+    parser.add_argument("--quick", action="store_true", help="run fewer jobs for a smoke test")
+    parser.add_argument("--repeat", type=int, default=3, help="report the median of this many runs of each case")
+    args = parser.parse_args(argv)
+    results = asyncio.run(_run(args.filter, args.quick, args.repeat))
+    if args.output:
+        save_results(args.output, results)
+    if args.compare:
+        baseline = load_results(args.compare)
+        print("\nCompared to", args.compare)
+        for result in results:
+            if result["name"] in baseline:
+                print(format_comparison(result, baseline[result["name"]]))
+
+
+if __name__ == "__main__":
+    main()
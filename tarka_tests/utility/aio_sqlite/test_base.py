@@ -1,4 +1,5 @@
 import asyncio
+import sqlite3
 import time
 import uuid
 from functools import partialmethod
@@ -6,6 +7,7 @@ from functools import partialmethod
 import pytest
 
 from tarka.utility.aio_sqlite import AbstractAioSQLiteDatabase
+from tarka.utility.aio_worker_stats import AioWorkerStats
 
 
 class _SQLiteDbgException(Exception):
@@ -15,9 +17,9 @@ class _SQLiteDbgException(Exception):
 class _TestingAioSQLiteDatabase(AbstractAioSQLiteDatabase):
     __slots__ = ("_wal",)
 
-    def __init__(self, wal: bool, *args):
+    def __init__(self, wal: bool, *args, **kwargs):
         self._wal = wal
-        AbstractAioSQLiteDatabase.__init__(self, *args)
+        AbstractAioSQLiteDatabase.__init__(self, *args, **kwargs)
 
     def _initialise(self):
         if self._wal:
@@ -80,11 +82,21 @@ class _TestingAioSQLiteDatabase(AbstractAioSQLiteDatabase):
     sync_get_all = partialmethod(AbstractAioSQLiteDatabase._run_call, _get_all_impl)
     sync_get_old = partialmethod(AbstractAioSQLiteDatabase._run_call, _get_old_impl)
 
+    insert_many = partialmethod(
+        AbstractAioSQLiteDatabase._run_many_job,
+        "INSERT INTO Data0(account_id, filename, meta, mtime) VALUES (?, ?, ?, ?)",
+    )
+    sync_insert_many = partialmethod(
+        AbstractAioSQLiteDatabase._run_many_call,
+        "INSERT INTO Data0(account_id, filename, meta, mtime) VALUES (?, ?, ?, ?)",
+    )
+
 
 @pytest.mark.asyncio
 @pytest.mark.parametrize("wal", [False, True])
-async def test_aio_sqlite_base(tmpdir, wal):
-    args = wal, str(tmpdir.join(str(uuid.uuid4()))), 1.0
+@pytest.mark.parametrize("max_batch", [None, 16])
+async def test_aio_sqlite_base(tmpdir, wal, max_batch):
+    args = wal, str(tmpdir.join(str(uuid.uuid4()))), 1.0, max_batch
     db = _TestingAioSQLiteDatabase(*args)
     with pytest.raises(AttributeError):
         await db.get_all()
@@ -171,3 +183,25 @@ async def test_aio_sqlite_base(tmpdir, wal):
 
     await asyncio.sleep(0.1)  # allow stop callbacks to finish
     assert db.closed.is_set()
+
+
+@pytest.mark.asyncio
+async def test_aio_sqlite_many(tmpdir):
+    args = True, str(tmpdir.join(str(uuid.uuid4()))), 1.0
+    stats = AioWorkerStats()
+    async with _TestingAioSQLiteDatabase.create(*args, cached_statements=16, metrics=stats) as db:
+        rows = [(i, f"/f/{i}", b"m", float(i)) for i in range(1000)]
+        assert await db.insert_many(rows[:500]) == 500
+        assert await asyncio.to_thread(db.sync_insert_many, iter(rows[500:])) == 500
+        assert await db.get_all() == rows
+        # the whole bulk statement is rolled back on error
+        with pytest.raises(sqlite3.IntegrityError):
+            await db.insert_many([(5000, "/x", b"", 0.0), rows[0]])
+        assert await db.get(5000, "/x") is None
+        assert await db.insert_many([]) == 0
+
+    await asyncio.wait_for(db.closed.wait(), 1.0)
+    # the bulk statements are labelled by the statement
+    labels = stats.summary()["labels"]
+    assert labels["INSERT INTO Data0(account_id, filename, meta, mtime) VALUES (?, ?, ?, ?)"]["execute"]["count"] == 4
+    assert labels["_TestingAioSQLiteDatabase._get_all_impl"]["execute"]["count"] == 1
@@ -0,0 +1,78 @@
+import asyncio
+import sqlite3
+import time
+import uuid
+from functools import partialmethod
+
+import pytest
+
+from tarka.utility.aio_sqlite import AbstractAioSQLiteDatabase, SQLiteBusyRetry
+
+
+class _TestingAioSQLiteDatabase(AbstractAioSQLiteDatabase):
+    def _setup(self):
+        self._con.execute("CREATE TABLE IF NOT EXISTS Data0 (key INTEGER PRIMARY KEY, value INTEGER)")
+
+    def _write_impl(self, key, value, delay=0.0):
+        self._con.execute("REPLACE INTO Data0(key, value) VALUES (?, ?)", (key, value))
+        time.sleep(delay)
+
+    def _increment_impl(self, key, delay=0.0):
+        # read first, so the deferred transaction must be upgraded to write
+        rows = self._con.execute("SELECT value FROM Data0 WHERE key = ?", (key,)).fetchall()
+        time.sleep(delay)
+        self._con.execute("REPLACE INTO Data0(key, value) VALUES (?, ?)", (key, rows[0][0] + 1 if rows else 1))
+
+    def _get_impl(self, key):
+        rows = self._con.execute("SELECT value FROM Data0 WHERE key = ?", (key,)).fetchall()
+        return rows[0][0] if rows else None
+
+    write = partialmethod(AbstractAioSQLiteDatabase._run_job, _write_impl)
+    increment = partialmethod(AbstractAioSQLiteDatabase._run_job, _increment_impl, begin_immediate=False)
+    get = partialmethod(AbstractAioSQLiteDatabase._run_job, _get_impl, begin_immediate=False)
+
+
+@pytest.mark.asyncio
+async def test_aio_sqlite_busy_retry(tmpdir):
+    db_path = str(tmpdir.join(str(uuid.uuid4())))
+    # the databases have their own connections, just like separate processes would
+    async with _TestingAioSQLiteDatabase.create(db_path, 0.01) as db0:
+        async with _TestingAioSQLiteDatabase.create(db_path, 0.01) as db1:
+            slow = asyncio.create_task(db0.write(0, 0, 0.2))
+            await asyncio.sleep(0.05)
+            with pytest.raises(sqlite3.OperationalError):
+                await db1.write(1, 1)
+            await slow
+
+        busy_retry = SQLiteBusyRetry(busy_timeout=0.001, retry_timeout=1.0)
+        async with _TestingAioSQLiteDatabase.create(db_path, 0.01, busy_retry=busy_retry) as db1:
+            slow = asyncio.create_task(db0.write(0, 0, 0.2))
+            await asyncio.sleep(0.05)
+            await db1.write(1, 1)
+            await slow
+            stats = busy_retry.stats()
+            assert stats["busy_errors"] > 0
+            assert stats["busy_transactions"] == 1
+            assert stats["failures"] == 0
+            assert stats["wait_time"] > 0.0
+
+            # the read-write transaction is retried as a whole when the snapshot became stale
+            busy_transactions = stats["busy_transactions"]
+            increment = asyncio.create_task(db1.increment(1, 0.1))
+            await asyncio.sleep(0.05)
+            await db0.write(1, 10)
+            await increment
+            assert await db1.get(1) == 11
+            assert busy_retry.stats()["busy_transactions"] == busy_transactions + 1
+
+            # give up after the retry timeout
+            busy_retry.retry_timeout = 0.05
+            slow = asyncio.create_task(db0.write(0, 0, 0.3))
+            await asyncio.sleep(0.05)
+            with pytest.raises(sqlite3.OperationalError):
+                await db1.write(1, 1)
+            await slow
+            assert busy_retry.stats()["failures"] == 1
+
+        await asyncio.wait_for(db1.closed.wait(), 1.0)
+    await asyncio.wait_for(db0.closed.wait(), 1.0)
@@ -0,0 +1,123 @@
+import asyncio
+import time
+import uuid
+from functools import partialmethod
+
+import pytest
+
+from tarka.utility.aio_sqlite import AbstractAioSQLiteDatabase, SQLiteReadCache
+
+
+class _TestingAioSQLiteDatabase(AbstractAioSQLiteDatabase):
+    __slots__ = ("reads",)
+
+    def __init__(self, *args, **kwargs):
+        AbstractAioSQLiteDatabase.__init__(self, *args, **kwargs)
+        self.reads = 0
+
+    def _setup(self):
+        self._con.execute("CREATE TABLE IF NOT EXISTS Data0 (key INTEGER PRIMARY KEY, value TEXT)")
+
+    def _write_impl(self, key, value, delay=0.0):
+        self._con.execute("REPLACE INTO Data0(key, value) VALUES (?, ?)", (key, value))
+        time.sleep(delay)
+
+    def _get_impl(self, key, delay=0.0):
+        self.reads += 1
+        time.sleep(delay)
+        rows = self._con.execute("SELECT value FROM Data0 WHERE key = ?", (key,)).fetchall()
+        return rows[0][0] if rows else None
+
+    def _count_impl(self):
+        self.reads += 1
+        return self._con.execute("SELECT COUNT(*) FROM Data0").fetchall()[0][0]
+
+    write = partialmethod(AbstractAioSQLiteDatabase._run_job, _write_impl, invalidates=lambda k, v, d=0.0: [("d", k)])
+    sync_write = partialmethod(
+        AbstractAioSQLiteDatabase._run_call, _write_impl, invalidates=lambda k, v, d=0.0: [("d", k)]
+    )
+    write_many = partialmethod(
+        AbstractAioSQLiteDatabase._run_many_job, "REPLACE INTO Data0(key, value) VALUES (?, ?)", invalidates=["d"]
+    )
+    write_many_keys = partialmethod(
+        AbstractAioSQLiteDatabase._run_many_job,
+        "REPLACE INTO Data0(key, value) VALUES (?, ?)",
+        invalidates=lambda rows: [("d", k) for k, _ in rows],
+    )
+    write_untracked = partialmethod(AbstractAioSQLiteDatabase._run_job, _write_impl)
+    get = partialmethod(AbstractAioSQLiteDatabase._run_cached_job, _get_impl, tags=lambda k, d=0.0: [("d", k)])
+    count = partialmethod(AbstractAioSQLiteDatabase._run_cached_job, _count_impl, tags=["d"])
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("max_batch", [None, 8])
+async def test_aio_sqlite_cache(tmpdir, max_batch):
+    db_path = str(tmpdir.join(str(uuid.uuid4())))
+    cache = SQLiteReadCache(max_entries=4)
+    async with _TestingAioSQLiteDatabase.create(db_path, 1.0, max_batch=max_batch, cache=cache) as db:
+        assert await db.get(0) is None
+        assert await db.get(0) is None
+        assert db.reads == 1
+        await db.write(0, "a")
+        assert await db.get(0) == "a"
+        assert await db.count() == 1
+        await db.write(1, "b")  # invalidates the table-level entries, but not the other keys
+        assert await db.get(0) == "a"
+        assert await db.count() == 2
+        assert db.reads == 4
+        await asyncio.to_thread(db.sync_write, 0, "c")
+        await asyncio.sleep(0.01)  # the invalidation of a thread caller arrives asynchronously
+        assert await db.get(0) == "c"
+        await db.write_many([(0, "d"), (1, "e")])  # invalidates the whole table
+        assert [await db.get(0), await db.get(1), await db.count()] == ["d", "e", 2]
+        assert db.reads == 8
+        # the untracked writes are not visible
+        await db.write_untracked(0, "x")
+        assert await db.get(0) == "d"
+        # the rows of an iterator are used by the invalidation tags and the statement as well
+        assert await db.write_many_keys((k, v) for k, v in [(0, "g"), (1, "h")]) == 2
+        assert [await db.get(0), await db.get(1), await db.count()] == ["g", "h", 2]
+        assert db.reads == 11
+
+        # the result of a read in flight during an invalidation is not stored
+        reads = db.reads
+        get = asyncio.create_task(db.get(2, 0.1))
+        await asyncio.sleep(0.05)
+        await db.write(2, "f")
+        assert await get is None
+        assert await db.get(2) == "f"
+        assert db.reads == reads + 2
+
+        # LRU eviction
+        for i in range(10):
+            await db.get(i + 10)
+        assert cache.stats()["entries"] == 4
+        assert cache.stats()["evictions"] > 0
+        reads = db.reads
+        await db.get(19)
+        await db.get(10)
+        assert db.reads == reads + 1
+
+    await asyncio.wait_for(db.closed.wait(), 1.0)
+
+
+@pytest.mark.asyncio
+async def test_aio_sqlite_cache_bounds(tmpdir):
+    db_path = str(tmpdir.join(str(uuid.uuid4())))
+    cache = SQLiteReadCache(max_bytes=400, ttl=0.05)
+    async with _TestingAioSQLiteDatabase.create(db_path, 1.0, cache=cache) as db:
+        await db.write(0, "x" * 100)
+        await db.write(1, "y" * 1000)
+        assert await db.get(0) == "x" * 100
+        assert await db.get(1) == "y" * 1000  # too large to be cached
+        assert cache.stats()["entries"] == 1
+        await db.get(0)
+        await db.get(1)
+        assert db.reads == 3
+        await asyncio.sleep(0.06)
+        await db.get(0)  # expired
+        assert db.reads == 4
+        cache.clear()
+        assert cache.stats()["entries"] == 0
+
+    await asyncio.wait_for(db.closed.wait(), 1.0)
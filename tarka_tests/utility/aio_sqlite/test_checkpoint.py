@@ -0,0 +1,150 @@
+import asyncio
+import os
+import time
+import uuid
+from functools import partialmethod
+
+import pytest
+
+from tarka.utility.aio_sqlite import AbstractAioSQLiteDatabase, SQLiteCheckpointPolicy
+
+
+class _TestingAioSQLiteDatabase(AbstractAioSQLiteDatabase):
+    __slots__ = ("_checkpoints",)
+
+    def _initialise(self):
+        AbstractAioSQLiteDatabase._initialise(self)
+        self._checkpoints = []
+        self._con.set_trace_callback(self._trace)
+
+    def _trace(self, statement: str):
+        if statement.startswith("PRAGMA wal_checkpoint"):
+            self._checkpoints.append(statement[22:-2])
+
+    def _setup(self):
+        self._con.execute("CREATE TABLE IF NOT EXISTS Data0 (key INTEGER PRIMARY KEY, value TEXT)")
+
+    def _write_impl(self, key, value):
+        self._con.execute("REPLACE INTO Data0(key, value) VALUES (?, ?)", (key, value))
+
+    def _create_impl(self, name):
+        self._con.execute(f"CREATE TABLE {name} (key INTEGER PRIMARY KEY)")
+
+    def _iter_impl(self):
+        return self._con.execute("SELECT key, value FROM Data0 ORDER BY key")
+
+    def _checkpoints_impl(self):
+        return list(self._checkpoints)
+
+    write = partialmethod(AbstractAioSQLiteDatabase._run_job, _write_impl)
+    create_table = partialmethod(AbstractAioSQLiteDatabase._run_job, _create_impl)
+    iter_all = partialmethod(AbstractAioSQLiteDatabase._run_iter_job, _iter_impl, chunk_size=1)
+    write_deferred = partialmethod(AbstractAioSQLiteDatabase._run_job, _write_impl, begin_immediate=False)
+    checkpoints = partialmethod(AbstractAioSQLiteDatabase._run_job, _checkpoints_impl)
+
+
+@pytest.mark.asyncio
+async def test_aio_sqlite_checkpoint_idle(tmpdir):
+    db_path = str(tmpdir.join(str(uuid.uuid4())))
+    policy = SQLiteCheckpointPolicy(changes=None, idle=0.05, escalate_interval=None)
+    async with _TestingAioSQLiteDatabase.create(db_path, 1.0, checkpoint=policy) as db:
+        for i in range(5):
+            await db.write(i, str(i))
+            await asyncio.sleep(0.01)
+        assert await db.checkpoints() == []
+        await asyncio.sleep(0.1)
+        assert await db.checkpoints() == ["PASSIVE"]
+        await asyncio.sleep(0.1)
+        assert await db.checkpoints() == ["PASSIVE"]
+
+        # the barrier waits for the next checkpoint, or returns immediately if there is nothing to sync
+        await db.write(5, "5")
+        t = time.perf_counter()
+        await asyncio.gather(db.durable(), db.durable(), asyncio.to_thread(db.durable_call))
+        assert 0.03 < time.perf_counter() - t < 0.2
+        assert await db.checkpoints() == ["PASSIVE"] * 2
+        await db.durable()
+        assert await db.checkpoints() == ["PASSIVE"] * 2
+
+    await asyncio.wait_for(db.closed.wait(), 1.0)
+
+
+@pytest.mark.asyncio
+async def test_aio_sqlite_checkpoint_durable_ddl(tmpdir):
+    db_path = str(tmpdir.join(str(uuid.uuid4())))
+    policy = SQLiteCheckpointPolicy(changes=None, idle=None, escalate_interval=None)
+    async with _TestingAioSQLiteDatabase.create(db_path, 1.0, checkpoint=policy) as db:
+        # the setup is synced by the first barrier
+        await db.durable()
+        assert await db.checkpoints() == ["PASSIVE"]
+        await db.durable()
+        assert await db.checkpoints() == ["PASSIVE"]
+        # schema changes do not count in the total changes of the connection, but are synced as well
+        await db.create_table("Data1")
+        await db.durable()
+        assert await db.checkpoints() == ["PASSIVE"] * 2
+        # the writes of deferred transactions are synced as well
+        await db.write_deferred(0, "0")
+        await db.durable()
+        assert await db.checkpoints() == ["PASSIVE"] * 3
+        # read-only transactions do not need a checkpoint, even the immediate ones
+        await db.durable()
+        assert await db.checkpoints() == ["PASSIVE"] * 3
+
+    await asyncio.wait_for(db.closed.wait(), 1.0)
+
+
+@pytest.mark.asyncio
+async def test_aio_sqlite_checkpoint_changes(tmpdir):
+    db_path = str(tmpdir.join(str(uuid.uuid4())))
+    policy = SQLiteCheckpointPolicy(changes=10, idle=None, escalate_interval=None)
+    async with _TestingAioSQLiteDatabase.create(db_path, 1.0, checkpoint=policy) as db:
+        for i in range(25):
+            await db.write(i, str(i))
+        assert await db.checkpoints() == ["PASSIVE"] * 2
+
+    await asyncio.wait_for(db.closed.wait(), 1.0)
+
+
+@pytest.mark.asyncio
+async def test_aio_sqlite_checkpoint_escalate(tmpdir):
+    db_path = str(tmpdir.join(str(uuid.uuid4())))
+    policy = SQLiteCheckpointPolicy(changes=None, idle=None, escalate_interval=0.05)
+    async with _TestingAioSQLiteDatabase.create(db_path, 1.0, checkpoint=policy) as db:
+        await db.write(0, "0")
+        assert os.path.getsize(db_path + "-wal") > 0
+        await asyncio.sleep(0.2)
+        assert await db.checkpoints() == ["TRUNCATE"]
+        assert os.path.getsize(db_path + "-wal") == 0
+
+    await asyncio.wait_for(db.closed.wait(), 1.0)
+
+
+@pytest.mark.asyncio
+async def test_aio_sqlite_checkpoint_durable_blocked(tmpdir):
+    db_path = str(tmpdir.join(str(uuid.uuid4())))
+    policy = SQLiteCheckpointPolicy(changes=None, idle=0.02, escalate_interval=None)
+    async with _TestingAioSQLiteDatabase.create(db_path, 1.0, checkpoint=policy) as db:
+        await db.write(0, "0")
+        await db.durable()
+        # an open stream holds its snapshot, the checkpoint can not be completed until it is closed
+        stream = db.iter_all()
+        assert await stream.__anext__() == (0, "0")
+        await db.write(1, "1")
+        durable = asyncio.create_task(db.durable())
+        await asyncio.sleep(0.15)
+        assert not durable.done()
+        assert len(await db.checkpoints()) > 2
+        await stream.aclose()
+        await asyncio.wait_for(durable, 0.2)
+
+        # the waiters are cancelled when the database is closed
+        stream = db.iter_all()
+        assert await stream.__anext__() == (0, "0")
+        await db.write(2, "2")
+        durable = asyncio.create_task(db.durable())
+        await asyncio.sleep(0.05)
+
+    await asyncio.wait_for(db.closed.wait(), 1.0)
+    with pytest.raises(asyncio.CancelledError):
+        await durable
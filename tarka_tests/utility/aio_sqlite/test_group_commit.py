@@ -0,0 +1,79 @@
+import asyncio
+import time
+import uuid
+from functools import partialmethod
+
+import pytest
+
+from tarka.utility.aio_sqlite import AbstractAioSQLiteDatabase
+
+
+class _SQLiteDbgException(Exception):
+    pass
+
+
+class _TestingAioSQLiteDatabase(AbstractAioSQLiteDatabase):
+    __slots__ = ("_commits",)
+
+    def _initialise(self):
+        AbstractAioSQLiteDatabase._initialise(self)
+        self._commits = 0
+        self._con.set_trace_callback(self._trace)
+
+    def _trace(self, statement: str):
+        if statement == "COMMIT":
+            self._commits += 1
+
+    def _setup(self):
+        self._con.execute("CREATE TABLE IF NOT EXISTS Data0 (key TEXT PRIMARY KEY, value TEXT)")
+
+    def _write_impl(self, key, value, error=None, delay=0.0):
+        time.sleep(delay)
+        self._con.execute("INSERT INTO Data0(key, value) VALUES (?, ?)", (key, value))
+        if error:
+            raise error
+
+    def _get_all_impl(self):
+        return self._con.execute("SELECT key, value FROM Data0 ORDER BY key").fetchall()
+
+    def _commits_impl(self):
+        return self._commits
+
+    write = partialmethod(AbstractAioSQLiteDatabase._run_job, _write_impl)
+    write_checkpoint = partialmethod(
+        AbstractAioSQLiteDatabase._run_job, _write_impl, post_process_fn=AbstractAioSQLiteDatabase._checkpoint
+    )
+    sync_write = partialmethod(AbstractAioSQLiteDatabase._run_call, _write_impl)
+    get_all = partialmethod(AbstractAioSQLiteDatabase._run_job, _get_all_impl, begin_immediate=False)
+    commits = partialmethod(AbstractAioSQLiteDatabase._run_job, _commits_impl, begin_immediate=False)
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("group_commit", [False, True])
+async def test_aio_sqlite_group_commit(tmpdir, group_commit):
+    db_path = str(tmpdir.join(str(uuid.uuid4())))
+    async with _TestingAioSQLiteDatabase.create(db_path, 1.0, max_batch=100, group_commit=group_commit) as db:
+        commits = await db.commits()
+        slow = asyncio.create_task(db.write("a", "a", None, 0.2))
+        await asyncio.sleep(0.05)
+        tasks = [
+            asyncio.create_task(db.write(f"k{i:02}", str(i), _SQLiteDbgException() if i == 10 else None))
+            for i in range(50)
+        ]
+        tasks.append(asyncio.create_task(db.write("k05", "duplicate")))
+        tasks.append(asyncio.create_task(db.write_checkpoint("x", "x")))
+        tasks.append(asyncio.create_task(asyncio.to_thread(db.sync_write, "y", "y")))
+        await slow
+        results = await asyncio.gather(*tasks, return_exceptions=True)
+        assert isinstance(results[10], _SQLiteDbgException)
+        assert isinstance(results[50], Exception)  # integrity error of the duplicate key
+        assert all(r is None for i, r in enumerate(results) if i not in (10, 50))
+        rows = await db.get_all()
+        assert rows == [("a", "a")] + [(f"k{i:02}", str(i)) for i in range(50) if i != 10] + [("x", "x"), ("y", "y")]
+        commits = await db.commits() - commits
+        if group_commit:
+            assert commits < 10
+        else:
+            assert commits > 50
+
+    await asyncio.wait_for(db.closed.wait(), 1.0)
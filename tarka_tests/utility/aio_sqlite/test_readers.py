@@ -0,0 +1,103 @@
+import asyncio
+import sqlite3
+import threading
+import time
+import uuid
+from functools import partialmethod
+
+import pytest
+
+from tarka.utility.aio_sqlite import AbstractAioSQLiteDatabase
+from tarka.utility.aio_worker_stats import AioWorkerStats
+
+
+class _TestingAioSQLiteDatabase(AbstractAioSQLiteDatabase):
+    def _setup(self):
+        self._con.execute("CREATE TABLE IF NOT EXISTS Data0 (key TEXT PRIMARY KEY, value TEXT)")
+
+    def _write_impl(self, key, value, delay=0.0):
+        self._con.execute("REPLACE INTO Data0(key, value) VALUES (?, ?)", (key, value))
+        time.sleep(delay)
+
+    def _read_impl(self, key, delay=0.0):
+        time.sleep(delay)
+        rows = self._con.execute("SELECT value FROM Data0 WHERE key = ?", (key,)).fetchall()
+        if rows:
+            return rows[0][0], threading.get_ident()
+
+    write = partialmethod(AbstractAioSQLiteDatabase._run_job, _write_impl)
+    read = partialmethod(AbstractAioSQLiteDatabase._run_read_job, _read_impl)
+    read_write = partialmethod(AbstractAioSQLiteDatabase._run_read_job, _write_impl)
+    sync_read = partialmethod(AbstractAioSQLiteDatabase._run_read_call, _read_impl)
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("readers", [0, 1, 3])
+async def test_aio_sqlite_readers(tmpdir, readers):
+    db_path = str(tmpdir.join(str(uuid.uuid4())))
+    async with _TestingAioSQLiteDatabase.create(db_path, 1.0, readers=readers) as db:
+        assert await db.read("k0") is None
+        await db.write("k0", "v0")
+        assert (await db.read("k0"))[0] == "v0"
+        assert (await asyncio.to_thread(db.sync_read, "k0"))[0] == "v0"
+
+        # readers are not blocked by the writer and each other
+        t = time.perf_counter()
+        wt = asyncio.create_task(db.write("k0", "v1", 0.3))
+        await asyncio.sleep(0.05)
+        results = await asyncio.gather(*[db.read("k0", 0.1) for _ in range(readers)])
+        if readers:
+            assert time.perf_counter() - t < 0.25
+            assert [r[0] for r in results] == ["v0"] * readers
+        await wt
+        assert (await db.read("k0"))[0] == "v1"
+        if readers > 1:
+            idents = {r[1] for r in await asyncio.gather(*[db.read("k0", 0.05) for _ in range(readers)])}
+            assert len(idents) == readers
+
+        if readers:
+            with pytest.raises(sqlite3.OperationalError):
+                await db.read_write("k1", "v1")
+        assert await db.read("k1") is None
+
+    await asyncio.wait_for(db.closed.wait(), 1.0)
+    with pytest.raises(AttributeError):
+        await db.read("k0")
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("readers", [0, 2])
+async def test_aio_sqlite_readers_max_pending(tmpdir, readers):
+    db_path = str(tmpdir.join(str(uuid.uuid4())))
+    async with _TestingAioSQLiteDatabase.create(db_path, 1.0, readers=readers, max_pending=2) as db:
+        await db.write("k0", "v0")
+        results = await asyncio.gather(*[db.read("k0", 0.01) for _ in range(20)])
+        assert [r[0] for r in results] == ["v0"] * 20
+        results = await asyncio.gather(*[asyncio.to_thread(db.sync_read, "k0", 0.01) for _ in range(8)])
+        assert [r[0] for r in results] == ["v0"] * 8
+
+        # the queued reads are counted in the pending jobs
+        reads = [asyncio.create_task(db.read("k0", 0.05)) for _ in range(max(readers, 1) + 2)]
+        await asyncio.sleep(0.02)
+        assert db.pending() == 2
+        await asyncio.gather(*reads)
+        assert db.pending() == 0
+
+    await asyncio.wait_for(db.closed.wait(), 1.0)
+
+
+@pytest.mark.asyncio
+async def test_aio_sqlite_readers_metrics(tmpdir):
+    db_path = str(tmpdir.join(str(uuid.uuid4())))
+    stats = AioWorkerStats()
+    async with _TestingAioSQLiteDatabase.create(db_path, 1.0, readers=2, metrics=stats) as db:
+        slow = asyncio.create_task(db.write("k0", "v0", 0.2))
+        await asyncio.sleep(0.05)
+        writes = [asyncio.create_task(db.write(f"k{i}", "v")) for i in range(1, 4)]
+        await asyncio.sleep(0.01)
+        # the readers report the depth of the writer queue as well
+        await db.read("k0")
+        assert stats.summary()["depth"] == 3
+        await asyncio.gather(slow, *writes)
+
+    await asyncio.wait_for(db.closed.wait(), 1.0)
@@ -0,0 +1,88 @@
+import asyncio
+import gc
+import uuid
+from functools import partialmethod
+
+import pytest
+
+from tarka.utility.aio_sqlite import AbstractAioSQLiteDatabase
+
+
+class _SQLiteDbgException(Exception):
+    pass
+
+
+class _TestingAioSQLiteDatabase(AbstractAioSQLiteDatabase):
+    def _setup(self):
+        self._con.execute("CREATE TABLE IF NOT EXISTS Data0 (key INTEGER PRIMARY KEY, value TEXT)")
+
+    def _write_impl(self, key, value):
+        self._con.execute("REPLACE INTO Data0(key, value) VALUES (?, ?)", (key, value))
+
+    def _iter_impl(self, error=None):
+        if error:
+            raise error
+        return self._con.execute("SELECT key, value FROM Data0 ORDER BY key")
+
+    def _open_streams_impl(self):
+        return len(self._stream_cons)
+
+    write_many = partialmethod(AbstractAioSQLiteDatabase._run_many_job, "REPLACE INTO Data0(key, value) VALUES (?, ?)")
+    write = partialmethod(AbstractAioSQLiteDatabase._run_job, _write_impl)
+    iter_all = partialmethod(AbstractAioSQLiteDatabase._run_iter_job, _iter_impl, chunk_size=10)
+    open_streams = partialmethod(AbstractAioSQLiteDatabase._run_job, _open_streams_impl, begin_immediate=False)
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("readers", [0, 2])
+async def test_aio_sqlite_stream(tmpdir, readers):
+    db_path = str(tmpdir.join(str(uuid.uuid4())))
+    async with _TestingAioSQLiteDatabase.create(db_path, 1.0, readers=readers) as db:
+        assert [r async for r in db.iter_all()] == []
+        rows = [(i, str(i)) for i in range(95)]
+        await db.write_many(rows)
+        assert [r async for r in db.iter_all()] == rows
+        await db.write(95, "95")
+        rows.append((95, "95"))
+        assert [r async for r in db.iter_all()] == rows  # exact multiple of the chunk size
+        assert await db.open_streams() == 0
+
+        # the stream reads a consistent snapshot while the writer is not blocked
+        stream = db.iter_all()
+        assert await stream.__anext__() == (0, "0")
+        assert await db.open_streams() == 1
+        await db.write(0, "x")
+        await db.write(200, "200")
+        assert [(0, "0")] + [r async for r in stream] == rows
+        assert await db.open_streams() == 0
+        rows[0] = (0, "x")
+        rows.append((200, "200"))
+
+        # early close
+        async with db.iter_all() as stream:
+            async for r in stream:
+                if r[0] == 15:
+                    break
+        assert await db.open_streams() == 0
+        stream = db.iter_all()
+        assert await stream.__anext__() == (0, "x")
+        del stream
+        gc.collect()
+        await asyncio.sleep(0.1)
+        assert await db.open_streams() == 0
+
+        with pytest.raises(_SQLiteDbgException):
+            async for _ in db.iter_all(_SQLiteDbgException()):
+                pass  # pragma: no cover
+        assert await db.open_streams() == 0
+
+        # unfinished streams are closed with the database
+        stream = db.iter_all()
+        assert await stream.__anext__() == (0, "x")
+
+    await asyncio.wait_for(db.closed.wait(), 1.0)
+    assert len(db._stream_cons) == 0
+    await stream.aclose()
+    with pytest.raises(AttributeError):
+        async for _ in db.iter_all():
+            pass  # pragma: no cover
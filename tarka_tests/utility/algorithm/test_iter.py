@@ -7,9 +7,15 @@ from tarka.utility.algorithm.iter import (
     iter_unique,
     iter_merge_two,
     iter_merge,
+    iter_merge_heap,
     iter_merge_unique,
     iter_all_same,
     iter_merge_zip,
+    iter_merge_zip_multi,
+    iter_merge_chunks,
+    iter_merge_two_chunks,
+    iter_merge_unique_chunks,
+    iter_merge_zip_chunks,
     SENTINEL,
 )
 from tarka.utility.sentinel import NamedObject
@@ -86,6 +92,42 @@ def test_algorithm_iter_merge_two():
         ) == reorder([(1, 5), *reorder([(2, "a"), (2, 2)]), (3, 5)])
 
 
+def test_algorithm_iter_merge_zip_multi():
+    s = SENTINEL
+    assert list(iter_merge_zip_multi()) == []
+    assert list(iter_merge_zip_multi([], [], [])) == []
+    assert list(iter_merge_zip_multi([1, 3, 3], [2, 3], [1, 4])) == [
+        (1, s, 1),
+        (s, 2, s),
+        (3, 3, s),
+        (3, s, s),
+        (s, s, 4),
+    ]
+    for ascending in [True, False]:
+        reorder = (lambda x: x) if ascending else lambda x: list(reversed(x))
+        for n in range(1, 6):
+            for _ in range(20):
+                xs = [
+                    reorder(sorted((random.randint(1, 20), i) for _ in range(random.randint(0, 15)))) for i in range(n)
+                ]
+                s = NamedObject("s")
+                zipped = list(iter_merge_zip_multi(*xs, key=lambda x: x[0], ascending=ascending, s=s))
+                for j in range(n):
+                    assert [row[j] for row in zipped if row[j] is not s] == xs[j]
+                keys = [{x[0] for x in row if x is not s} for row in zipped]
+                assert all(len(k) == 1 for k in keys)
+                keys = [k.pop() for k in keys]
+                assert keys == sorted(keys, reverse=not ascending)
+                for k in set(keys):
+                    assert keys.count(k) == max(sum(1 for x in xs_ if x[0] == k) for xs_ in xs)
+                if n == 2:
+                    assert zipped == list(iter_merge_zip(*xs, key=lambda x: x[0], ascending=ascending, s=s))
+                    ys = [[x[0] for x in xs_] for xs_ in xs]
+                    assert list(iter_merge_zip_multi(*ys, ascending=ascending)) == list(
+                        iter_merge_zip(*ys, ascending=ascending)
+                    )
+
+
 def test_algorithm_iter_merge_and_unique():
     for merge in (iter_merge, iter_merge_unique):
         assert list(merge()) == []
@@ -110,6 +152,100 @@ def test_algorithm_iter_merge_and_unique():
         )
 
 
+def test_algorithm_iter_merge_heap():
+    assert list(iter_merge_heap()) == []
+    assert list(iter_merge_heap([], [])) == []
+    for ascending in [True, False]:
+        reorder = (lambda x: x) if ascending else lambda x: list(reversed(x))
+        for n in (1, 2, 5, 50):
+            xs = [reorder(sorted((random.randint(1, 20), i) for _ in range(random.randint(0, 25)))) for i in range(n)]
+            # equal keys are yielded in the order of the inputs, the same as by the chained two-way merges
+            expected = list(chain(*xs))
+            expected.sort(key=lambda x: x[1])
+            expected.sort(key=lambda x: x[0], reverse=not ascending)
+            assert list(iter_merge_heap(*xs, key=lambda x: x[0], ascending=ascending)) == expected
+            chained = iter(xs[0])
+            for x in xs[1:]:
+                chained = iter_merge_two(chained, x, key=lambda x: x[0], ascending=ascending)
+            assert list(chained) == expected
+
+
+def test_algorithm_iter_merge_key_once():
+    calls = []
+
+    def key(x):
+        calls.append(x)
+        return x[0]
+
+    for ascending in [True, False]:
+        reorder = (lambda x: x) if ascending else lambda x: list(reversed(x))
+        for _ in range(20):
+            a = reorder(sorted((random.randint(1, 20), "a") for _ in range(random.randint(0, 25))))
+            b = reorder(sorted((random.randint(1, 20), "b") for _ in range(random.randint(0, 25))))
+            expected = sorted(a + b, key=lambda x: x[0], reverse=not ascending)
+            calls.clear()
+            assert list(iter_merge_two(a, b, key=key, ascending=ascending)) == expected
+            assert len(calls) <= len(a) + len(b)
+            assert len(set(map(id, calls))) == len(calls)
+            s = NamedObject("s")
+            zipped = list(iter_merge_zip(a, b, key=key, ascending=ascending, s=s))
+            assert [i for i, _ in zipped if i is not s] == a
+            assert [j for _, j in zipped if j is not s] == b
+            for i, j in zipped:
+                assert i is s or j is s or i[0] == j[0]
+
+
+def _random_chunks(items):
+    chunks = []
+    i = 0
+    while i < len(items):
+        n = random.randint(0, 6)
+        chunks.append(tuple(items[i : i + n]))
+        i += n
+    if random.random() < 0.5:
+        chunks.append(())
+    return chunks
+
+
+def test_algorithm_iter_merge_chunks():
+    assert list(iter_merge_chunks()) == []
+    assert list(iter_merge_chunks([], [()])) == []
+    assert list(iter_merge_unique_chunks([()], [])) == []
+    assert list(iter_merge_zip_chunks([], [(), ()])) == []
+    assert list(iter_merge_two_chunks([[1, 2, 3], [4, 5]], [[10, 11], [12]])) == [[1, 2, 3], [4, 5], [10, 11], [12]]
+    assert list(iter_merge_two_chunks([[1, 4], [5]], [[2, 3], [4, 6]])) == [[1, 2, 3], [4], [4, 5], [6]]
+    for ascending in [True, False]:
+        reorder = (lambda x: x) if ascending else lambda x: list(reversed(x))
+        for n in range(1, 5):
+            for _ in range(50):
+                xs = [
+                    reorder(sorted((random.randint(1, 30), i) for _ in range(random.randint(0, 25)))) for i in range(n)
+                ]
+                cs = [_random_chunks(x) for x in xs]
+                for chunk in iter_merge_chunks(*cs, key=lambda x: x[0], ascending=ascending):
+                    assert type(chunk) is list and chunk
+                assert list(chain(*iter_merge_chunks(*cs, key=lambda x: x[0], ascending=ascending))) == list(
+                    iter_merge(*xs, key=lambda x: x[0], ascending=ascending)
+                )
+                ys = [[x[0] for x in xs_] for xs_ in xs]
+                cs = [_random_chunks(y) for y in ys]
+                assert list(chain(*iter_merge_chunks(*cs, ascending=ascending))) == list(
+                    iter_merge(*ys, ascending=ascending)
+                )
+                assert list(chain(*iter_merge_unique_chunks(*cs, ascending=ascending))) == list(
+                    iter_merge_unique(*ys, ascending=ascending)
+                )
+                if n == 2:
+                    assert list(chain(*iter_merge_zip_chunks(*cs, ascending=ascending))) == list(
+                        iter_merge_zip(*ys, ascending=ascending)
+                    )
+                    cs = [_random_chunks(x) for x in xs]
+                    s = NamedObject("s")
+                    assert list(
+                        chain(*iter_merge_zip_chunks(*cs, key=lambda x: x[0], ascending=ascending, s=s))
+                    ) == list(iter_merge_zip(*xs, key=lambda x: x[0], ascending=ascending, s=s))
+
+
 def test_algorithm_iter_all_same():
     assert iter_all_same() is True
     assert iter_all_same([]) is True
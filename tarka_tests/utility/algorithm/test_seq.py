@@ -1,6 +1,16 @@
+import random
+from bisect import bisect_left
+
 import pytest
 
-from tarka.utility.algorithm.seq import seq_eq, seq_closest, seq_closest_index
+from tarka.utility.algorithm import seq as seq_module
+from tarka.utility.algorithm.seq import (
+    seq_eq,
+    seq_closest,
+    seq_closest_index,
+    seq_closest_many,
+    seq_closest_index_many,
+)
 
 
 def test_algorithm_seq_eq():
@@ -33,3 +43,69 @@ def test_algorithm_seq_closest_index():
     s = [1, 5, 8, 9]
     for v, r in [(0, 0), (1, 0), (2, 0), (3, 0), (4, 1), (5, 1), (6, 1), (7, 2), (8, 2), (9, 3), (10, 3)]:
         assert seq_closest_index(s, v) == r
+
+
+class _ListArray(list):
+    """
+    Pure-Python stand-in of the numpy array for the operations of the vectorized implementation.
+    """
+
+    def __getitem__(self, index):
+        if isinstance(index, list):
+            return _ListArray(list.__getitem__(self, i) for i in index)
+        return list.__getitem__(self, index)
+
+    def __sub__(self, other):
+        other = other if isinstance(other, list) else [other] * len(self)
+        return _ListArray(a - b for a, b in zip(self, other))
+
+    def __lt__(self, other):
+        return _ListArray(a < b for a, b in zip(self, other))
+
+
+class _ListArrayModule:
+    @staticmethod
+    def asarray(values):
+        return _ListArray(values)
+
+    @staticmethod
+    def searchsorted(seq, values, side):
+        assert side == "left"
+        return _ListArray(bisect_left(seq, v) for v in values)
+
+    @staticmethod
+    def maximum(a, b):
+        return _ListArray(max(x, b) for x in a)
+
+    @staticmethod
+    def minimum(a, b):
+        return _ListArray(min(x, b) for x in a)
+
+    @staticmethod
+    def where(condition, a, b):
+        return _ListArray(x if c else y for c, x, y in zip(condition, a, b))
+
+
+@pytest.mark.parametrize("backend", ["numpy", "list-array", "python"])
+def test_algorithm_seq_closest_many(monkeypatch, backend):
+    if backend == "numpy":
+        pytest.importorskip("numpy")
+    elif backend == "list-array":
+        monkeypatch.setattr(seq_module, "_numpy", lambda: _ListArrayModule)
+    else:
+        monkeypatch.setattr(seq_module, "_numpy", lambda: None)
+    with pytest.raises(ValueError):
+        seq_closest_many([], [5])
+    with pytest.raises(ValueError):
+        seq_closest_index_many([], [5])
+    s = [1, 5, 8, 9]
+    vs = [0, 1, 2, 3, 4, 5, 6, 7, 8, 9, 10]
+    assert list(seq_closest_many(s, vs)) == [1, 1, 1, 1, 5, 5, 5, 8, 8, 9, 9]
+    assert list(seq_closest_index_many(s, vs)) == [0, 0, 0, 0, 1, 1, 1, 2, 2, 3, 3]
+    assert list(seq_closest_index_many(s, iter(vs))) == [0, 0, 0, 0, 1, 1, 1, 2, 2, 3, 3]
+    assert list(seq_closest_many(s, [])) == []
+    for _ in range(20):
+        s = sorted(random.randint(0, 50) for _ in range(random.randint(1, 20)))
+        vs = [random.randint(-5, 55) for _ in range(50)] + [random.random() * 50 for _ in range(50)]
+        assert list(seq_closest_many(s, vs)) == [seq_closest(s, v) for v in vs]
+        assert list(seq_closest_index_many(s, vs)) == [seq_closest_index(s, v) for v in vs]
@@ -1,13 +1,60 @@
 import hashlib
+import mmap
+import random
+from concurrent.futures import ThreadPoolExecutor, ProcessPoolExecutor
+from io import BytesIO
 
+import pytest
+
+from tarka.utility.algorithm.traverse import TraverseCycleError, traverse, SORTED_STR_TRAVERSE
 from tarka.utility.serialize.deterministic import (
     deterministic_dumps,
     deterministic_loads,
     deterministic_transform,
     deterministic_hash,
+    deterministic_load,
+    deterministic_load_events,
+    deterministic_merkle_hash,
+    DeterministicCollection,
+    DeterministicMerkleCache,
+    MERKLE_LEAF_SIZE,
+    _deterministic_transform,
+    VERSION_TAG,
 )
 
 
+def _random_scalar(rng: random.Random):
+    return rng.choice(
+        [
+            lambda: rng.randint(-(10**30), 10**30),
+            lambda: rng.randint(-5, 5),
+            lambda: rng.random() * rng.choice([1, -1e300, 1e-300]),
+            lambda: rng.choice([True, False, None]),
+            lambda: "".join(rng.choice("aé\u20ac\U0001f600 0") for _ in range(rng.randint(0, 10))),
+            lambda: rng.randbytes(rng.randint(0, 10)),
+            lambda: (rng.randint(0, 3), str(rng.randint(0, 3))),
+        ]
+    )()
+
+
+def _random_object(rng: random.Random, depth: int = 4):
+    if depth == 0 or rng.random() < 0.3:
+        return _random_scalar(rng)
+    n = rng.randint(0, 8)
+    kind = rng.choice([list, tuple, dict, set, frozenset])
+    if kind is dict:
+        return {_random_scalar(rng): _random_object(rng, depth - 1) for _ in range(n)}
+    if kind in (set, frozenset):
+        return kind(_random_scalar(rng) for _ in range(n))
+    return kind(_random_object(rng, depth - 1) for _ in range(n))
+
+
+def _generic_dumps(arg) -> bytes:
+    buf = BytesIO()
+    _deterministic_transform(arg, buf.write, prefix=VERSION_TAG)
+    return buf.getvalue()
+
+
 def test_deterministic():
     def _deterministic_sha256(arg):
         h = hashlib.sha256()
@@ -35,3 +82,245 @@ def test_deterministic():
         assert tmp == hashlib.sha512(b).digest(), str(tmp)
         tmp = deterministic_hash(o, "blake2b", digest_size=32)
         assert tmp == hashlib.blake2b(b, digest_size=32).digest(), str(tmp)
+
+
+def test_deterministic_random():
+    rng = random.Random(7)
+    for _ in range(300):
+        o = _random_object(rng)
+        b = _generic_dumps(o)
+        assert deterministic_dumps(o) == b
+        assert deterministic_loads(b) == o
+        assert deterministic_hash(o, "sha256") == hashlib.sha256(b).digest()
+
+
+def test_deterministic_transform_chunks():
+    big = b"y" * 200000
+    o = [[["x" * 1000] * 10 for _ in range(100)], big, list(range(20000))]
+    chunks = []
+    deterministic_transform(o, chunks.append)
+    assert b"".join(chunks) == _generic_dumps(o)
+    assert len(chunks) > 10
+    assert all(type(c) is bytes for c in chunks)
+    assert any(c is big for c in chunks)  # large values are not copied to the buffer
+
+
+def test_deterministic_errors():
+    r = []
+    r.append(r)
+    with pytest.raises(TraverseCycleError):
+        deterministic_dumps(r)
+    r = []
+    t = ({"a": r},)
+    r.append(t)
+    with pytest.raises(TraverseCycleError):
+        deterministic_dumps(t)
+    x = [1, 2]
+    assert deterministic_dumps([x, x, (x,)]) == _generic_dumps([x, x, (x,)])
+    for o in (object(), [1, bytearray(b"x")], {"a": {"b": 1.5j}}):
+        with pytest.raises(KeyError):
+            _generic_dumps(o)
+        with pytest.raises(KeyError):
+            deterministic_dumps(o)
+
+
+def test_deterministic_loads_buffers(tmpdir):
+    o = {"k0": [1, 2.5, b"data", (None, True)], "k1": frozenset(["a", "b"])}
+    b = deterministic_dumps(o)
+    assert deterministic_loads(bytearray(b)) == o
+    assert deterministic_loads(memoryview(b"xx" + b)[2:]) == o
+    path = str(tmpdir.join("dump"))
+    with open(path, "wb") as f:
+        f.write(b)
+    with open(path, "rb") as f:
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as m:
+            assert deterministic_loads(m) == o
+
+
+def _random_split(rng: random.Random, b: bytes):
+    i = 0
+    while i < len(b):
+        n = rng.choice([0, 1, 2, 7, 100])
+        yield b[i : i + n]
+        i += n
+
+
+def test_deterministic_load_stream():
+    rng = random.Random(11)
+    for _ in range(100):
+        o = _random_object(rng)
+        b = deterministic_dumps(o)
+        assert deterministic_load(BytesIO(b)) == o
+        assert deterministic_load(BytesIO(b), chunk_size=3) == o
+        assert deterministic_load(_random_split(rng, b)) == o
+        events = list(deterministic_load_events(_random_split(rng, b)))
+        expected = list(traverse(o, SORTED_STR_TRAVERSE))
+        assert len(events) == len(expected)
+        for (_, value), x in zip(events, expected):
+            if type(x) in (list, tuple, dict, set, frozenset):
+                assert value == DeterministicCollection(type(x), len(x) * (2 if type(x) is dict else 1))
+            else:
+                assert type(value) is type(x) and value == x
+    o = {"a": [1, (2, b"x")], "b": set()}
+    assert list(deterministic_load_events(BytesIO(deterministic_dumps(o)))) == [
+        ((), DeterministicCollection(dict, 4)),
+        ((0,), "a"),
+        ((1,), DeterministicCollection(list, 2)),
+        ((1, 0), 1),
+        ((1, 1), DeterministicCollection(tuple, 2)),
+        ((1, 1, 0), 2),
+        ((1, 1, 1), b"x"),
+        ((2,), "b"),
+        ((3,), DeterministicCollection(set, 0)),
+    ]
+    assert list(deterministic_load_events([b"1v", b"", b"N"])) == [((), None)]
+
+
+def test_deterministic_loads_malformed():
+    for b in [
+        b"",
+        b"1",
+        b"2v",
+        b"1v",
+        b"1v3i88",
+        b"1v3i8a8",
+        b"1v2i07",
+        b"1v2i+7",
+        b"1v3i1_0",
+        b"1v2i 7",
+        b"1v0i",
+        b"1vNN",
+        b"1v1i51i5",
+        b"1v2l1i5",
+        b"1v3t1i5",
+        b"1vf1234",
+        b"1v5N",
+        b"1v1T",
+        b"1vs",
+        b"1vl",
+        b"1v1f12345678",
+        b"1v1d1i1",
+        b"1v3d1i11i21i3",
+        b"1vX",
+        b"1v5X",
+        b"1v12",
+        b"1v2s\xff\xfe",
+        b"1v5sabc",
+        b"1v2l0l",
+        b"1v2d0lN",
+        b"1v2d1t0dN",
+        b"1v1h0h",
+        b"1v1H1t0l",
+    ]:
+        with pytest.raises(ValueError):
+            deterministic_loads(b)
+        with pytest.raises(ValueError):
+            deterministic_load(BytesIO(b), chunk_size=2)
+        with pytest.raises(ValueError):
+            list(deterministic_load_events(BytesIO(b), chunk_size=2))
+
+
+def _merkle_reference(o, algo="sha256"):
+    def _item(x) -> bytes:
+        t = type(x)
+        if t in (list, tuple, dict, set, frozenset):
+            items = list(x)
+            if t is dict:
+                items = [y for k in sorted(x, key=str) for y in (k, x[k])]
+            elif t in (set, frozenset):
+                items = sorted(x, key=str)
+            header = deterministic_dumps(t())[len(VERSION_TAG) + 1 :]
+            h = hashlib.new(algo, b"%d%s" % (len(items), header))
+            for y in items:
+                h.update(_item(y))
+            return b"#" + h.digest()
+        if t in (str, bytes) and len(x) >= MERKLE_LEAF_SIZE:
+            return b"#" + hashlib.new(algo, deterministic_dumps(x)[len(VERSION_TAG) :]).digest()
+        return deterministic_dumps(x)[len(VERSION_TAG) :]
+
+    return hashlib.new(algo, b"1m" + _item(o)).digest()
+
+
+def test_deterministic_merkle_hash():
+    rng = random.Random(13)
+    cache = DeterministicMerkleCache()
+    for _ in range(100):
+        o = _random_object(rng)
+        if rng.random() < 0.3:
+            o = [o, "x" * MERKLE_LEAF_SIZE, (b"y" * (MERKLE_LEAF_SIZE + 5), "z" * (MERKLE_LEAF_SIZE - 1))]
+        expected = _merkle_reference(o)
+        assert deterministic_merkle_hash(o, "sha256") == expected
+        assert deterministic_merkle_hash(o, "sha256", cache) == expected
+        assert deterministic_merkle_hash(o, "sha256", cache) == expected
+        assert deterministic_merkle_hash(o, "sha512", cache) == _merkle_reference(o, "sha512")
+    assert deterministic_merkle_hash([1], "blake2b", cache, digest_size=16) != deterministic_merkle_hash(
+        [1], "blake2b", cache, digest_size=32
+    )
+    assert deterministic_merkle_hash(None, "sha256") != deterministic_hash(None, "sha256")
+    r = []
+    r.append((r,))
+    with pytest.raises(TraverseCycleError):
+        deterministic_merkle_hash(r, "sha256", cache)
+
+
+def test_deterministic_merkle_cache():
+    cache = DeterministicMerkleCache(max_entries=100)
+    frozen = tuple(("k%d" % i, i, frozenset([i, str(i)])) for i in range(20))
+    mutable = ([1, 2], 3)
+    big = "v" * MERKLE_LEAF_SIZE
+    o = {"frozen": frozen, "mutable": mutable, "big": big, "n": 0}
+    h0 = deterministic_merkle_hash(o, "sha256", cache)
+    assert cache.stats()["entries"] == 2  # only the maximal immutable subtrees are cached
+    misses = cache.stats()["misses"]
+    assert deterministic_merkle_hash(o, "sha256", cache) == h0
+    assert cache.stats()["misses"] == misses + 1  # only the tuple with a mutable item is not cached
+    # the changes are detected in the mutable subtrees
+    mutable[0].append(3)
+    h1 = deterministic_merkle_hash(o, "sha256", cache)
+    assert h1 != h0 and h1 == _merkle_reference(o)
+    o["n"] = 1
+    h2 = deterministic_merkle_hash(o, "sha256", cache)
+    assert h2 not in (h0, h1) and h2 == _merkle_reference(o)
+    # equal but not identical subtrees have the same digest
+    assert deterministic_merkle_hash(dict(o, frozen=tuple(list(frozen))), "sha256", cache) == h2
+    # bounded
+    for i in range(200):
+        deterministic_merkle_hash((i,), "sha256", cache)
+    assert cache.stats()["entries"] == 100
+    assert cache.stats()["evictions"] > 0
+    cache.clear()
+    assert cache.stats()["entries"] == 0
+    assert deterministic_merkle_hash(o, "sha256", cache) == h2
+
+
+def test_deterministic_merkle_hash_parallel():
+    rng = random.Random(17)
+    wide = [rng.randbytes(rng.randint(0, 3 * MERKLE_LEAF_SIZE)) for _ in range(3000)]
+    objects = [
+        None,
+        [1, 2],
+        wide,
+        {"meta": {"n": 1}, "data": {"wide": wide, "items": [_random_object(rng) for _ in range(500)]}},
+        tuple(frozenset(range(i, i + 100)) for i in range(100)),
+    ]
+    cache = DeterministicMerkleCache(max_entries=100000)
+    for o in objects:
+        expected = deterministic_merkle_hash(o, "sha256")
+        assert expected == _merkle_reference(o)
+        for workers in (1, 3, 8):
+            with ThreadPoolExecutor(workers) as executor:
+                assert deterministic_merkle_hash(o, "sha256", executor=executor) == expected
+                assert deterministic_merkle_hash(o, "sha256", cache, executor) == expected
+                assert deterministic_merkle_hash(o, "sha256", cache, executor) == expected
+    with ProcessPoolExecutor(2) as executor:
+        assert deterministic_merkle_hash(objects[3], "blake2b", cache, executor, digest_size=32) == (
+            deterministic_merkle_hash(objects[3], "blake2b", digest_size=32)
+        )
+    r = list(range(100))
+    r.append(r)
+    with ThreadPoolExecutor(2) as executor:
+        with pytest.raises(TraverseCycleError):
+            deterministic_merkle_hash([r], "sha256", executor=executor)
+        r[0] = [r]
+        with pytest.raises(TraverseCycleError):
+            deterministic_merkle_hash({"r": r}, "sha256", executor=executor)
@@ -0,0 +1,308 @@
+import asyncio
+import threading
+import time
+from functools import partial, partialmethod
+
+import pytest
+
+from tarka.utility.aio_worker import AbstractAioWorker, AbstractAioWorkerPool, AioWorkerOverloadError
+from tarka.utility.aio_worker_stats import AioWorkerStats
+
+
+class _WorkerDbgException(Exception):
+    pass
+
+
+class _TestingAioWorkerMixin:
+    __slots__ = ()
+
+    def _thread_init(self, *args):
+        self._state = []
+
+    def _thread_cleanup(self):
+        self._state = None
+
+    def _append_impl(self, value, delay=0.0, error=None):
+        time.sleep(delay)
+        if error:
+            raise error
+        self._state.append(value)
+        return len(self._state)
+
+    def _get_impl(self):
+        return list(self._state)
+
+    def _thread_ident_impl(self):
+        return threading.get_ident()
+
+    append = partialmethod(AbstractAioWorker._method_job, _append_impl)
+    get = partialmethod(AbstractAioWorker._method_job, _get_impl)
+    thread_ident = partialmethod(AbstractAioWorker._method_job, _thread_ident_impl)
+
+    sync_append = partialmethod(AbstractAioWorker._method_call, _append_impl)
+    sync_get = partialmethod(AbstractAioWorker._method_call, _get_impl)
+
+
+class _TestingAioWorker(_TestingAioWorkerMixin, AbstractAioWorker):
+    __slots__ = ("_state",)
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("max_batch", [None, 1, 8, 1000])
+async def test_aio_worker_base(max_batch):
+    async with _TestingAioWorker.create(max_batch=max_batch) as w:
+        assert await w.get() == []
+        assert await w.append("a") == 1
+        assert await asyncio.to_thread(w.sync_append, "b") == 2
+        assert await asyncio.to_thread(w.sync_get) == ["a", "b"]
+        # a slow job lets the others pile up to be executed in batches
+        slow = asyncio.create_task(w.append("c", 0.2))
+        await asyncio.sleep(0.05)
+        results = await asyncio.gather(*[w.append(i) for i in range(100)])
+        assert await slow == 3
+        assert results == list(range(4, 104))
+        with pytest.raises(_WorkerDbgException):
+            await w.append("x", 0.0, _WorkerDbgException())
+        f0 = asyncio.create_task(w.append("y", 0.2))
+        await asyncio.sleep(0.05)
+        f1 = asyncio.create_task(w.append("z", 0.0, _WorkerDbgException()))
+        f2 = asyncio.create_task(w.append("w"))
+        await asyncio.sleep(0)
+        f2.cancel()
+        assert await f0 == 104
+        with pytest.raises(_WorkerDbgException):
+            await f1
+        with pytest.raises(asyncio.CancelledError):
+            await f2
+        assert (await w.get())[-2:] == [99, "y"]
+
+        # jobs queued after the stop signal are cancelled
+        f3 = asyncio.create_task(w.append("q", 0.3))
+        await asyncio.sleep(0.1)
+        w.stop()
+        with pytest.raises(asyncio.CancelledError):
+            await w.append("r")
+        assert await f3 == 105
+
+    await asyncio.wait_for(w.closed.wait(), 1.0)
+    with pytest.raises(AttributeError):
+        await w.get()
+
+
+class _TestingAioWorkerPool(_TestingAioWorkerMixin, AbstractAioWorkerPool):
+    __slots__ = ("_state",)
+
+
+class _FailingAioWorkerPool(_TestingAioWorkerPool):
+    __slots__ = ()
+
+    def _thread_init(self, *args):
+        if threading.current_thread() is not threading.main_thread() and "-2-" in threading.current_thread().name:
+            raise _WorkerDbgException()
+        _TestingAioWorkerPool._thread_init(self, *args)
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("max_batch", [None, 8])
+async def test_aio_worker_pool(max_batch):
+    async with _TestingAioWorkerPool.create(max_batch=max_batch, workers=3) as w:
+        t = time.perf_counter()
+        results = await asyncio.gather(*[w.append(i, 0.2) for i in range(3)])
+        assert time.perf_counter() - t < 0.35
+        assert results == [1, 1, 1]  # each thread has its own state
+        idents = set(await asyncio.gather(*[w.thread_ident() for _ in range(300)]))
+        assert threading.get_ident() not in idents
+        assert 1 <= len(idents) <= 3
+        assert await asyncio.to_thread(w.sync_append, "b") == 2
+        with pytest.raises(_WorkerDbgException):
+            await w.append("x", 0.0, _WorkerDbgException())
+
+        # jobs queued after the stop signals are cancelled
+        fs = [asyncio.create_task(w.append("q", 0.3)) for _ in range(3)]
+        await asyncio.sleep(0.1)
+        w.stop()
+        with pytest.raises(asyncio.CancelledError):
+            await w.append("r")
+        assert all(r > 1 for r in await asyncio.gather(*fs))
+
+    await asyncio.wait_for(w.closed.wait(), 1.0)
+    with pytest.raises(AttributeError):
+        await w.get()
+
+
+@pytest.mark.asyncio
+@pytest.mark.filterwarnings("ignore::pytest.PytestUnhandledThreadExceptionWarning")
+async def test_aio_worker_pool_start_failure():
+    with pytest.raises(Exception, match="could not start"):
+        async with _FailingAioWorkerPool.create(workers=3):
+            pass  # pragma: no cover
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("max_batch", [None, 8])
+async def test_aio_worker_priority_deadline(max_batch):
+    async with _TestingAioWorker.create(max_batch=max_batch, priority=True) as w:
+        slow = asyncio.create_task(w.append("slow", 0.2))
+        await asyncio.sleep(0.05)
+        tasks = [asyncio.create_task(w.append(p, priority=p)) for p in [5, 1, 3, 1, -2, 0]]
+        expired = asyncio.create_task(w.append("expired", timeout=0.05))
+        expired_call = asyncio.create_task(asyncio.to_thread(w.sync_append, "expired_call", timeout=0.05))
+        await asyncio.gather(slow, *tasks)
+        with pytest.raises(asyncio.TimeoutError):
+            await expired
+        with pytest.raises(TimeoutError):
+            await expired_call
+        assert await w.get() == ["slow", -2, 0, 1, 1, 3, 5]
+
+        # the stop signal is ordered after the queued jobs
+        slow = asyncio.create_task(w.append("slow", 0.2))
+        await asyncio.sleep(0.05)
+        tasks = [asyncio.create_task(w.append(p, priority=p)) for p in [5, 1, 3]]
+        await asyncio.sleep(0.01)
+        w.stop()
+        await asyncio.gather(slow, *tasks)
+
+    await asyncio.wait_for(w.closed.wait(), 1.0)
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("max_batch", [None, 8])
+async def test_aio_worker_max_pending(max_batch):
+    async with _TestingAioWorker.create(max_batch=max_batch, max_pending=4) as w:
+        slow = asyncio.create_task(w.append("slow", 0.2))
+        await asyncio.sleep(0.05)
+        assert w.pending() == 0
+        tasks = [asyncio.create_task(w.append(i)) for i in range(10)]
+        await asyncio.sleep(0.01)
+        assert w.pending() == 4
+        with pytest.raises(AioWorkerOverloadError):
+            await w.append("rejected", wait=False)
+        with pytest.raises(AioWorkerOverloadError):
+            await asyncio.to_thread(w.sync_append, "rejected", wait=False)
+        with pytest.raises(asyncio.TimeoutError):
+            await w.append("expired", timeout=0.05)
+        blocked = asyncio.create_task(asyncio.to_thread(w.sync_append, "blocked"))
+        await asyncio.gather(slow, *tasks, blocked)
+        state = await w.get()
+        assert state[0] == "slow"
+        assert [v for v in state if isinstance(v, int)] == list(range(10))  # the waiters keep their order
+        assert "blocked" in state
+        assert "rejected" not in state
+
+        # the stop signal is accepted even if the queue is full
+        slow = asyncio.create_task(w.append("slow", 0.2))
+        await asyncio.sleep(0.05)
+        tasks = [asyncio.create_task(w.append(i)) for i in range(6)]
+        await asyncio.sleep(0.01)
+        w.stop()
+        await slow
+        results = await asyncio.gather(*tasks, return_exceptions=True)
+        assert all(r is None or isinstance(r, (int, asyncio.CancelledError)) for r in results)
+        assert any(isinstance(r, asyncio.CancelledError) for r in results)
+
+    await asyncio.wait_for(w.closed.wait(), 1.0)
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("max_batch", [None, 8])
+async def test_aio_worker_max_pending_timeout(max_batch):
+    async with _TestingAioWorker.create(max_batch=max_batch, max_pending=1) as w:
+        # the timeout covers the wait for the queue capacity and the result together
+        for call in (
+            lambda: w.append("timeout", timeout=0.3),
+            lambda: asyncio.to_thread(w.sync_append, "timeout", timeout=0.3),
+        ):
+            slow = asyncio.create_task(w.append("slow", 0.2))
+            await asyncio.sleep(0.02)
+            fill = asyncio.create_task(w.append("fill", 0.2))
+            await asyncio.sleep(0.02)
+            t = time.perf_counter()
+            with pytest.raises((asyncio.TimeoutError, TimeoutError)):
+                await call()
+            assert 0.25 < time.perf_counter() - t < 0.4
+            await asyncio.gather(slow, fill)
+        assert "timeout" not in await w.get()
+
+    await asyncio.wait_for(w.closed.wait(), 1.0)
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("max_batch", [None, 8])
+async def test_aio_worker_metrics(max_batch):
+    stats = AioWorkerStats()
+    async with _TestingAioWorker.create(max_batch=max_batch, metrics=stats) as w:
+        slow = asyncio.create_task(w.append("slow", 0.1))
+        await asyncio.sleep(0.02)
+        await asyncio.gather(slow, *[w.append(i) for i in range(10)], *[w.get() for _ in range(5)])
+        assert await asyncio.to_thread(w.sync_append, "sync") == 12
+        with pytest.raises(_WorkerDbgException):
+            await w.append("x", 0.0, _WorkerDbgException())
+        with pytest.raises(asyncio.TimeoutError):
+            await w.append("timeout", 0.1, timeout=0.01)
+        s = stats.summary()
+
+    await asyncio.wait_for(w.closed.wait(), 1.0)
+    assert s["jobs"] == 18  # the timed out job is not delivered
+    assert s["jobs_per_second"] > 0.0
+    assert s["max_depth"] >= 5
+    append = s["labels"]["_TestingAioWorkerMixin._append_impl"]
+    assert append["execute"]["count"] == 13
+    assert append["execute"]["max"] >= 0.1
+    assert append["queue_wait"]["p99"] >= 0.05  # the jobs queued behind the slow one
+    assert s["labels"]["_TestingAioWorkerMixin._get_impl"]["delivery"]["count"] == 5
+    stats.reset()
+    assert stats.summary()["jobs"] == 0
+
+
+class _TimerAioWorker(_TestingAioWorker):
+    __slots__ = ()
+
+    def _thread_poll(self):
+        self._state.append("poll")
+
+    def _schedule_impl(self, value, delay, period=None):
+        return self._thread_schedule(partial(self._state.append, value), delay, period)
+
+    schedule = partialmethod(AbstractAioWorker._method_job, _schedule_impl)
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("max_batch", [None, 8])
+async def test_aio_worker_timers(max_batch):
+    async with _TimerAioWorker.create(max_batch=max_batch, poll_timeout=0.05) as w:
+        await w.schedule("once", 0.02)
+        periodic = await w.schedule("tick", 0.01, 0.03)
+        cancelled = await w.schedule("cancelled", 0.05)
+        cancelled.cancel()
+        await asyncio.sleep(0.2)
+        periodic.cancel()
+        state = await w.get()
+        assert state.count("once") == 1
+        assert 4 <= state.count("tick") <= 8
+        assert 2 <= state.count("poll") <= 5
+        assert "cancelled" not in state
+        # jobs are not delayed by the timers
+        t = time.perf_counter()
+        await asyncio.gather(*[w.append(i) for i in range(100)])
+        assert time.perf_counter() - t < 0.1
+        await asyncio.sleep(0.1)
+        assert (await w.get()).count("tick") == state.count("tick")
+
+    await asyncio.wait_for(w.closed.wait(), 1.0)
+
+
+@pytest.mark.asyncio
+async def test_aio_worker_sync_call_reuse():
+    async with _TestingAioWorker.create() as w:
+
+        def _calls():
+            results = [w.sync_append(i) for i in range(3)]
+            with pytest.raises(TimeoutError):
+                w.sync_append("slow", 0.1, timeout=0.02)
+            # the completion lock of the abandoned call is not reused
+            results.extend(w.sync_append(i) for i in range(3, 6))
+            return results
+
+        assert await asyncio.to_thread(_calls) == [1, 2, 3, 5, 6, 7]
+
+    await asyncio.wait_for(w.closed.wait(), 1.0)